@@ -1,12 +1,18 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Callable
 
 import streamlit as st
 
-from app_core import get_profile_name, init_app_state, navigate
-from app_pages import chatbot, home, lesson_plan, lessons, practice_lab, profile_progress, spreadsheet_lab
+from app_core import (
+    get_instrumentation,
+    get_profile_name,
+    import_page_module,
+    init_app_state,
+    navigate,
+    render_instrumentation_panel,
+    span,
+)
 
 
 @dataclass(frozen=True)
@@ -15,27 +21,39 @@ class PageConfig:
     key: str
     title: str
     icon: str
-    render: Callable[[], None]
+    # Import path of the page module; it is loaded on first visit so heavy
+    # dependencies (Gemini SDK, pandas, PIL) are only paid for when needed.
+    module: str
+
+    def render(self) -> None:
+        import_page_module(self.module).render()
 
 
 # Ordered list defines the main sidebar placement from top to bottom.
 PRIMARY_PAGES = [
-    PageConfig("home", "Home", "🏠", home.render),
-    PageConfig("lessons", "Lessons", "📚", lessons.render),
-    PageConfig("spreadsheet", "Spreadsheet Lab", "🧮", spreadsheet_lab.render),
-    PageConfig("practice", "Practice Lab", "🧪", practice_lab.render),
-    PageConfig("lesson_plan", "Lesson Plan", "🗂", lesson_plan.render),
-    PageConfig("chatbot", "AI Tutor", "🤖", chatbot.render),
+    PageConfig("home", "Home", "🏠", "app_pages.home"),
+    PageConfig("lessons", "Lessons", "📚", "app_pages.lessons"),
+    PageConfig("spreadsheet", "Spreadsheet Lab", "🧮", "app_pages.spreadsheet_lab"),
+    PageConfig("practice", "Practice Lab", "🧪", "app_pages.practice_lab"),
+    PageConfig("lesson_plan", "Lesson Plan", "🗂", "app_pages.lesson_plan"),
+    PageConfig("chatbot", "AI Tutor", "🤖", "app_pages.chatbot"),
 ]
 
-PROFILE_PAGE = PageConfig("profile", "Profile & Progress", "👤", profile_progress.render)
+PROFILE_PAGE = PageConfig("profile", "Profile & Progress", "👤", "app_pages.profile_progress")
 
 ALL_PAGES = {page.key: page for page in [*PRIMARY_PAGES, PROFILE_PAGE]}
 
 
 # App-wide state must be initialized before any page reads session values.
 st.set_page_config(page_title="ExcelWars", page_icon="📊", layout="wide")
-init_app_state()
+
+# Instrumentation is None unless enabled through the environment.
+instrumentation = get_instrumentation()
+if instrumentation is not None:
+    instrumentation.begin_rerun()
+
+with span("init_app_state"):
+    init_app_state()
 
 if "active_page" not in st.session_state:
     st.session_state.active_page = "home"
@@ -75,5 +93,16 @@ def render_sidebar(active_page: str) -> None:
 
 
 active_page_key = st.session_state.active_page
-render_sidebar(active_page_key)
-ALL_PAGES[active_page_key].render()
+
+try:
+    with span("sidebar"):
+        render_sidebar(active_page_key)
+
+    with span(f"page.{active_page_key}"):
+        ALL_PAGES[active_page_key].render()
+finally:
+    # Navigation stops the script with a rerun exception; the partial rerun is still recorded.
+    if instrumentation is not None:
+        instrumentation.end_rerun(active_page_key)
+
+render_instrumentation_panel()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import time
+from array import array
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+ACTIVITY_LOG_CAPACITY = 1000
+ACTIVITY_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class ActivityLog:
+    # Fixed-capacity ring buffer of (epoch seconds, event code) pairs. Event texts are
+    # interned, so repeated events like "+50 XP (Lesson 1 completion)" are stored once.
+    # The display frame is built lazily and reused until the next append. The buffers are
+    # stdlib arrays, so app_core can create logs without importing numpy or pandas.
+    def __init__(self, capacity: int = ACTIVITY_LOG_CAPACITY) -> None:
+        self.capacity = capacity
+        # Arrays are allocated on the first append; most sessions never log anything.
+        self._times: array | None = None
+        self._codes: array | None = None
+        self._events: list[str] = []
+        self._event_codes: dict[str, int] = {}
+        self._start = 0
+        self._size = 0
+        self._frame: pd.DataFrame | None = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, event: str, timestamp: int | None = None) -> None:
+        if self._times is None:
+            self._times = array("q", [0]) * self.capacity
+            self._codes = array("i", [0]) * self.capacity
+
+        code = self._event_codes.get(event)
+        if code is None:
+            code = self._event_codes[event] = len(self._events)
+            self._events.append(event)
+
+        # Once full, the oldest entry is overwritten.
+        position = (self._start + self._size) % self.capacity
+        if self._size == self.capacity:
+            self._start = (self._start + 1) % self.capacity
+        else:
+            self._size += 1
+
+        self._times[position] = int(time.time()) if timestamp is None else timestamp
+        self._codes[position] = code
+        self._frame = None
+
+    def _ordered(self) -> tuple[list[int], list[int]]:
+        # Times and codes oldest first.
+        if self._times is None:
+            return [], []
+
+        end = self._start + self._size
+        if end <= self.capacity:
+            return self._times[self._start : end].tolist(), self._codes[self._start : end].tolist()
+        wrapped = end - self.capacity
+        return (
+            (self._times[self._start :] + self._times[:wrapped]).tolist(),
+            (self._codes[self._start :] + self._codes[:wrapped]).tolist(),
+        )
+
+    def frame(self) -> pd.DataFrame:
+        # Newest-first "time"/"event" table for display, cached until the next append.
+        # pandas is imported here, the first time the profile page shows the log.
+        import pandas as pd
+
+        if self._frame is None:
+            times, codes = self._ordered()
+            events = self._events
+            self._frame = pd.DataFrame(
+                {
+                    "time": [datetime.fromtimestamp(value).strftime(ACTIVITY_TIME_FORMAT) for value in reversed(times)],
+                    "event": [events[code] for code in reversed(codes)],
+                },
+                dtype=object,
+            )
+        return self._frame
+
+    def page(self, page_number: int, page_size: int) -> pd.DataFrame:
+        # One page (zero-based) of the newest-first table.
+        start = page_number * page_size
+        return self.frame().iloc[start : start + page_size]
+
+    def page_count(self, page_size: int) -> int:
+        return max(1, -(-self._size // page_size))
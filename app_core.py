@@ -1,20 +1,71 @@
 from __future__ import annotations
 
+import atexit
+import importlib
 import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime
+from functools import wraps
 from pathlib import Path
-from typing import Any
+from types import ModuleType
+from typing import Any, Callable, Iterator, TypeVar
 
 import streamlit as st
 
-PROFILE_DATA_FILE = Path("profile_data.json")
-PROFILE_PIC_FILE = Path("profile_pic.png")
+from activity_log import ActivityLog
+from profile_images import is_image_id, save_profile_picture
+from progress_store import (
+    LEGACY_STUDENT_ID,
+    ActivityRecord,
+    ProgressStore,
+    StudentRecord,
+)
+
+PROGRESS_DB_ENV_VAR = "EXCELWARS_PROGRESS_DB"
+DEFAULT_PROGRESS_DB = "progress.db"
+# Each browser keeps its student id in the URL, so a refresh or bookmark finds the same progress.
+STUDENT_QUERY_PARAM = "student"
+# Older versions kept one profile for everyone in this file; it is imported once, then removed.
+LEGACY_PROFILE_DATA_FILE = Path("profile_data.json")
+
+# Progress writes are buffered and flushed by a background thread on whichever comes first.
+WRITE_BEHIND_BATCH_SIZE = 50
+WRITE_BEHIND_INTERVAL_SECONDS = 1.0
+# Producers wait for the writer only when this many writes are already pending, and then for
+# at most WRITE_BEHIND_SUBMIT_TIMEOUT_SECONDS before older writes are coalesced or dropped.
+WRITE_BEHIND_MAX_PENDING = 2000
+WRITE_BEHIND_SUBMIT_TIMEOUT_SECONDS = 0.25
+# A failing batch is retried with doubling delays (capped) and given up after this many attempts.
+WRITE_BEHIND_MAX_RETRIES = 5
+WRITE_BEHIND_MAX_BACKOFF_SECONDS = 30.0
 
 LESSON_NAMES = ("Lesson 1", "Lesson 2", "Lesson 3")
 XP_PER_LEVEL = 150
 XP_PER_LESSON = 50
 XP_PER_QUIZ = 20
 
+# Set EXCELWARS_INSTRUMENT=1 to time reruns; EXCELWARS_INSTRUMENT_LOG=<path> also appends JSON lines there.
+INSTRUMENT_ENV_VAR = "EXCELWARS_INSTRUMENT"
+INSTRUMENT_LOG_ENV_VAR = "EXCELWARS_INSTRUMENT_LOG"
+INSTRUMENT_STATE_KEY = "_instrumentation"
+INSTRUMENT_HISTORY = 20
+
+_T = TypeVar("_T")
+
+logger = logging.getLogger(__name__)
+
+# Milliseconds spent importing each page module, recorded once per server process.
+PAGE_IMPORT_MS: dict[str, float] = {}
+
 
 def _default_profile_data() -> dict[str, Any]:
     # Base profile shape used when no saved file exists.
@@ -30,34 +81,282 @@ def _default_learning_state() -> dict[str, Any]:
         "completed": {lesson: False for lesson in LESSON_NAMES},
         "quiz_completion": {lesson: False for lesson in LESSON_NAMES},
         "badges": [],
-        "activity_log": [],
+        "activity_log": ActivityLog(),
     }
 
 
-def load_profile_data() -> dict[str, Any]:
-    # Read profile JSON safely and return a normalized dict.
-    if not PROFILE_DATA_FILE.exists():
-        return _default_profile_data()
+@dataclass
+class _PendingWrite:
+    # One submitted change, numbered in submission order. `student` is None once a newer
+    # row for the same student has been moved into an earlier entry.
+    index: int
+    student_id: str
+    student: StudentRecord | None
+    activity: ActivityRecord | None
+
+
+class WriteBehindQueue:
+    # Buffers progress writes so button clicks never wait on disk I/O. One background
+    # thread writes them in FIFO batches, each batch in one transaction, so a failed batch
+    # left nothing behind and can be retried. Retries back off and stop after max_retries;
+    # a full queue makes room rather than blocking the caller for long.
+    def __init__(
+        self,
+        store: ProgressStore,
+        batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+        interval: float = WRITE_BEHIND_INTERVAL_SECONDS,
+        max_pending: int = WRITE_BEHIND_MAX_PENDING,
+        submit_timeout: float = WRITE_BEHIND_SUBMIT_TIMEOUT_SECONDS,
+        max_retries: int = WRITE_BEHIND_MAX_RETRIES,
+    ) -> None:
+        self.store = store
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_pending = max_pending
+        self.submit_timeout = submit_timeout
+        self.max_retries = max_retries
+        self._pending: deque[_PendingWrite] = deque()
+        # The batch the writer thread is working on; kept until written or given up.
+        self._inflight: list[_PendingWrite] = []
+        self._condition = threading.Condition()
+        self._next_index = 0
+        self._flush_requested = False
+        self.failures = 0
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="progress-write-behind", daemon=True)
+        self._thread.start()
+
+    def submit(self, student: StudentRecord, activity: ActivityRecord | None = None) -> bool:
+        # Queue a change. Returns False when the queue was full and older writes had to be
+        # dropped to make room.
+        with self._condition:
+            if len(self._pending) >= self.max_pending:
+                self._condition.notify_all()
+                self._condition.wait_for(lambda: len(self._pending) < self.max_pending, self.submit_timeout)
+
+            kept = len(self._pending) < self.max_pending or self._make_room()
+            self._pending.append(_PendingWrite(self._next_index, student.student_id, student, activity))
+            self._next_index += 1
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify_all()
+            return kept
+
+    def _make_room(self) -> bool:
+        # The writer is not keeping up. Student rows are full snapshots, so each student's
+        # newest row moves into their oldest entry and the others go. If that is not enough,
+        # the oldest entries are dropped. Returns False when anything was dropped.
+        newest = {item.student_id: item.student for item in self._pending if item.student is not None}
+        compacted: deque[_PendingWrite] = deque()
+        for item in self._pending:
+            item.student = newest.pop(item.student_id, None)
+            if item.student is not None or item.activity is not None:
+                compacted.append(item)
+        self._pending = compacted
+
+        excess = len(self._pending) - self.max_pending + 1
+        if excess <= 0:
+            return True
+
+        for _ in range(excess):
+            dropped = self._pending.popleft()
+            # Keep the student's row if a later entry of theirs can carry it.
+            heir = next((item for item in self._pending if item.student_id == dropped.student_id), None)
+            if heir is not None and dropped.student is not None:
+                heir.student = dropped.student
+        self.dropped += excess
+        logger.warning("Progress writes are falling behind; dropped the %d oldest pending writes", excess)
+        return False
+
+    def request_flush(self) -> None:
+        # Ask for an early write without waiting for it (e.g. when a session ends).
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+
+    def flush(self, timeout: float | None = None, student_id: str | None = None) -> bool:
+        # Block until everything submitted so far (only student_id's writes, if given) is
+        # written or given up on; False on timeout.
+        with self._condition:
+            items = [*self._inflight, *self._pending]
+            if student_id is not None:
+                items = [item for item in items if item.student_id == student_id]
+            if not items:
+                return True
+
+            last = items[-1].index
+            self._flush_requested = True
+            self._condition.notify_all()
+            return self._condition.wait_for(lambda: self._finished(last), timeout)
+
+    def _finished(self, index: int) -> bool:
+        # Whether the write numbered index and every earlier one have left the queue.
+        oldest = self._inflight[0] if self._inflight else self._pending[0] if self._pending else None
+        return oldest is None or oldest.index > index
+
+    @property
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._inflight) + len(self._pending)
+
+    def _run(self) -> None:
+        attempts = 0
+        while True:
+            with self._condition:
+                if not self._inflight:
+                    self._condition.wait_for(
+                        lambda: self._flush_requested or len(self._pending) >= self.batch_size,
+                        self.interval,
+                    )
+                    self._flush_requested = False
+                    self._inflight = list(self._pending)
+                    self._pending.clear()
+                    self._condition.notify_all()
+                batch = self._inflight
+
+            if not batch:
+                continue
+
+            # Only the newest row per student matters; activity keeps its submission order.
+            students = {item.student_id: item.student for item in batch if item.student is not None}
+            activities = [item.activity for item in batch if item.activity is not None]
+
+            try:
+                self.store.write_batch(students.values(), activities)
+            except Exception:
+                attempts += 1
+                with self._condition:
+                    self.failures += 1
+                    if attempts >= self.max_retries:
+                        logger.exception("Dropping %d progress writes after %d failed attempts", len(batch), attempts)
+                        self.dropped += len(batch)
+                        self._inflight = []
+                        self._condition.notify_all()
+                        attempts = 0
+                        continue
+
+                logger.warning("Progress write failed (attempt %d of %d)", attempts, self.max_retries, exc_info=True)
+                time.sleep(min(self.interval * 2 ** (attempts - 1), WRITE_BEHIND_MAX_BACKOFF_SECONDS))
+                continue
+
+            attempts = 0
+            with self._condition:
+                self._inflight = []
+                self._condition.notify_all()
+
+
+@st.cache_resource
+def get_progress_store() -> ProgressStore:
+    # One SQLite store (and connection pool) per server process.
+    store = ProgressStore(os.getenv(PROGRESS_DB_ENV_VAR) or DEFAULT_PROGRESS_DB)
+    _import_legacy_profile(store)
+    return store
+
+
+def _import_legacy_profile(store: ProgressStore) -> None:
+    # Copy the shared profile of older versions into the database, where the first student
+    # without saved progress claims it, then delete the file so this happens only once.
+    if not LEGACY_PROFILE_DATA_FILE.exists():
+        return
 
     try:
-        with PROFILE_DATA_FILE.open("r", encoding="utf-8") as file:
+        with LEGACY_PROFILE_DATA_FILE.open("r", encoding="utf-8") as file:
             data = json.load(file)
     except (json.JSONDecodeError, OSError):
-        return _default_profile_data()
+        data = None
+
+    if isinstance(data, dict):
+        picture = data.get("profile_pic")
+        if picture and not is_image_id(picture):
+            # Pictures were a plain file path; store them like new uploads.
+            try:
+                with open(picture, "rb") as file:
+                    picture = save_profile_picture(file)
+            except OSError:
+                picture = None
+        store.write_batch([StudentRecord(LEGACY_STUDENT_ID, name=data.get("name", "") or "", profile_pic=picture)])
+
+    LEGACY_PROFILE_DATA_FILE.unlink(missing_ok=True)
+
+
+@st.cache_resource
+def get_write_behind() -> WriteBehindQueue:
+    writer = WriteBehindQueue(get_progress_store())
+    # Pending progress is written out when the server process exits.
+    atexit.register(writer.flush, 10.0)
+    return writer
+
+
+class _SessionToken:
+    # Lives in session state; when Streamlit discards the session, its finalizer triggers a flush.
+    pass
+
+
+def _current_student_id() -> str:
+    student_id = st.query_params.get(STUDENT_QUERY_PARAM)
+    if not student_id:
+        student_id = uuid.uuid4().hex
+        st.query_params[STUDENT_QUERY_PARAM] = student_id
+    return student_id
+
+
+def _load_student_progress() -> None:
+    # Restore saved progress into session state; runs once per browser session.
+    store = get_progress_store()
+    writer = get_write_behind()
+    student_id = _current_student_id()
+
+    # A refresh starts a new session; let the previous one's buffered writes for this
+    # student land first. Other students' pending writes are not waited for.
+    writer.flush(timeout=5.0, student_id=student_id)
+    st.session_state._write_behind_token = token = _SessionToken()
+    weakref.finalize(token, writer.request_flush)
+    record = store.load_student(student_id) or store.claim_student(LEGACY_STUDENT_ID, student_id)
+
+    st.session_state.student_id = student_id
+
+    if record is None:
+        st.session_state.profile_data = _default_profile_data()
+        return
+
+    st.session_state.profile_data = {"name": record.name, "profile_pic": record.profile_pic}
+    if record.name.strip():
+        st.session_state.student_name = record.name.strip()
+
+    st.session_state.xp = record.xp
+    st.session_state.level = record.level
+    st.session_state.completed.update(record.completed)
+    st.session_state.quiz_completion.update(record.quiz_completion)
+    st.session_state.badges = list(record.badges)
+    activity_log = ActivityLog()
+    for item in store.load_activity(student_id):
+        activity_log.append(item.event, item.timestamp)
+    st.session_state.activity_log = activity_log
+
+
+def _student_record() -> StudentRecord:
+    profile_data = st.session_state.profile_data
+    return StudentRecord(
+        student_id=st.session_state.student_id,
+        name=profile_data.get("name", "") or "",
+        profile_pic=profile_data.get("profile_pic"),
+        xp=st.session_state.xp,
+        level=st.session_state.level,
+        completed=dict(st.session_state.completed),
+        quiz_completion=dict(st.session_state.quiz_completion),
+        badges=list(st.session_state.badges),
+    )
 
-    if not isinstance(data, dict):
-        return _default_profile_data()
 
-    return {
-        "name": data.get("name", "") or "",
-        "profile_pic": data.get("profile_pic"),
-    }
+def _persist_progress(activity: ActivityRecord | None = None) -> None:
+    # Queue the student's row (plus one new activity row) for the background writer.
+    if not get_write_behind().submit(_student_record(), activity):
+        st.warning("Progress is being saved slowly right now; some recent activity may not be kept.")
 
 
 def save_profile_data(profile_data: dict[str, Any]) -> None:
     # Persist profile details for future sessions.
-    with PROFILE_DATA_FILE.open("w", encoding="utf-8") as file:
-        json.dump(profile_data, file, ensure_ascii=False, indent=2)
+    st.session_state.profile_data = profile_data
+    _persist_progress()
 
 
 def init_app_state() -> None:
@@ -73,13 +372,9 @@ def init_app_state() -> None:
             else:
                 st.session_state[key] = value
 
+    # Saved progress is read from the database only on the session's first run.
     if "profile_data" not in st.session_state:
-        profile_data = load_profile_data()
-        st.session_state.profile_data = profile_data
-
-        saved_name = profile_data.get("name", "").strip()
-        if saved_name:
-            st.session_state.student_name = saved_name
+        _load_student_progress()
 
 
 def refresh_level() -> None:
@@ -89,12 +384,10 @@ def refresh_level() -> None:
 
 def log_activity(event: str) -> None:
     # Append timestamped activity events for the profile history table.
-    st.session_state.activity_log.append(
-        {
-            "time": datetime.now().strftime("%H:%M:%S"),
-            "event": event,
-        }
-    )
+    timestamp = int(time.time())
+    st.session_state.activity_log.append(event, timestamp)
+
+    _persist_progress(ActivityRecord(st.session_state.student_id, timestamp, event))
 
 
 def add_xp(amount: int, reason: str) -> None:
@@ -119,6 +412,7 @@ def mark_lesson_completed(lesson_name: str) -> bool:
         return False
 
     completed[lesson_name] = True
+    _persist_progress()
     return True
 
 
@@ -129,6 +423,7 @@ def mark_quiz_completed(lesson_name: str) -> bool:
         return False
 
     quiz_completion[lesson_name] = True
+    _persist_progress()
     return True
 
 
@@ -142,3 +437,203 @@ def navigate(page_key: str) -> None:
     # Switch active page key and force rerun for immediate navigation.
     st.session_state.active_page = page_key
     st.rerun()
+
+
+class Instrumentation:
+    # Per-session timing spans and counters, grouped by rerun.
+    # Work that finishes after a rerun (download builds) is recorded as a separate event.
+    def __init__(self, log_path: str | None) -> None:
+        self.log_path = log_path
+        self.reruns: deque[dict[str, Any]] = deque(maxlen=INSTRUMENT_HISTORY)
+        self.events: deque[dict[str, Any]] = deque(maxlen=INSTRUMENT_HISTORY)
+        self.current: dict[str, Any] | None = None
+        self._started = 0.0
+        self._depth = 0
+        self._lock = threading.Lock()
+
+    def begin_rerun(self) -> None:
+        self.current = {
+            "kind": "rerun",
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "spans": [],
+            "counters": {},
+        }
+        self._started = time.perf_counter()
+        self._depth = 0
+
+    def end_rerun(self, page: str) -> None:
+        if self.current is None:
+            return
+
+        record = self.current
+        record["page"] = page
+        record["total_ms"] = (time.perf_counter() - self._started) * 1000
+        self.current = None
+        self.reruns.append(record)
+        self._write(record)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        # Spans are listed in completion order; depth shows nesting.
+        if self.current is None:
+            yield
+            return
+
+        record = self.current
+        depth = self._depth
+        self._depth += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._depth = depth
+            record["spans"].append({"name": name, "depth": depth, "ms": (time.perf_counter() - started) * 1000})
+
+    def count(self, name: str, amount: int | float = 1) -> None:
+        if self.current is not None:
+            counters = self.current["counters"]
+            counters[name] = counters.get(name, 0) + amount
+
+    def event(self, name: str, elapsed_ms: float, counters: dict[str, int | float]) -> None:
+        record = {
+            "kind": "event",
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "name": name,
+            "ms": elapsed_ms,
+            "counters": counters,
+        }
+        with self._lock:
+            self.events.append(record)
+        self._write(record)
+
+    def _write(self, record: dict[str, Any]) -> None:
+        if not self.log_path:
+            return
+
+        with self._lock, open(self.log_path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record) + "\n")
+
+
+def instrumentation_enabled() -> bool:
+    return os.getenv(INSTRUMENT_ENV_VAR, "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def get_instrumentation() -> Instrumentation | None:
+    # Session instrumentation, or None when the env toggle is off.
+    if not instrumentation_enabled():
+        return None
+
+    if INSTRUMENT_STATE_KEY not in st.session_state:
+        st.session_state[INSTRUMENT_STATE_KEY] = Instrumentation(os.getenv(INSTRUMENT_LOG_ENV_VAR))
+
+    return st.session_state[INSTRUMENT_STATE_KEY]
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    # Time a block of the current rerun; a no-op when instrumentation is off.
+    instrumentation = get_instrumentation()
+    if instrumentation is None:
+        yield
+        return
+
+    with instrumentation.span(name):
+        yield
+
+
+def timed(name: str) -> Callable[[Callable[..., _T]], Callable[..., _T]]:
+    # Decorator form of span() for page functions.
+    def decorator(function: Callable[..., _T]) -> Callable[..., _T]:
+        @wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> _T:
+            with span(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def count(name: str, amount: int | float = 1) -> None:
+    # Add to a counter of the current rerun (cells evaluated, cache hits, ...).
+    instrumentation = get_instrumentation()
+    if instrumentation is not None:
+        instrumentation.count(name, amount)
+
+
+def track_bytes(name: str, build: Callable[[], bytes]) -> Callable[[], bytes]:
+    # Wrap a deferred byte builder (e.g. a download) so it is timed when it eventually runs.
+    # The session's instrumentation is captured now because the build runs off the script thread.
+    instrumentation = get_instrumentation()
+    if instrumentation is None:
+        return build
+
+    def tracked() -> bytes:
+        started = time.perf_counter()
+        data = build()
+        instrumentation.event(name, (time.perf_counter() - started) * 1000, {"bytes": len(data)})
+        return data
+
+    return tracked
+
+
+def import_page_module(module_path: str) -> ModuleType:
+    # Import a page module on first visit and record how long the cold import took.
+    module = sys.modules.get(module_path)
+    if module is not None:
+        return module
+
+    with span(f"import.{module_path}"):
+        started = time.perf_counter()
+        module = importlib.import_module(module_path)
+        PAGE_IMPORT_MS.setdefault(module_path, (time.perf_counter() - started) * 1000)
+
+    return module
+
+
+def render_instrumentation_panel() -> None:
+    # Debug sidebar panel with the latest rerun's spans and counters.
+    instrumentation = get_instrumentation()
+    if instrumentation is None or not instrumentation.reruns:
+        return
+
+    latest = instrumentation.reruns[-1]
+
+    with st.sidebar.expander("⏱ Performance", expanded=False):
+        st.caption(f"Last rerun ({latest['page']}): {latest['total_ms']:.1f} ms")
+        st.dataframe(
+            [{"span": "  " * item["depth"] + item["name"], "ms": round(item["ms"], 2)} for item in latest["spans"]],
+            hide_index=True,
+            use_container_width=True,
+        )
+
+        if latest["counters"]:
+            st.dataframe(
+                [{"counter": name, "value": value} for name, value in latest["counters"].items()],
+                hide_index=True,
+                use_container_width=True,
+            )
+
+        if instrumentation.events:
+            st.caption("Deferred work")
+            st.dataframe(
+                [
+                    {"event": item["name"], "ms": round(item["ms"], 2), **item["counters"]}
+                    for item in reversed(instrumentation.events)
+                ],
+                hide_index=True,
+                use_container_width=True,
+            )
+
+        if PAGE_IMPORT_MS:
+            st.caption("Page imports (first load in this process)")
+            st.dataframe(
+                [{"module": name, "ms": round(elapsed, 1)} for name, elapsed in PAGE_IMPORT_MS.items()],
+                hide_index=True,
+                use_container_width=True,
+            )
+
+        totals = ", ".join(f"{item['total_ms']:.0f}" for item in instrumentation.reruns)
+        st.caption(f"Recent rerun totals (ms): {totals}")
+        if instrumentation.log_path:
+            st.caption(f"Logging to `{instrumentation.log_path}`")
@@ -1,61 +1,161 @@
 import os
+import time
+from typing import Iterator
 
-import google.generativeai as genai
 import streamlit as st
 from dotenv import load_dotenv
 
-MODEL_NAME = "gemini-2.5-flash"
+from app_core import count, import_page_module, span
+from tutor_engine.backends import TutorBackend, create_backend
+from tutor_engine.broker import BrokerBusy, RequestBroker
+from tutor_engine.cache import ResponseCache, cache_key
+from tutor_engine.history import ConversationMemory
 
+# "gemini" (default) or "stub" for offline tests and load tests.
+BACKEND_ENV_VAR = "EXCELWARS_TUTOR_BACKEND"
+# Optional SQLite file so cached replies survive restarts; memory-only when unset.
+RESPONSE_CACHE_DB_ENV_VAR = "EXCELWARS_TUTOR_CACHE_DB"
+# Only the most recent messages are rendered; older ones are revealed a page at a time.
+CHAT_PAGE_SIZE = 20
 
-def _init_gemini() -> str | None:
-    # Load API key once per run and configure Gemini client.
+
+@st.cache_resource
+def _get_backend() -> TutorBackend | None:
+    # Read .env and configure the model once per process instead of on every rerun.
     load_dotenv(dotenv_path=".env")
-    api_key = os.getenv("GOOGLE_API_KEY")
+    return create_backend(os.getenv(BACKEND_ENV_VAR), os.getenv("GOOGLE_API_KEY"))
 
-    if api_key:
-        genai.configure(api_key=api_key)
 
-    return api_key
+@st.cache_resource
+def _get_broker() -> RequestBroker | None:
+    # Every session's model calls go through one broker, so class-wide bursts are
+    # coalesced, queued and kept within the API's concurrency and rate limits.
+    backend = _get_backend()
+    return RequestBroker(backend) if backend is not None else None
 
 
-def render() -> None:
-    # Chat page with in-session history plus a simple response cache.
-    st.title("🤖 Gemini Chatbot")
+@st.cache_resource
+def _get_response_cache() -> ResponseCache:
+    # One reply cache for every session in this process, so repeated class questions cost one call.
+    return ResponseCache(db_path=os.getenv(RESPONSE_CACHE_DB_ENV_VAR) or None)
+
+
+def _timed_chunks(chunks: Iterator[str]) -> Iterator[str]:
+    # Pass chunks through, recording time to the first one.
+    started = time.perf_counter()
+    first_chunk = True
+
+    for text in chunks:
+        if first_chunk:
+            count("chat.first_chunk_ms", (time.perf_counter() - started) * 1000)
+            first_chunk = False
 
-    api_key = _init_gemini()
+        yield text
 
+
+def _init_chat_state() -> None:
     if "chat_messages" not in st.session_state:
         st.session_state.chat_messages = []
 
-    if "chat_cache" not in st.session_state:
-        st.session_state.chat_cache = {}
+    if "chat_memory" not in st.session_state:
+        st.session_state.chat_memory = ConversationMemory()
+
+    if "chat_visible_messages" not in st.session_state:
+        st.session_state.chat_visible_messages = CHAT_PAGE_SIZE
+
 
-    for message in st.session_state.chat_messages:
+def _render_history() -> None:
+    # Render the latest page of messages; earlier ones stay collapsed until requested.
+    messages = st.session_state.chat_messages
+    visible = st.session_state.chat_visible_messages
+    hidden = max(0, len(messages) - visible)
+
+    if hidden and st.button(f"Show {min(hidden, CHAT_PAGE_SIZE)} earlier messages", key="chat_show_earlier"):
+        st.session_state.chat_visible_messages += CHAT_PAGE_SIZE
+        st.rerun()
+
+    for message in messages[hidden:]:
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
 
+
+def render() -> None:
+    # Chat page with paged history, multi-turn context and a shared response cache.
+    st.title("🤖 Gemini Chatbot")
+
+    broker = _get_broker()
+    response_cache = _get_response_cache()
+    _init_chat_state()
+
+    stats = response_cache.stats()
+    status = f"Shared reply cache: {stats.hits} hits, {stats.misses} misses, {stats.entries} stored"
+    if broker is not None:
+        broker_stats = broker.stats()
+        count("chat.queue_depth", broker_stats.queued)
+        status += f" · Tutor queue: {broker_stats.queued} waiting, {broker_stats.running} running"
+    st.caption(status)
+
+    mode_col, sheet_col, reset_col = st.columns([2, 2, 1])
+    multi_turn = mode_col.toggle("Remember conversation", value=True, key="chat_multi_turn")
+    attach_sheet = sheet_col.toggle("Attach my spreadsheet", value=False, key="chat_attach_sheet")
+    if reset_col.button("New Conversation", key="chat_reset", use_container_width=True):
+        st.session_state.chat_messages = []
+        st.session_state.chat_memory.reset()
+        st.session_state.chat_visible_messages = CHAT_PAGE_SIZE
+        st.rerun()
+
+    _render_history()
+
     user_input = st.chat_input("Type your message...")
 
     if not user_input:
         return
 
+    # Recent turns go verbatim and older ones as a short summary, within a token budget.
+    context = st.session_state.chat_memory.context_for(st.session_state.chat_messages) if multi_turn else None
+
     st.session_state.chat_messages.append({"role": "user", "content": user_input})
     with st.chat_message("user"):
         st.markdown(user_input)
 
-    if user_input in st.session_state.chat_cache:
-        bot_reply = st.session_state.chat_cache[user_input]
-    elif not api_key:
-        bot_reply = "GOOGLE_API_KEY is missing. Add it to `.env` to enable Gemini responses."
-    else:
-        try:
-            model = genai.GenerativeModel(MODEL_NAME)
-            response = model.generate_content(user_input)
-            bot_reply = response.text
-            st.session_state.chat_cache[user_input] = bot_reply
-        except Exception as error:  # noqa: BLE001
-            bot_reply = f"API error: {error}"
+    # The model sees a bounded digest of the sheet instead of tables pasted into the chat.
+    model_prompt = user_input
+    if attach_sheet:
+        with span("chat.sheet_digest"):
+            digest = import_page_module("app_pages.spreadsheet_lab").current_sheet_digest()
+        if digest is not None:
+            model_prompt = f"{user_input}\n\nMy current spreadsheet:\n{digest}"
+
+    # Replies are cached per backend, and per conversation context once there is one.
+    scope = broker.name if broker is not None else ""
+    if context is not None and not context.empty:
+        scope = f"{scope}:{context.digest()}"
+
+    prompt_key = cache_key(model_prompt, scope)
+    cached_reply = response_cache.get(prompt_key) if broker is not None else None
 
-    st.session_state.chat_messages.append({"role": "assistant", "content": bot_reply})
     with st.chat_message("assistant"):
-        st.markdown(bot_reply)
+        if cached_reply is not None:
+            bot_reply = cached_reply
+            count("chat.cache_hits")
+            st.markdown(bot_reply)
+        elif broker is None:
+            bot_reply = "GOOGLE_API_KEY is missing. Add it to `.env` and restart the app to enable Gemini responses."
+            st.markdown(bot_reply)
+        else:
+            try:
+                with span("chat.model_call"):
+                    # Chunks are rendered as they arrive; the assembled reply is cached as before.
+                    # Identical questions already in flight share one call.
+                    chunks = broker.stream_reply(prompt_key, model_prompt, context)
+                    bot_reply = st.write_stream(_timed_chunks(chunks))
+                count("chat.cache_misses")
+                response_cache.put(prompt_key, bot_reply)
+            except BrokerBusy as busy:
+                bot_reply = str(busy)
+                st.warning(bot_reply)
+            except Exception as error:  # noqa: BLE001
+                bot_reply = f"API error: {error}"
+                st.markdown(bot_reply)
+
+    st.session_state.chat_messages.append({"role": "assistant", "content": bot_reply})
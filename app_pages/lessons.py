@@ -7,6 +7,7 @@ from app_core import (
     award_badge,
     mark_lesson_completed,
     mark_quiz_completed,
+    timed,
 )
 
 LESSONS = {
@@ -43,6 +44,7 @@ LESSONS = {
 }
 
 
+@timed("lessons.quiz")
 def _render_quiz(lesson_name: str, quiz: dict[str, object]) -> None:
     # Render one lesson quiz and award XP only once per lesson.
     question = quiz["question"]
@@ -67,6 +69,7 @@ def _render_quiz(lesson_name: str, quiz: dict[str, object]) -> None:
             st.error("Not quite. Try again.")
 
 
+@timed("lessons.completion")
 def _render_completion(lesson_name: str) -> None:
     # Render lesson completion controls and first-time XP logic.
     if st.session_state.completed.get(lesson_name):
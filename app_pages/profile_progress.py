@@ -1,19 +1,21 @@
-from pathlib import Path
-
 import pandas as pd
 import streamlit as st
-from PIL import Image
 
+from activity_log import ActivityLog
 from app_core import (
-    PROFILE_PIC_FILE,
     XP_PER_LEVEL,
     get_profile_name,
     log_activity,
     navigate,
     save_profile_data,
+    timed,
 )
+from profile_images import is_image_id, save_profile_picture, thumbnail_bytes
+
+ACTIVITY_PAGE_SIZE = 20
 
 
+@timed("profile.profile_editor")
 def _render_profile_editor() -> None:
     # Edit and persist student name/profile picture.
     st.subheader("Student Profile")
@@ -33,9 +35,8 @@ def _render_profile_editor() -> None:
         st.session_state.student_name = normalized_name
 
         if uploaded_picture is not None:
-            image = Image.open(uploaded_picture)
-            image.save(PROFILE_PIC_FILE)
-            profile_data["profile_pic"] = str(PROFILE_PIC_FILE)
+            # Stored downscaled under its content hash, so students never overwrite each other's files.
+            profile_data["profile_pic"] = save_profile_picture(uploaded_picture)
 
         st.session_state.profile_data = profile_data
         save_profile_data(profile_data)
@@ -43,10 +44,13 @@ def _render_profile_editor() -> None:
         st.success("Profile saved.")
 
     saved_picture = profile_data.get("profile_pic")
-    if saved_picture and Path(saved_picture).exists():
-        st.image(saved_picture, width=160, caption="Current Profile Picture")
+    if is_image_id(saved_picture):
+        thumbnail = thumbnail_bytes(saved_picture)
+        if thumbnail is not None:
+            st.image(thumbnail, width=160, caption="Current Profile Picture")
 
 
+@timed("profile.progress_summary")
 def _render_progress_summary() -> None:
     # Show XP/level metrics and lesson completion at a glance.
     st.subheader("Progress Summary")
@@ -70,10 +74,11 @@ def _render_progress_summary() -> None:
     st.dataframe(pd.DataFrame(completion_rows), use_container_width=True, hide_index=True)
 
 
+@timed("profile.badges_and_log")
 def _render_badges_and_log() -> None:
     # Display earned badges and reverse-chronological activity history.
     badges = st.session_state.badges
-    activity_log = st.session_state.activity_log
+    activity_log: ActivityLog = st.session_state.activity_log
 
     st.subheader("Badges")
     if badges:
@@ -83,9 +88,16 @@ def _render_badges_and_log() -> None:
         st.info("No badges earned yet.")
 
     st.subheader("Activity Log")
-    if activity_log:
-        log_df = pd.DataFrame(activity_log[::-1])
+    if len(activity_log):
+        # The newest-first table is cached on the log; each rerun only slices one page of it.
+        page_count = activity_log.page_count(ACTIVITY_PAGE_SIZE)
+        page_number = 1
+        if page_count > 1:
+            page_number = st.number_input("Page", min_value=1, max_value=page_count, value=1, key="activity_log_page")
+
+        log_df = activity_log.page(int(page_number) - 1, ACTIVITY_PAGE_SIZE)
         st.dataframe(log_df, use_container_width=True, hide_index=True)
+        st.caption(f"{len(activity_log)} events, newest first")
     else:
         st.info("No activity recorded yet.")
 
@@ -1,381 +1,302 @@
 from __future__ import annotations
 
-import re
-from io import BytesIO
+from functools import partial
 from pathlib import Path
-from typing import Any
+from typing import Callable
 
-import numpy as np
 import pandas as pd
 import streamlit as st
 
+from app_core import count, span, timed, track_bytes
+from sheet_engine.digest import sheet_digest
+from sheet_engine.exporter import ExportCache, csv_bytes, workbook_xlsx_bytes
+from sheet_engine.formulas import column_name
+from sheet_engine.importer import WORKBOOK_EXTENSIONS, WorkbookFile, import_sheet
+from sheet_engine.recalc import SheetCalculator, WorkbookCalculator
+from sheet_engine.store import SheetStore
+from sheet_engine.workbook import SheetLoader, Workbook, sheet_key
+
 DEFAULT_ROWS = 12
 DEFAULT_COLS = 8
-SHEET_STATE_KEY = "spreadsheet_raw_data"
-
-RANGE_PATTERN = re.compile(r"\b([A-Z]+)([1-9]\d*):([A-Z]+)([1-9]\d*)\b")
-CELL_PATTERN = re.compile(r"\b([A-Z]+)([1-9]\d*)\b")
-
-
-def _column_name(index: int) -> str:
-    # Convert zero-based column index to Excel-style label (A, B, ..., AA).
-    label = ""
-    current = index + 1
-
-    while current:
-        current, remainder = divmod(current - 1, 26)
-        label = chr(65 + remainder) + label
-
-    return label
-
-
-def _column_index(column_name: str) -> int:
-    # Convert Excel-style label back to zero-based column index.
-    index = 0
-    for character in column_name:
-        index = index * 26 + (ord(character) - 64)
-    return index - 1
-
-
-def _normalize_cell(value: Any) -> str:
-    # Store every cell as a string to keep editor behavior predictable.
-    if value is None:
-        return ""
-
-    if isinstance(value, float) and np.isnan(value):
-        return ""
-
-    return str(value)
-
-
-def _build_blank_sheet(rows: int, cols: int) -> pd.DataFrame:
-    # Create a blank spreadsheet with Excel-like column names.
-    return pd.DataFrame(
-        "",
-        index=range(rows),
-        columns=[_column_name(i) for i in range(cols)],
-    )
-
-
-def _normalize_sheet(dataframe: pd.DataFrame) -> pd.DataFrame:
-    # Normalize imported/edited data into the app's sheet format.
-    normalized = dataframe.fillna("").copy()
-    normalized.columns = [_column_name(i) for i in range(len(normalized.columns))]
-
-    for column in normalized.columns:
-        normalized[column] = normalized[column].map(_normalize_cell)
-
-    return normalized.reset_index(drop=True)
-
-
-def _resize_sheet(dataframe: pd.DataFrame, rows: int, cols: int) -> pd.DataFrame:
-    # Resize while preserving existing values in the top-left region.
-    resized = _build_blank_sheet(rows, cols)
-
-    max_rows = min(rows, len(dataframe))
-    max_cols = min(cols, len(dataframe.columns))
-
-    for row_index in range(max_rows):
-        for col_index in range(max_cols):
-            resized.iat[row_index, col_index] = _normalize_cell(dataframe.iat[row_index, col_index])
+MAX_SHEET_ROWS = 50_000
+MAX_SHEET_COLS = 52
+# Sheets larger than one window are paged; only the visible block is sent to the browser.
+WINDOW_ROW_OPTIONS = (25, 50, 100, 200)
+DEFAULT_WINDOW_ROWS = 100
+WINDOW_COLS = 26
+WORKBOOK_STATE_KEY = "spreadsheet_workbook"
+# Kept apart from the tab widget's key, which Streamlit drops while another page is shown.
+ACTIVE_SHEET_STATE_KEY = "spreadsheet_active_sheet"
+# Names of imported sheets that were cut to the size limits when they were read.
+SHEET_TRUNCATED_STATE_KEY = "spreadsheet_truncated_sheets"
+SHEET_ENGINE_STATE_KEY = "spreadsheet_engine"
+SHEET_EXPORT_STATE_KEY = "spreadsheet_export_cache"
+SHEET_EXPORT_SNAPSHOT_STATE_KEY = "spreadsheet_export_snapshot"
+SHEET_DIGEST_STATE_KEY = "spreadsheet_digest"
+
+
+@timed("sheet.import")
+def _read_uploaded_sheet(uploaded_file) -> SheetStore:
+    # Stream CSV/XLSX into the typed sheet store, capped to the editor's size limits.
+    progress_bar = st.progress(0.0, text="Importing...")
+
+    def report(fraction: float, rows: int) -> None:
+        progress_bar.progress(fraction, text=f"Imported {rows:,} rows")
+
+    result = import_sheet(uploaded_file, MAX_SHEET_ROWS, MAX_SHEET_COLS, on_progress=report)
+    progress_bar.empty()
+
+    if result is None:
+        return SheetStore.blank(DEFAULT_ROWS, DEFAULT_COLS)
+
+    if result.truncated:
+        st.toast(f"File was larger than {MAX_SHEET_ROWS} rows x {MAX_SHEET_COLS} columns; extra cells were skipped.")
+
+    count("sheet.cells_imported", result.store.numbers.size)
+    return result.store
+
+
+def _workbook_loader(source: WorkbookFile) -> SheetLoader:
+    # Reads one sheet of an imported workbook when it is first opened or referenced.
+    # No Streamlit calls here: exports may load sheets from the download thread.
+    truncated: set[str] = set()
+    st.session_state[SHEET_TRUNCATED_STATE_KEY] = truncated
+
+    def load(sheet_name: str) -> SheetStore:
+        result = source.read_sheet(sheet_name, MAX_SHEET_ROWS, MAX_SHEET_COLS)
+        if result is None:
+            return SheetStore.blank(DEFAULT_ROWS, DEFAULT_COLS)
+        if result.truncated:
+            truncated.add(sheet_name)
+        return result.store
+
+    return load
+
+
+def _read_uploaded_workbook(uploaded_file) -> Workbook:
+    # CSV files become a one-sheet workbook; for workbook files only the sheet names are read now.
+    if Path(uploaded_file.name).suffix.lower() in WORKBOOK_EXTENSIONS:
+        source = WorkbookFile.from_upload(uploaded_file)
+        if source.sheet_names:
+            return Workbook.lazy(source.sheet_names, _workbook_loader(source))
+
+    return Workbook.single(_read_uploaded_sheet(uploaded_file))
+
+
+def _open_sheet(workbook: Workbook, sheet_name: str) -> SheetStore:
+    # Store of the sheet being shown, reading it from the imported file on first open.
+    if workbook.is_loaded(sheet_name):
+        return workbook.sheet(sheet_name)
+
+    with st.spinner(f"Loading {sheet_name}..."), span("sheet.import"):
+        store = workbook.sheet(sheet_name)
+
+    count("sheet.cells_imported", store.numbers.size)
+    if sheet_name in st.session_state.get(SHEET_TRUNCATED_STATE_KEY, ()):
+        st.toast(
+            f"{sheet_name} was larger than {MAX_SHEET_ROWS} rows x {MAX_SHEET_COLS} columns; "
+            "extra cells were skipped."
+        )
+    return store
 
-    return resized
 
+def _get_workbook_calculator() -> WorkbookCalculator:
+    if SHEET_ENGINE_STATE_KEY not in st.session_state:
+        st.session_state[SHEET_ENGINE_STATE_KEY] = WorkbookCalculator()
+    return st.session_state[SHEET_ENGINE_STATE_KEY]
 
-def _read_uploaded_sheet(uploaded_file) -> pd.DataFrame:
-    # Import CSV/XLSX into normalized internal sheet format.
-    extension = Path(uploaded_file.name).suffix.lower()
 
-    if extension in {".xlsx", ".xls"}:
-        imported = pd.read_excel(uploaded_file, header=None, dtype=str)
-    else:
-        imported = pd.read_csv(uploaded_file, header=None, dtype=str)
+def _recalculate(workbook: Workbook, sheet_name: str) -> SheetCalculator:
+    # Bring the session's calculators up to date, recomputing only what changed since last rerun.
+    # Sheets the shown sheet refers to are calculated too; other unread sheets stay unread.
+    book = _get_workbook_calculator()
 
-    if imported.empty:
-        return _build_blank_sheet(DEFAULT_ROWS, DEFAULT_COLS)
+    with span("sheet.recalc"):
+        book.update(workbook)
+        calculator = book.sheet(sheet_name)
 
-    imported.columns = [_column_name(i) for i in range(imported.shape[1])]
-    return _normalize_sheet(imported)
+    if book.last_evaluated:
+        count("sheet.cells_evaluated", book.last_evaluated)
+    if book.last_parsed:
+        count("sheet.formulas_parsed", book.last_parsed)
 
+    return calculator
 
-def _flatten(values):
-    # Flatten nested ranges/collections for aggregate functions.
-    for value in values:
-        if isinstance(value, (list, tuple, set, np.ndarray, pd.Series)):
-            yield from _flatten(value)
-        else:
-            yield value
 
+def _active_sheet(workbook: Workbook) -> str:
+    name = st.session_state.get(ACTIVE_SHEET_STATE_KEY)
+    if name is None or name not in workbook:
+        name = st.session_state[ACTIVE_SHEET_STATE_KEY] = workbook.sheet_names[0]
+    return workbook.name_of(name)
 
-def _to_number(value: Any) -> float | None:
-    # Convert compatible values to float; return None when non-numeric.
-    if isinstance(value, bool):
-        return float(int(value))
 
-    if isinstance(value, (int, float)):
-        if pd.isna(value):
-            return None
-        return float(value)
+def _show_sheet(sheet_name: str) -> None:
+    # Switch tabs on the next rerun; the tab widget re-reads its default once its state is gone.
+    st.session_state[ACTIVE_SHEET_STATE_KEY] = sheet_name
+    st.session_state.pop("sheet_tabs", None)
 
-    if value in (None, ""):
-        return None
 
-    try:
-        return float(str(value).strip())
-    except (TypeError, ValueError):
+def current_sheet_digest() -> str | None:
+    # Compact digest of the student's open sheet for the AI Tutor, rebuilt only when the workbook changes.
+    workbook: Workbook | None = st.session_state.get(WORKBOOK_STATE_KEY)
+    if workbook is None:
         return None
 
+    sheet_name = _active_sheet(workbook)
+    cached = st.session_state.get(SHEET_DIGEST_STATE_KEY)
+    if cached is not None and cached[0] == (workbook.version, sheet_name):
+        return cached[1]
+
+    digest = sheet_digest(_recalculate(workbook, sheet_name), workbook.sheet_names)
+    st.session_state[SHEET_DIGEST_STATE_KEY] = ((workbook.version, sheet_name), digest)
+    return digest
+
+
+def _render_window_controls(rows: int, cols: int) -> tuple[slice, slice]:
+    # Choose the visible block of the sheet; small sheets are shown whole.
+    if rows <= DEFAULT_WINDOW_ROWS and cols <= WINDOW_COLS:
+        return slice(0, rows), slice(0, cols)
+
+    # Clamp saved offsets so a sheet that shrank never exceeds the inputs' limits.
+    if st.session_state.get("sheet_window_row", 1) > rows:
+        st.session_state.sheet_window_row = 1
+    if st.session_state.get("sheet_window_col", 1) > cols:
+        st.session_state.sheet_window_col = 1
+
+    row_col, col_col, size_col = st.columns(3)
+    page_rows = size_col.selectbox(
+        "Rows per page",
+        WINDOW_ROW_OPTIONS,
+        index=WINDOW_ROW_OPTIONS.index(DEFAULT_WINDOW_ROWS),
+        key="sheet_window_size",
+    )
+    first_row = row_col.number_input("First row", min_value=1, max_value=rows, step=page_rows, key="sheet_window_row")
+    first_col = col_col.number_input("First column", min_value=1, max_value=cols, key="sheet_window_col")
 
-def _clean_numeric(value: float | int) -> float | int:
-    if isinstance(value, float) and value.is_integer():
-        return int(value)
-    return value
-
-
-def _numeric_values(args) -> list[float]:
-    # Extract only numeric values for SUM/AVERAGE/MIN/MAX/COUNT.
-    numbers: list[float] = []
-
-    for value in _flatten(args):
-        number = _to_number(value)
-        if number is not None:
-            numbers.append(number)
-
-    return numbers
-
-
-def fx_sum(*args):
-    numbers = _numeric_values(args)
-    return _clean_numeric(sum(numbers)) if numbers else 0
-
-
-def fx_average(*args):
-    numbers = _numeric_values(args)
-    if not numbers:
-        return 0
-    return _clean_numeric(sum(numbers) / len(numbers))
-
-
-def fx_min(*args):
-    numbers = _numeric_values(args)
-    return _clean_numeric(min(numbers)) if numbers else 0
-
-
-def fx_max(*args):
-    numbers = _numeric_values(args)
-    return _clean_numeric(max(numbers)) if numbers else 0
-
-
-def fx_count(*args):
-    return len(_numeric_values(args))
-
-
-def fx_round(value, digits=0):
-    number = _to_number(value)
-    if number is None:
-        return 0
-
-    digits_number = _to_number(digits) or 0
-    return _clean_numeric(round(number, int(digits_number)))
-
-
-def fx_if(condition, true_value, false_value):
-    return true_value if condition else false_value
-
-
-def fx_and(*args):
-    return all(bool(item) for item in _flatten(args))
-
-
-def fx_or(*args):
-    return any(bool(item) for item in _flatten(args))
-
-
-def fx_not(value):
-    return not bool(value)
-
-
-def fx_len(value):
-    return len(str(value))
-
-
-def fx_concat(*args):
-    return "".join(str(item) for item in _flatten(args) if item is not None)
-
-
-FUNCTION_MAP = {
-    "SUM": fx_sum,
-    "AVERAGE": fx_average,
-    "MIN": fx_min,
-    "MAX": fx_max,
-    "COUNT": fx_count,
-    "ROUND": fx_round,
-    "IF": fx_if,
-    "AND": fx_and,
-    "OR": fx_or,
-    "NOT": fx_not,
-    "LEN": fx_len,
-    "CONCAT": fx_concat,
-}
-
-FUNCTION_PATTERN = re.compile(
-    r"\b(" + "|".join(FUNCTION_MAP.keys()) + r")\b",
-    re.IGNORECASE,
-)
-
-
-def _parse_literal(value: Any):
-    text = _normalize_cell(value)
-    stripped = text.strip()
-
-    if stripped == "":
-        return ""
-
-    upper_value = stripped.upper()
-    if upper_value == "TRUE":
-        return True
-    if upper_value == "FALSE":
-        return False
-
-    number = _to_number(stripped)
-    if number is not None:
-        return _clean_numeric(number)
-
-    return text
-
-
-def _to_python_literal(value: Any) -> str:
-    if value in (None, ""):
-        return "0"
-
-    if isinstance(value, bool):
-        return "True" if value else "False"
-
-    if isinstance(value, (int, float)):
-        return repr(value)
-
-    return repr(str(value))
-
-
-def _evaluate_formula(
-    expression: str,
-    raw_df: pd.DataFrame,
-    memo: dict[tuple[int, int], Any],
-    stack: set[tuple[int, int]],
-):
-    # Evaluate a formula expression after replacing ranges/cell references.
-    range_placeholders: dict[str, str] = {}
-
-    def replace_range(match: re.Match[str]) -> str:
-        start_col_name, start_row_str, end_col_name, end_row_str = match.groups()
-
-        start_col = _column_index(start_col_name)
-        end_col = _column_index(end_col_name)
-        start_row = int(start_row_str) - 1
-        end_row = int(end_row_str) - 1
-
-        col_from, col_to = sorted((start_col, end_col))
-        row_from, row_to = sorted((start_row, end_row))
-
-        values = []
-        for row_index in range(row_from, row_to + 1):
-            for col_index in range(col_from, col_to + 1):
-                values.append(_evaluate_cell(raw_df, row_index, col_index, memo, stack))
-
-        token = f"__RANGE_TOKEN_{len(range_placeholders)}__"
-        range_placeholders[token] = repr(values)
-        return token
-
-    def replace_cell(match: re.Match[str]) -> str:
-        col_name, row_str = match.groups()
-        col_index = _column_index(col_name)
-        row_index = int(row_str) - 1
-
-        value = _evaluate_cell(raw_df, row_index, col_index, memo, stack)
-        return _to_python_literal(value)
-
-    expression = expression.replace("^", "**")
-    # Replace ranges first (A1:B3), then single-cell references.
-    expression = RANGE_PATTERN.sub(replace_range, expression)
-    expression = CELL_PATTERN.sub(replace_cell, expression)
-
-    for token, replacement in range_placeholders.items():
-        expression = expression.replace(token, replacement)
-
-    expression = FUNCTION_PATTERN.sub(lambda m: f"FUNCTION_MAP['{m.group(1).upper()}']", expression)
-
-    try:
-        result = eval(expression, {"__builtins__": {}}, {"FUNCTION_MAP": FUNCTION_MAP})
-    except Exception:  # noqa: BLE001
-        return "ERR"
-
-    if isinstance(result, float) and result.is_integer():
-        return int(result)
-
-    if isinstance(result, list):
-        return ", ".join(str(item) for item in result)
-
-    return result
-
-
-def _evaluate_cell(
-    raw_df: pd.DataFrame,
-    row_index: int,
-    col_index: int,
-    memo: dict[tuple[int, int], Any],
-    stack: set[tuple[int, int]],
-):
-    # Recursively evaluate one cell and memoize result for efficiency.
-    if row_index < 0 or col_index < 0:
-        return 0
+    row_start = int(first_row) - 1
+    col_start = int(first_col) - 1
+    row_stop = min(rows, row_start + page_rows)
+    col_stop = min(cols, col_start + WINDOW_COLS)
 
-    if row_index >= len(raw_df) or col_index >= len(raw_df.columns):
-        return 0
+    st.caption(
+        f"Showing rows {row_start + 1:,}-{row_stop:,} of {rows:,}, "
+        f"columns {column_name(col_start)}-{column_name(col_stop - 1)} of {column_name(cols - 1)}"
+    )
+    return slice(row_start, row_stop), slice(col_start, col_stop)
+
+
+def _get_export_cache() -> ExportCache:
+    if SHEET_EXPORT_STATE_KEY not in st.session_state:
+        st.session_state[SHEET_EXPORT_STATE_KEY] = ExportCache()
+    return st.session_state[SHEET_EXPORT_STATE_KEY]
+
+
+def _unread_sheet_frame(loader: SheetLoader, sheet_name: str, export_mode: str) -> pd.DataFrame:
+    # Unread imported sheets hold plain values; read them into objects no other thread sees.
+    store = loader(sheet_name)
+    if export_mode == "Calculated values":
+        calculator = SheetCalculator(sheet_name)
+        calculator.update(store)
+        return calculator.preview_frame()
+    return store.to_frame()
+
+
+def _sheet_exports(workbook: Workbook, export_mode: str) -> list[tuple[str, Callable[[], pd.DataFrame]]]:
+    # (name, frame builder) per sheet. Downloads run the builders on Streamlit's worker thread
+    # while the rerun a click triggers edits and recalculates the workbook, so builders only
+    # read copies taken here, reused until the workbook changes, or the imported file.
+    key = (workbook.version, export_mode, tuple(name for name, _ in workbook.loaded_sheets()))
+    cached = st.session_state.get(SHEET_EXPORT_SNAPSHOT_STATE_KEY)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    book = _get_workbook_calculator()
+    loader = workbook.loader
+    exports: list[tuple[str, Callable[[], pd.DataFrame]]] = []
+    for name in workbook.sheet_names:
+        if not workbook.is_loaded(name):
+            exports.append((name, partial(_unread_sheet_frame, loader, name, export_mode)))
+        elif export_mode == "Calculated values":
+            exports.append((name, book.sheet(name).snapshot().frame))
+        else:
+            exports.append((name, workbook.sheet(name).copy().to_frame))
 
-    cell_key = (row_index, col_index)
-    if cell_key in memo:
-        return memo[cell_key]
+    st.session_state[SHEET_EXPORT_SNAPSHOT_STATE_KEY] = (key, exports)
+    return exports
 
-    if cell_key in stack:
-        # Circular references are surfaced to users as an explicit marker.
-        return "#CYCLE!"
 
-    stack.add(cell_key)
+def _render_sheet_controls(workbook: Workbook, sheet_name: str) -> None:
+    # Add a named sheet or remove the open one.
+    name_col, add_col, remove_col = st.columns([2, 1, 1], vertical_alignment="bottom")
 
-    raw_value = _normalize_cell(raw_df.iat[row_index, col_index])
+    new_name = name_col.text_input("New sheet name", placeholder=workbook.next_sheet_name(), key="sheet_new_name")
+    if add_col.button("Add Sheet", key="sheet_add", use_container_width=True):
+        try:
+            added = workbook.add_sheet(new_name or workbook.next_sheet_name(), SheetStore.blank(DEFAULT_ROWS, DEFAULT_COLS))
+        except ValueError as error:
+            st.error(str(error))
+        else:
+            _show_sheet(added)
+            st.rerun()
 
-    if raw_value.startswith("="):
-        value = _evaluate_formula(raw_value[1:].strip(), raw_df, memo, stack)
+    if remove_col.button(
+        f"Remove {sheet_name}",
+        key="sheet_remove",
+        disabled=len(workbook) == 1,
+        use_container_width=True,
+    ):
+        workbook.remove_sheet(sheet_name)
+        _show_sheet(workbook.sheet_names[0])
+        st.rerun()
+
+
+def _render_structure_controls(workbook: Workbook, sheet_name: str) -> None:
+    # Insert or delete whole rows/columns; formulas on every sheet are rewritten to follow the cells.
+    store = workbook.sheet(sheet_name)
+    rows = store.shape[0]
+    if st.session_state.get("sheet_structure_row", 1) > rows:
+        st.session_state.sheet_structure_row = rows
+
+    target_col, position_col, amount_col = st.columns(3)
+
+    target = target_col.radio("Target", ["Rows", "Columns"], horizontal=True, key="sheet_structure_target")
+    if target == "Rows":
+        axis, limit = 0, MAX_SHEET_ROWS
+        position = position_col.number_input("At row", min_value=1, max_value=rows, key="sheet_structure_row") - 1
     else:
-        value = _parse_literal(raw_value)
-
-    stack.remove(cell_key)
-    memo[cell_key] = value
-    return value
-
+        axis, limit = 1, MAX_SHEET_COLS
+        labels = store.columns
+        position = labels.index(position_col.selectbox("At column", labels, key="sheet_structure_col"))
 
-def _calculate_preview(raw_df: pd.DataFrame) -> pd.DataFrame:
-    # Return a fully evaluated copy of the raw sheet.
-    preview_df = raw_df.copy()
-    memo: dict[tuple[int, int], Any] = {}
+    amount = int(amount_col.number_input("Count", min_value=1, max_value=limit, key="sheet_structure_count"))
+    size = store.shape[axis]
+    insert_col, delete_col = st.columns(2)
 
-    for row_index in range(len(raw_df)):
-        for col_index in range(len(raw_df.columns)):
-            preview_df.iat[row_index, col_index] = _evaluate_cell(raw_df, row_index, col_index, memo, set())
+    if insert_col.button("Insert Before", key="sheet_structure_insert", use_container_width=True):
+        if size + amount > limit:
+            st.error(f"Sheets are limited to {limit:,} {target.lower()}.")
+        else:
+            workbook.insert(sheet_name, axis, int(position), amount)
+            st.rerun()
 
-    return preview_df
+    if delete_col.button("Delete", key="sheet_structure_delete", use_container_width=True):
+        if int(position) == 0 and amount >= size:
+            st.error(f"A sheet needs at least one of its {target.lower()}.")
+        else:
+            workbook.delete(sheet_name, axis, int(position), amount)
+            st.rerun()
 
 
 def _init_sheet_state() -> None:
-    # Create initial blank sheet on first load.
-    if SHEET_STATE_KEY not in st.session_state:
-        st.session_state[SHEET_STATE_KEY] = _build_blank_sheet(DEFAULT_ROWS, DEFAULT_COLS)
+    # Create initial one-sheet workbook on first load.
+    if WORKBOOK_STATE_KEY not in st.session_state:
+        st.session_state[WORKBOOK_STATE_KEY] = Workbook.single(SheetStore.blank(DEFAULT_ROWS, DEFAULT_COLS))
 
 
 def render() -> None:
     # Spreadsheet page: edit, calculate, import, resize, and export.
     st.title("🧮 Spreadsheet Lab")
-    st.write("Single-grid spreadsheet editor with Excel-style formulas.")
+    st.write("Multi-sheet spreadsheet editor with Excel-style formulas.")
 
     _init_sheet_state()
 
@@ -386,82 +307,131 @@ def render() -> None:
         uploaded_file = st.file_uploader("Import CSV/XLSX", type=["csv", "xlsx", "xls"])
         if uploaded_file is not None and st.button("Import File", key="sheet_import"):
             try:
-                st.session_state[SHEET_STATE_KEY] = _read_uploaded_sheet(uploaded_file)
+                workbook = _read_uploaded_workbook(uploaded_file)
+                st.session_state[WORKBOOK_STATE_KEY] = workbook
+                _show_sheet(workbook.sheet_names[0])
                 st.success("Sheet imported.")
                 st.rerun()
             except Exception as error:  # noqa: BLE001
                 st.error(f"Could not import file: {error}")
 
     with new_sheet_col:
-        if st.button("New Blank Sheet", use_container_width=True):
-            st.session_state[SHEET_STATE_KEY] = _build_blank_sheet(DEFAULT_ROWS, DEFAULT_COLS)
+        if st.button("New Blank Workbook", use_container_width=True):
+            st.session_state[WORKBOOK_STATE_KEY] = Workbook.single(SheetStore.blank(DEFAULT_ROWS, DEFAULT_COLS))
+            _show_sheet("Sheet1")
             st.rerun()
 
     with help_col:
-        st.caption("Examples: `=SUM(A1:A5)`, `=A1+B1`, `=IF(A1>50,\"Pass\",\"Fail\")`")
+        st.caption(
+            "Examples: `=SUM(A1:A5)`, `=A1+B1`, `=Sheet2!B3*2`, `=IF(A1>50,\"Pass\",\"Fail\")`, "
+            "`=VLOOKUP(\"Ann\",A1:C20,3,FALSE)`, `=COUNTIF(B1:B20,\">50\")`, `=SORT(A2:B20,2,-1)`"
+        )
 
-    raw_df = st.session_state[SHEET_STATE_KEY]
+    workbook: Workbook = st.session_state[WORKBOOK_STATE_KEY]
+    sheet_names = workbook.sheet_names
+    active_sheet = _active_sheet(workbook)
+
+    # A radio rather than st.tabs: tabs would render (and so read) every sheet on each rerun.
+    sheet_name = st.radio(
+        "Sheet",
+        sheet_names,
+        index=sheet_names.index(active_sheet),
+        horizontal=True,
+        key="sheet_tabs",
+    )
+    st.session_state[ACTIVE_SHEET_STATE_KEY] = sheet_name
+    store = _open_sheet(workbook, sheet_name)
+    # Widget keys are per sheet so edits never replay onto another sheet.
+    sheet_id = sheet_key(sheet_name)
+
+    with st.expander("Sheets"):
+        _render_sheet_controls(workbook, sheet_name)
 
     with st.expander("Sheet Size"):
-        current_rows = len(raw_df)
-        current_cols = len(raw_df.columns)
+        current_rows, current_cols = store.shape
 
-        resize_rows = st.number_input("Rows", min_value=1, max_value=300, value=current_rows)
-        resize_cols = st.number_input("Columns", min_value=1, max_value=52, value=current_cols)
+        resize_rows = st.number_input("Rows", min_value=1, max_value=MAX_SHEET_ROWS, value=current_rows)
+        resize_cols = st.number_input("Columns", min_value=1, max_value=MAX_SHEET_COLS, value=current_cols)
 
         if st.button("Apply Size", key="apply_sheet_size"):
-            st.session_state[SHEET_STATE_KEY] = _resize_sheet(raw_df, int(resize_rows), int(resize_cols))
+            store.resize(int(resize_rows), int(resize_cols))
             st.rerun()
 
+    with st.expander("Insert / Delete"):
+        _render_structure_controls(workbook, sheet_name)
+
     mode = st.radio(
         "Grid Mode",
         ["Edit Values/Formulas", "Calculated Preview"],
         horizontal=True,
     )
 
-    raw_df = st.session_state[SHEET_STATE_KEY]
+    rows, cols = store.shape
+    row_window, col_window = _render_window_controls(rows, cols)
+    full_view = (row_window.stop - row_window.start, col_window.stop - col_window.start) == (rows, cols)
 
     if mode == "Edit Values/Formulas":
         # Raw mode keeps formulas visible/editable exactly like typed values.
-        edited_df = st.data_editor(
-            raw_df,
-            num_rows="dynamic",
-            use_container_width=True,
-            key="spreadsheet_editor",
-        )
-        st.session_state[SHEET_STATE_KEY] = _normalize_sheet(edited_df)
-        preview_df = _calculate_preview(st.session_state[SHEET_STATE_KEY])
+        with span("sheet.editor"):
+            if full_view:
+                edited_df = st.data_editor(
+                    store.to_frame(),
+                    num_rows="dynamic",
+                    use_container_width=True,
+                    key=f"spreadsheet_editor_{sheet_id}",
+                )
+                store.apply_frame(edited_df)
+            else:
+                # Each window gets its own editor state so edits never replay onto another block.
+                edited_df = st.data_editor(
+                    store.window_frame(row_window, col_window),
+                    use_container_width=True,
+                    key=f"spreadsheet_editor_{sheet_id}_{row_window.start}_{row_window.stop}_{col_window.start}",
+                )
+                store.apply_window(edited_df, row_window.start, col_window.start)
+
+        calculator = _recalculate(workbook, sheet_name)
     else:
         # Preview mode shows evaluated values without mutating raw formulas.
-        preview_df = _calculate_preview(raw_df)
-        st.data_editor(
-            preview_df,
-            disabled=True,
-            use_container_width=True,
-            key="spreadsheet_preview",
-        )
+        calculator = _recalculate(workbook, sheet_name)
+        with span("sheet.preview"):
+            st.data_editor(
+                calculator.preview_frame() if full_view else calculator.preview_frame(row_window, col_window),
+                disabled=True,
+                use_container_width=True,
+                key=f"spreadsheet_preview_{sheet_id}",
+            )
 
     export_mode = st.selectbox(
         "Export Content",
         ["Calculated values", "Raw values/formulas"],
     )
 
-    export_df = preview_df if export_mode == "Calculated values" else st.session_state[SHEET_STATE_KEY]
-
-    excel_buffer = BytesIO()
-    export_df.to_excel(excel_buffer, index=False, header=False)
+    sheet_exports = _sheet_exports(workbook, export_mode)
+    sheet_frame = dict(sheet_exports)[sheet_name]
+    export_cache = _get_export_cache()
 
+    # Export bytes are built on click and reused until the workbook changes.
     st.download_button(
-        "Download XLSX",
-        data=excel_buffer.getvalue(),
-        file_name="excelwars_sheet.xlsx",
+        "Download XLSX (all sheets)",
+        data=export_cache.deferred(
+            export_mode,
+            "xlsx",
+            workbook.version,
+            track_bytes("sheet.export.xlsx", lambda: workbook_xlsx_bytes((name, frame()) for name, frame in sheet_exports)),
+        ),
+        file_name="excelwars_workbook.xlsx",
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     )
 
-    csv_data = export_df.to_csv(index=False, header=False).encode("utf-8")
     st.download_button(
-        "Download CSV",
-        data=csv_data,
-        file_name="excelwars_sheet.csv",
+        f"Download CSV ({sheet_name})",
+        data=export_cache.deferred(
+            f"{export_mode}/{sheet_id}",
+            "csv",
+            workbook.version,
+            track_bytes("sheet.export.csv", lambda: csv_bytes(sheet_frame())),
+        ),
+        file_name=f"excelwars_{sheet_name}.csv",
         mime="text/csv",
     )
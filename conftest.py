@@ -0,0 +1 @@
+# Lets a bare `pytest` import the top-level packages (sheet_engine, tutor_engine, ...).
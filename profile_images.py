@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+PROFILE_IMAGE_DIR_ENV_VAR = "EXCELWARS_PROFILE_IMAGE_DIR"
+DEFAULT_PROFILE_IMAGE_DIR = "profile_images"
+# Uploads are downscaled to fit this box and re-encoded before they are stored.
+MAX_IMAGE_SIDE = 512
+THUMBNAIL_SIZES = (160,)
+JPEG_QUALITY = 85
+THUMBNAIL_CACHE_BYTES = 8 * 1024 * 1024
+
+
+class _ByteLRU:
+    # Thread-safe LRU of encoded images, bounded by total bytes.
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+
+_thumbnail_cache = _ByteLRU(THUMBNAIL_CACHE_BYTES)
+
+
+def image_dir() -> Path:
+    return Path(os.getenv(PROFILE_IMAGE_DIR_ENV_VAR) or DEFAULT_PROFILE_IMAGE_DIR)
+
+
+def _encode(image: Image.Image) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def _write_once(path: Path, data: bytes) -> None:
+    # Content-addressed files never change, so an existing file is already correct.
+    # Writing through a temporary name keeps readers from seeing a partial file.
+    if path.exists():
+        return
+
+    temporary = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    temporary.write_bytes(data)
+    os.replace(temporary, path)
+
+
+def _thumbnail_path(image_id: str, size: int) -> Path:
+    return image_dir() / f"{image_id}_{size}.jpg"
+
+
+def save_profile_picture(uploaded_file: BinaryIO) -> str:
+    # Normalize an upload (orientation, RGB, at most MAX_IMAGE_SIDE) and store it under the
+    # hash of the normalized bytes along with its thumbnails. Returns the image id.
+    # PIL is imported on the first upload, so pages that only show pictures never load it.
+    from PIL import Image, ImageOps
+
+    with Image.open(uploaded_file) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode in ("RGBA", "LA", "P"):
+            # JPEG has no alpha channel; flatten transparent areas onto white.
+            background = Image.new("RGB", image.size, "white")
+            image = image.convert("RGBA")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        else:
+            image = image.convert("RGB")
+
+    image.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE))
+    data = _encode(image)
+    image_id = hashlib.sha256(data).hexdigest()[:32]
+
+    directory = image_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    _write_once(directory / f"{image_id}.jpg", data)
+
+    for size in THUMBNAIL_SIZES:
+        thumbnail = image.copy()
+        thumbnail.thumbnail((size, size))
+        thumbnail_data = _encode(thumbnail)
+        _write_once(_thumbnail_path(image_id, size), thumbnail_data)
+        _thumbnail_cache.put(f"{image_id}_{size}", thumbnail_data)
+
+    return image_id
+
+
+def is_image_id(value: str | None) -> bool:
+    return bool(value) and len(value) == 32 and all(character in "0123456789abcdef" for character in value)
+
+
+def thumbnail_bytes(image_id: str, size: int = THUMBNAIL_SIZES[0]) -> bytes | None:
+    # Pre-generated thumbnail bytes, served from memory after the first read.
+    key = f"{image_id}_{size}"
+    data = _thumbnail_cache.get(key)
+    if data is not None:
+        return data
+
+    path = _thumbnail_path(image_id, size)
+    if not path.exists():
+        return None
+
+    data = path.read_bytes()
+    _thumbnail_cache.put(key, data)
+    return data
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import json
+import queue
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+
+DEFAULT_POOL_SIZE = 4
+# Only the most recent activity is loaded into a session; older rows stay on disk.
+ACTIVITY_LOAD_LIMIT = 500
+# Progress imported from the single shared profile of older versions waits under this id
+# until a student without saved progress claims it.
+LEGACY_STUDENT_ID = "legacy"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    student_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL DEFAULT '',
+    profile_pic TEXT,
+    xp INTEGER NOT NULL DEFAULT 0,
+    level INTEGER NOT NULL DEFAULT 1,
+    completed TEXT NOT NULL DEFAULT '{}',
+    quiz_completion TEXT NOT NULL DEFAULT '{}',
+    badges TEXT NOT NULL DEFAULT '[]',
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS activity (
+    student_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    time INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    PRIMARY KEY (student_id, seq)
+);
+"""
+
+
+@dataclass
+class StudentRecord:
+    student_id: str
+    name: str = ""
+    profile_pic: str | None = None
+    xp: int = 0
+    level: int = 1
+    completed: dict[str, bool] = field(default_factory=dict)
+    quiz_completion: dict[str, bool] = field(default_factory=dict)
+    badges: list[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class ActivityRecord:
+    # seq orders a student's events. New records leave it None; write_batch numbers them
+    # inside its transaction, so sessions sharing a student id never reuse a seq.
+    student_id: str
+    timestamp: int  # epoch seconds
+    event: str
+    seq: int | None = None
+
+
+class ProgressStore:
+    # Per-student progress in SQLite (WAL mode) with an append-only activity table.
+    # A small pool of connections is shared by all sessions in the process.
+    def __init__(self, path: str, pool_size: int = DEFAULT_POOL_SIZE) -> None:
+        self.path = path
+        self._pool: queue.Queue[sqlite3.Connection] = queue.Queue()
+
+        for _ in range(pool_size):
+            connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # WAL with synchronous=NORMAL stays consistent after a crash and avoids an fsync per commit.
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._pool.put(connection)
+
+        with self.connection() as connection:
+            connection.executescript(_SCHEMA)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        connection = self._pool.get()
+        try:
+            yield connection
+        finally:
+            self._pool.put(connection)
+
+    def load_student(self, student_id: str) -> StudentRecord | None:
+        with self.connection() as connection:
+            row = connection.execute(
+                "SELECT name, profile_pic, xp, level, completed, quiz_completion, badges "
+                "FROM students WHERE student_id = ?",
+                (student_id,),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        name, profile_pic, xp, level, completed, quiz_completion, badges = row
+        return StudentRecord(
+            student_id,
+            name,
+            profile_pic,
+            xp,
+            level,
+            json.loads(completed),
+            json.loads(quiz_completion),
+            json.loads(badges),
+        )
+
+    def load_activity(self, student_id: str, limit: int = ACTIVITY_LOAD_LIMIT) -> list[ActivityRecord]:
+        # Most recent `limit` events, oldest first.
+        with self.connection() as connection:
+            rows = connection.execute(
+                "SELECT seq, time, event FROM activity WHERE student_id = ? ORDER BY seq DESC LIMIT ?",
+                (student_id, limit),
+            ).fetchall()
+
+        return [ActivityRecord(student_id, event_time, event, seq) for seq, event_time, event in reversed(rows)]
+
+    def claim_student(self, old_id: str, new_id: str) -> StudentRecord | None:
+        # Move old_id's progress to new_id unless new_id already has some. Returns the moved
+        # record, or None when there was nothing to move; only one caller can claim a row.
+        with self.connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                moved = connection.execute(
+                    "UPDATE students SET student_id = ? WHERE student_id = ? "
+                    "AND NOT EXISTS (SELECT 1 FROM students WHERE student_id = ?)",
+                    (new_id, old_id, new_id),
+                ).rowcount
+                if moved:
+                    connection.execute("UPDATE activity SET student_id = ? WHERE student_id = ?", (new_id, old_id))
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+        return self.load_student(new_id) if moved else None
+
+    def write_batch(self, students: Iterable[StudentRecord] = (), activities: Iterable[ActivityRecord] = ()) -> None:
+        # Upsert student rows and append activity rows in one transaction.
+        now = time.time()
+        student_rows = [
+            (
+                student.student_id,
+                student.name,
+                student.profile_pic,
+                student.xp,
+                student.level,
+                json.dumps(student.completed),
+                json.dumps(student.quiz_completion),
+                json.dumps(student.badges),
+                now,
+            )
+            for student in students
+        ]
+        activity_rows = [(item.student_id, item.timestamp, item.event, item.student_id) for item in activities]
+
+        if not student_rows and not activity_rows:
+            return
+
+        with self.connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.executemany(
+                    "INSERT INTO students "
+                    "(student_id, name, profile_pic, xp, level, completed, quiz_completion, badges, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(student_id) DO UPDATE SET name = excluded.name, "
+                    "profile_pic = excluded.profile_pic, xp = excluded.xp, level = excluded.level, "
+                    "completed = excluded.completed, quiz_completion = excluded.quiz_completion, "
+                    "badges = excluded.badges, updated_at = excluded.updated_at",
+                    student_rows,
+                )
+                # Each row takes the next seq of its student; the write lock held since
+                # BEGIN IMMEDIATE keeps another writer from taking the same one.
+                connection.executemany(
+                    "INSERT INTO activity (student_id, seq, time, event) "
+                    "SELECT ?, COALESCE(MAX(seq) + 1, 0), ?, ? FROM activity WHERE student_id = ?",
+                    activity_rows,
+                )
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
@@ -0,0 +1 @@
+# Formula engine and sheet storage for the Spreadsheet Lab.
@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from io import BytesIO
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from sheet_engine.exporter import csv_bytes, workbook_xlsx_bytes
+from sheet_engine.formulas import column_name, compile_formula
+from sheet_engine.importer import import_sheet
+from sheet_engine.recalc import SheetCalculator
+from sheet_engine.store import SheetStore
+
+# Headless timings for the spreadsheet engine:
+#     python -m sheet_engine.benchmark --sizes 300x52 --output bench.json
+# Results are JSON so runs from different releases can be compared with --baseline.
+
+DEFAULT_SIZES = ((100, 10), (300, 52), (2000, 26))
+DEFAULT_REPEAT = 5
+# A timing counts as a regression when it is this much slower than the baseline.
+DEFAULT_THRESHOLD = 1.25
+# Import/export of the largest sizes dominates run time, so they can be skipped.
+OPERATIONS = ("parse", "full_recalc", "incremental_recalc", "import_csv", "import_xlsx", "export_csv", "export_xlsx")
+
+
+def _dense_literals(rows: int, cols: int, rng: np.random.Generator) -> np.ndarray:
+    # Numbers and short words only; measures the literal path of every stage.
+    grid = rng.integers(0, 1000, size=(rows, cols)).astype(str).astype(object)
+    words = rng.random((rows, cols)) < 0.1
+    grid[words] = "item"
+    return grid
+
+
+def _dependency_chain(rows: int, cols: int, rng: np.random.Generator) -> np.ndarray:
+    # One chain through every cell in column-major order: each cell adds one to the previous.
+    grid = np.empty((rows, cols), dtype=object)
+    grid[0, 0] = "1"
+
+    for col in range(cols):
+        for row in range(rows):
+            if (row, col) == (0, 0):
+                continue
+            previous = (row - 1, col) if row else (rows - 1, col - 1)
+            grid[row, col] = f"={column_name(previous[1])}{previous[0] + 1}+1"
+
+    return grid
+
+
+def _wide_sums(rows: int, cols: int, rng: np.random.Generator) -> np.ndarray:
+    # Literal body with a last row of column totals and a last column of row totals.
+    grid = _dense_literals(rows, cols, rng)
+    grid[grid == "item"] = "1"
+    last_row, last_col = rows - 1, cols - 1
+    last_label = column_name(last_col - 1)
+
+    for col in range(cols):
+        label = column_name(col)
+        grid[last_row, col] = f"=SUM({label}1:{label}{last_row})"
+    for row in range(last_row):
+        grid[row, last_col] = f"=SUM(A{row + 1}:{last_label}{row + 1})"
+
+    return grid
+
+
+def _cyclic_references(rows: int, cols: int, rng: np.random.Generator) -> np.ndarray:
+    # Every row holds a two-cell cycle plus formulas that depend on it.
+    grid = _dense_literals(rows, cols, rng)
+
+    for row in range(rows):
+        number = row + 1
+        grid[row, 0] = f"=B{number}+1"
+        grid[row, 1] = f"=A{number}+1"
+        for col in range(2, min(cols, 4)):
+            grid[row, col] = f"={column_name(col - 1)}{number}*2"
+
+    return grid
+
+
+def _mixed_text(rows: int, cols: int, rng: np.random.Generator) -> np.ndarray:
+    # Literal scores in column A; IF and CONCAT formulas reading them in the other columns.
+    grid = np.empty((rows, cols), dtype=object)
+    grid[:, 0] = rng.integers(0, 100, size=rows).astype(str)
+
+    for row in range(rows):
+        number = row + 1
+        for col in range(1, cols):
+            if col % 2:
+                grid[row, col] = f'=IF(A{number}>50,"Pass","Fail")'
+            else:
+                grid[row, col] = f'=CONCAT({column_name(col - 1)}{number}," (",A{number},")")'
+
+    return grid
+
+
+def _lookups(rows: int, cols: int, rng: np.random.Generator) -> np.ndarray:
+    # A key/amount table in columns A:B; the other columns look keys up and count or sum
+    # by criteria over the whole table, so every formula reads the same two ranges.
+    grid = np.empty((rows, cols), dtype=object)
+    grid[:, 0] = [f"key{row}" for row in range(rows)]
+    grid[:, 1] = rng.integers(0, 1000, size=rows).astype(str)
+    table = f"$A$1:$B${rows}"
+    amounts = f"$B$1:$B${rows}"
+
+    for row in range(rows):
+        key = f'"key{rng.integers(0, rows)}"'
+        for col in range(2, cols):
+            kind = col % 4
+            if kind == 0:
+                grid[row, col] = f"=VLOOKUP({key},{table},2,FALSE)"
+            elif kind == 1:
+                grid[row, col] = f'=COUNTIF({amounts},">{rng.integers(0, 1000)}")'
+            elif kind == 2:
+                grid[row, col] = f"=INDEX({amounts},MATCH({key},$A$1:$A${rows},0))"
+            else:
+                grid[row, col] = f"=SUMIF($A$1:$A${rows},{key},{amounts})"
+
+    return grid
+
+
+def _array_formulas(rows: int, cols: int, rng: np.random.Generator) -> np.ndarray:
+    # A key/amount table in columns A:B; the first row of the other columns holds SORT,
+    # FILTER, UNIQUE and SEQUENCE formulas whose results spill down the rest of the sheet.
+    grid = np.empty((rows, cols), dtype=object)
+    grid[:, 0] = [f"key{value}" for value in rng.integers(0, max(rows // 4, 1), size=rows)]
+    grid[:, 1] = rng.integers(0, 1000, size=rows).astype(str)
+    keys = f"$A$1:$A${rows}"
+    amounts = f"$B$1:$B${rows}"
+
+    formulas = [
+        f"=SORT({amounts},1,-1)",
+        f"=FILTER({keys},{amounts}>500)",
+        f"=UNIQUE({keys})",
+        f"=SEQUENCE({rows},1,1,2)",
+        f"={amounts}*2",
+    ]
+    for col in range(2, cols):
+        grid[0, col] = formulas[(col - 2) % len(formulas)]
+
+    return grid
+
+
+WORKLOADS: dict[str, Callable[[int, int, np.random.Generator], np.ndarray]] = {
+    "dense_literals": _dense_literals,
+    "dependency_chain": _dependency_chain,
+    "wide_sums": _wide_sums,
+    "cyclic_references": _cyclic_references,
+    "mixed_text": _mixed_text,
+    "lookups": _lookups,
+    "array_formulas": _array_formulas,
+}
+
+
+def _time(run: Callable[..., Any], repeat: int, setup: Callable[[], Any] | None = None) -> dict[str, float]:
+    # Run `run` `repeat` times; setup runs before each timed call and is not counted.
+    timings = []
+    for _ in range(repeat):
+        if setup is None:
+            start = time.perf_counter()
+            run()
+        else:
+            argument = setup()
+            start = time.perf_counter()
+            run(argument)
+        timings.append(time.perf_counter() - start)
+
+    return {
+        "min_s": min(timings),
+        "median_s": statistics.median(timings),
+        "mean_s": statistics.fmean(timings),
+    }
+
+
+def _upload(data: bytes, name: str) -> BytesIO:
+    # In-memory stand-in for Streamlit's UploadedFile.
+    buffer = BytesIO(data)
+    buffer.name = name
+    buffer.size = len(data)
+    return buffer
+
+
+def _benchmark_sheet(strings: np.ndarray, repeat: int, operations: tuple[str, ...]) -> dict[str, dict[str, float]]:
+    # Time each requested operation against one synthetic sheet.
+    results: dict[str, dict[str, float]] = {}
+    rows, cols = strings.shape
+    formulas = sorted({value[1:].strip() for value in strings.ravel() if isinstance(value, str) and value.startswith("=")})
+
+    if "parse" in operations:
+        def parse_all() -> None:
+            for expression in formulas:
+                compile_formula(expression)
+
+        results["parse"] = _time(parse_all, repeat)
+
+    store = SheetStore.from_strings(strings)
+    calculator = SheetCalculator()
+
+    if "full_recalc" in operations:
+        results["full_recalc"] = _time(lambda calc: calc.update(store), repeat, setup=SheetCalculator)
+
+    calculator.update(store)
+
+    if "incremental_recalc" in operations:
+        # Edit the top-left cell, which every workload's formulas depend on in some way.
+        values = iter(range(repeat * 2))
+
+        def edit() -> None:
+            store.set_cell(0, 0, str(next(values)))
+            calculator.update(store)
+
+        results["incremental_recalc"] = _time(edit, repeat)
+
+    frame = calculator.preview_frame()
+
+    if "export_csv" in operations or "import_csv" in operations:
+        csv_data = csv_bytes(store.to_frame())
+        if "export_csv" in operations:
+            results["export_csv"] = _time(lambda: csv_bytes(frame), repeat)
+        if "import_csv" in operations:
+            results["import_csv"] = _time(
+                lambda upload: import_sheet(upload, rows, cols),
+                repeat,
+                setup=lambda: _upload(csv_data, "bench.csv"),
+            )
+
+    if "export_xlsx" in operations or "import_xlsx" in operations:
+        # The app's XLSX download writes every sheet through workbook_xlsx_bytes.
+        xlsx_data = workbook_xlsx_bytes([("Sheet1", store.to_frame())])
+        if "export_xlsx" in operations:
+            results["export_xlsx"] = _time(lambda: workbook_xlsx_bytes([("Sheet1", frame)]), repeat)
+        if "import_xlsx" in operations:
+            results["import_xlsx"] = _time(
+                lambda upload: import_sheet(upload, rows, cols),
+                repeat,
+                setup=lambda: _upload(xlsx_data, "bench.xlsx"),
+            )
+
+    return results
+
+
+def run_benchmarks(
+    sizes: tuple[tuple[int, int], ...] = DEFAULT_SIZES,
+    workloads: tuple[str, ...] = tuple(WORKLOADS),
+    operations: tuple[str, ...] = OPERATIONS,
+    repeat: int = DEFAULT_REPEAT,
+    seed: int = 0,
+    on_result: Callable[[dict[str, Any]], None] | None = None,
+) -> list[dict[str, Any]]:
+    # One flat record per (workload, size, operation), ready for JSON output.
+    records: list[dict[str, Any]] = []
+
+    for workload in workloads:
+        for rows, cols in sizes:
+            strings = WORKLOADS[workload](rows, cols, np.random.default_rng(seed))
+
+            for operation, timing in _benchmark_sheet(strings, repeat, operations).items():
+                record = {"workload": workload, "rows": rows, "cols": cols, "operation": operation, "repeat": repeat, **timing}
+                records.append(record)
+                if on_result is not None:
+                    on_result(record)
+
+    return records
+
+
+def _record_key(record: dict[str, Any]) -> tuple[str, int, int, str]:
+    return record["workload"], record["rows"], record["cols"], record["operation"]
+
+
+def compare(results: list[dict[str, Any]], baseline: list[dict[str, Any]], threshold: float) -> list[dict[str, Any]]:
+    # Records whose median is more than `threshold` times the baseline median.
+    previous = {_record_key(record): record for record in baseline}
+    regressions = []
+
+    for record in results:
+        before = previous.get(_record_key(record))
+        if before is None or before["median_s"] <= 0:
+            continue
+
+        ratio = record["median_s"] / before["median_s"]
+        if ratio > threshold:
+            regressions.append({**record, "baseline_median_s": before["median_s"], "ratio": ratio})
+
+    return regressions
+
+
+def _parse_size(text: str) -> tuple[int, int]:
+    rows, _, cols = text.lower().partition("x")
+    try:
+        return int(rows), int(cols)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected ROWSxCOLS, got {text!r}") from None
+
+
+def _metadata() -> dict[str, Any]:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Spreadsheet Lab engine without Streamlit.")
+    parser.add_argument("--sizes", nargs="+", type=_parse_size, default=list(DEFAULT_SIZES), metavar="ROWSxCOLS")
+    parser.add_argument("--workloads", nargs="+", choices=list(WORKLOADS), default=list(WORKLOADS))
+    parser.add_argument("--operations", nargs="+", choices=OPERATIONS, default=list(OPERATIONS))
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    parser.add_argument("--baseline", help="Earlier JSON report; exit with status 1 on regressions.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    def progress(record: dict[str, Any]) -> None:
+        print(
+            f"{record['workload']:>18} {record['rows']:>6}x{record['cols']:<3} "
+            f"{record['operation']:<19} {record['median_s'] * 1000:10.2f} ms",
+            file=sys.stderr,
+        )
+
+    results = run_benchmarks(
+        tuple(args.sizes),
+        tuple(args.workloads),
+        tuple(args.operations),
+        args.repeat,
+        args.seed,
+        on_result=progress,
+    )
+    report: dict[str, Any] = {"metadata": _metadata(), "results": results}
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        report["regressions"] = compare(results, baseline, args.threshold)
+        for record in report["regressions"]:
+            print(f"REGRESSION {'/'.join(map(str, _record_key(record)))}: {record['ratio']:.2f}x", file=sys.stderr)
+        exit_code = 1 if report["regressions"] else 0
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(text + "\n")
+    else:
+        print(text)
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
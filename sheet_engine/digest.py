@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+from sheet_engine.formulas import column_name, is_error
+from sheet_engine.recalc import SheetCalculator
+from sheet_engine.store import format_number
+
+# Limits that keep the digest small enough to attach to every tutor prompt.
+DIGEST_MAX_CHARS = 2500
+DIGEST_MAX_FORMULAS = 15
+DIGEST_MAX_ERRORS = 10
+DIGEST_SAMPLE_ROWS = 6
+DIGEST_SAMPLE_COLS = 8
+DIGEST_CELL_CHARS = 24
+
+
+def _shorten(text: str, limit: int = DIGEST_CELL_CHARS) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+def _display(value: Any) -> str:
+    if isinstance(value, float):
+        return format_number(value)
+    return _shorten(str(value))
+
+
+def _label(row: int, col: int) -> str:
+    return f"{column_name(col)}{row + 1}"
+
+
+def sheet_digest(calculator: SheetCalculator, sheet_names: list[str] | None = None) -> str:
+    # Compact text summary of an up-to-date calculator: used range, formulas with their
+    # results, error cells and a sample of values. Bounded by DIGEST_MAX_CHARS.
+    lines = []
+    if calculator.name is not None:
+        others = [name for name in sheet_names or () if name != calculator.name]
+        suffix = f" (other sheets: {', '.join(others)})" if others else ""
+        lines.append(f"Sheet {calculator.name!r}{suffix}.")
+
+    lines.extend(_summary_lines(calculator))
+
+    digest = "\n".join(lines)
+    if len(digest) > DIGEST_MAX_CHARS:
+        digest = digest[: DIGEST_MAX_CHARS - 15].rsplit("\n", 1)[0] + "\n  (truncated)"
+    return digest
+
+
+def _summary_lines(calculator: SheetCalculator) -> list[str]:
+    if calculator.text is None:
+        return ["The sheet is empty."]
+
+    filled = calculator.number_mask | ~np.equal(calculator.text, None)
+    used_rows = np.flatnonzero(filled.any(axis=1))
+    used_cols = np.flatnonzero(filled.any(axis=0))
+    if not used_rows.size:
+        return [f"The sheet is empty ({calculator.shape[0]} rows x {calculator.shape[1]} columns)."]
+
+    top, bottom = int(used_rows[0]), int(used_rows[-1])
+    left, right = int(used_cols[0]), int(used_cols[-1])
+    formula_cells = np.argwhere(calculator.formula_mask).tolist()
+
+    lines = [
+        f"Used range {_label(top, left)}:{_label(bottom, right)} "
+        f"({int(filled.sum())} filled cells, {len(formula_cells)} formulas).",
+    ]
+
+    errors = [(row, col) for row, col in formula_cells if is_error(calculator.values[row, col])]
+    if errors:
+        lines.append(f"Error cells ({len(errors)}):")
+        for row, col in errors[:DIGEST_MAX_ERRORS]:
+            lines.append(f"  {_label(row, col)} {calculator.text[row, col]} -> {calculator.values[row, col]}")
+
+    if formula_cells:
+        lines.append("Formulas:")
+        for row, col in formula_cells[:DIGEST_MAX_FORMULAS]:
+            lines.append(f"  {_label(row, col)} {calculator.text[row, col]} -> {_display(calculator.values[row, col])}")
+        if len(formula_cells) > DIGEST_MAX_FORMULAS:
+            lines.append(f"  ... {len(formula_cells) - DIGEST_MAX_FORMULAS} more")
+
+    sample_rows = range(top, min(bottom + 1, top + DIGEST_SAMPLE_ROWS))
+    sample_cols = range(left, min(right + 1, left + DIGEST_SAMPLE_COLS))
+    lines.append(f"Values {_label(top, left)}:{_label(sample_rows[-1], sample_cols[-1])}:")
+    lines.append("  " + " | ".join(column_name(col) for col in sample_cols))
+    for row in sample_rows:
+        lines.append(f"  {row + 1}: " + " | ".join(_display(calculator.value_at(row, col)) for col in sample_cols))
+    return lines
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+# Formula text that cannot be parsed.
+ERROR_VALUE = "ERR"
+# Written in place of references whose cells were deleted; also references to missing sheets.
+REF_ERROR = "#REF!"
+DIV_ZERO_ERROR = "#DIV/0!"
+VALUE_ERROR = "#VALUE!"
+NUM_ERROR = "#NUM!"
+NA_ERROR = "#N/A"
+CYCLE_VALUE = "#CYCLE!"
+# An array result whose spill area is not empty or runs off the sheet.
+SPILL_ERROR = "#SPILL!"
+# An array function with an empty result, such as FILTER matching nothing.
+CALC_ERROR = "#CALC!"
+# Error values pass through references and operators unchanged, like in Excel.
+ERROR_VALUES = frozenset(
+    {
+        ERROR_VALUE,
+        REF_ERROR,
+        DIV_ZERO_ERROR,
+        VALUE_ERROR,
+        NUM_ERROR,
+        NA_ERROR,
+        "#NAME?",
+        "#NULL!",
+        CYCLE_VALUE,
+        SPILL_ERROR,
+        CALC_ERROR,
+    }
+)
+
+
+class FormulaError(Exception):
+    # Raised during evaluation to make the formula's result the error value `code`.
+    def __init__(self, code: str):
+        super().__init__(code)
+        self.code = code
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import threading
+from io import BytesIO
+from typing import Callable, Iterable
+
+import pandas as pd
+from openpyxl import Workbook
+
+
+def workbook_xlsx_bytes(sheets: Iterable[tuple[str, pd.DataFrame]]) -> bytes:
+    # Write every (name, frame) sheet in one pass through a write-only workbook. Rows are
+    # appended one at a time without building openpyxl cell objects for a whole sheet, and
+    # `sheets` may be a generator so only one sheet's frame is needed at a time.
+    workbook = Workbook(write_only=True)
+
+    for name, frame in sheets:
+        worksheet = workbook.create_sheet(name)
+        for row in frame.itertuples(index=False, name=None):
+            worksheet.append(row)
+
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def csv_bytes(frame: pd.DataFrame) -> bytes:
+    return frame.to_csv(index=False, header=False).encode("utf-8")
+
+
+class ExportCache:
+    # Latest export bytes per (content, format), reused while the sheet version is unchanged.
+    # Builds run on Streamlit's download thread, so access is locked.
+    def __init__(self) -> None:
+        self._entries: dict[tuple[str, str], tuple[int, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, content: str, file_format: str, version: int, build: Callable[[], bytes]) -> bytes:
+        key = (content, file_format)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+
+            data = build()
+            self._entries[key] = (version, data)
+            return data
+
+    def deferred(self, content: str, file_format: str, version: int, build: Callable[[], bytes]) -> Callable[[], bytes]:
+        # Zero-argument callable for st.download_button, so bytes are built only on click.
+        return lambda: self.get(content, file_format, version, build)
@@ -0,0 +1,731 @@
+from __future__ import annotations
+
+import math
+import operator
+import re
+import sys
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Protocol
+
+import numpy as np
+
+from sheet_engine.errors import (
+    DIV_ZERO_ERROR,
+    ERROR_VALUE,
+    ERROR_VALUES,
+    NUM_ERROR,
+    REF_ERROR,
+    VALUE_ERROR,
+    FormulaError,
+)
+from sheet_engine.functions import (
+    FUNCTION_MAP,
+    NUMERIC_RANGE_FUNCTIONS,
+    RANGE_TABLE_ARGUMENTS,
+    RangeTable,
+    array_operation,
+    array_result,
+    clean_numeric,
+    to_number,
+)
+
+# A "Sheet2!" or "'Q1 Sales'!" prefix is its own token, tried only after plain references
+# fail, so unqualified references tokenize as cheaply as before sheets existed.
+_TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<space>\s+)
+    |(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+    |(?P<string>"(?:[^"]|"")*")
+    |(?P<function>[A-Za-z_][A-Za-z0-9_.]*(?=\s*\())
+    |(?P<range>\$?[A-Za-z]+\$?[1-9]\d*:\$?[A-Za-z]+\$?[1-9]\d*(?![A-Za-z0-9_!]))
+    |(?P<cell>\$?[A-Za-z]+\$?[1-9]\d*(?![A-Za-z0-9_!]))
+    |(?P<sheet>'(?:[^']|'')+'!|[A-Za-z_][A-Za-z0-9_.]*!)
+    |(?P<name>[A-Za-z_][A-Za-z0-9_]*)
+    |(?P<error>\#(?:REF!|DIV/0!|VALUE!|NUM!|N/A|NAME\?|NULL!|CYCLE!|SPILL!|CALC!))
+    |(?P<operator>\*\*|<>|<=|>=|==|!=|[-+*/^&=<>%])
+    |(?P<punctuation>[(),])
+    """,
+    re.VERBOSE,
+)
+_BARE_SHEET_NAME_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_.]*")
+_CELL_PARTS_PATTERN = re.compile(r"(\$?)([A-Za-z]+)(\$?)(\d+)")
+
+# Python-style spellings accepted by the old eval-based engine map onto Excel operators.
+_OPERATOR_ALIASES = {"**": "^", "==": "=", "!=": "<>"}
+_COMPARISON_OPERATORS = ("=", "<>", "<", ">", "<=", ">=")
+
+
+def column_name(index: int) -> str:
+    # Convert zero-based column index to Excel-style label (A, B, ..., AA).
+    label = ""
+    current = index + 1
+
+    while current:
+        current, remainder = divmod(current - 1, 26)
+        label = chr(65 + remainder) + label
+
+    return label
+
+
+def column_index(column_label: str) -> int:
+    # Convert Excel-style label back to zero-based column index.
+    index = 0
+    for character in column_label.upper():
+        index = index * 26 + (ord(character) - 64)
+    return index - 1
+
+
+def quote_sheet_name(name: str) -> str:
+    # Sheet name as written before "!" in a reference; names with spaces or symbols are quoted.
+    if _BARE_SHEET_NAME_PATTERN.fullmatch(name):
+        return name
+    return "'" + name.replace("'", "''") + "'"
+
+
+def _split_sheet(text: str) -> tuple[str | None, str]:
+    # Separate an optional sheet prefix from a reference token.
+    sheet, marker, ref = text.rpartition("!")
+    if not marker:
+        return None, text
+    if sheet.startswith("'"):
+        sheet = sheet[1:-1].replace("''", "'")
+    return sheet, ref
+
+
+def _sheet_label(sheet: str | None) -> str:
+    return "" if sheet is None else quote_sheet_name(sheet) + "!"
+
+
+def is_error(value: Any) -> bool:
+    return isinstance(value, str) and value in ERROR_VALUES
+
+
+def first_error(values: list[Any]) -> str | None:
+    # First error value in a list, found with one C-level set intersection in the common no-error case.
+    found = ERROR_VALUES.intersection(values)
+    if not found:
+        return None
+    return next(value for value in values if value in found)
+
+
+_NUMBER_TYPES = (int, float)
+_MAX_NUMBER = sys.float_info.max
+
+
+def _operand(value: Any) -> Any:
+    # Arithmetic operand: blanks are zero, numeric text is converted, other text is #VALUE!.
+    if isinstance(value, str):
+        number = to_number(value) if value else 0
+        if number is None:
+            raise FormulaError(VALUE_ERROR)
+        return number
+    if value is None:
+        return 0
+    return value
+
+
+def _arithmetic(operation: Callable[[Any, Any], Any]) -> Callable[[Any, Any], Any]:
+    def apply(left: Any, right: Any) -> Any:
+        # Plain numbers (the common case) skip operand conversion.
+        if left.__class__ in _NUMBER_TYPES and right.__class__ in _NUMBER_TYPES:
+            return operation(left, right)
+        return operation(_operand(left), _operand(right))
+
+    return apply
+
+
+def _power(base: Any, exponent: Any) -> Any:
+    # Spreadsheet numbers are doubles; exact int powers could grow without bound (=9^99999999).
+    return float(base) ** exponent
+
+
+def _display_text(value: Any) -> str:
+    # Text form used by the & operator, matching how cells display values.
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+
+    if isinstance(value, float):
+        return str(clean_numeric(value))
+
+    return str(value)
+
+
+def _concat(left: Any, right: Any) -> str:
+    return _display_text(left) + _display_text(right)
+
+
+_BINARY_OPERATIONS: dict[str, Callable[[Any, Any], Any]] = {
+    "+": _arithmetic(operator.add),
+    "-": _arithmetic(operator.sub),
+    "*": _arithmetic(operator.mul),
+    "/": _arithmetic(operator.truediv),
+    "^": _arithmetic(_power),
+    "&": _concat,
+    "=": operator.eq,
+    "<>": operator.ne,
+    "<": operator.lt,
+    ">": operator.gt,
+    "<=": operator.le,
+    ">=": operator.ge,
+}
+
+
+class FormulaSyntaxError(ValueError):
+    # Raised when formula text cannot be tokenized or parsed.
+    pass
+
+
+class MissingSheetError(FormulaError):
+    # Raised while evaluating a reference to a sheet the workbook does not have.
+    def __init__(self, sheet: str):
+        super().__init__(REF_ERROR)
+        self.sheet = sheet
+
+
+class FormulaContext(Protocol):
+    # Resolves references while a compiled formula is evaluated.
+    def cell_value(self, row: int, col: int) -> Any: ...
+
+    def range_values(self, ref: RangeRef) -> Any: ...
+
+    def numeric_range(self, ref: RangeRef) -> Any: ...
+
+    def range_table(self, ref: RangeRef) -> RangeTable: ...
+
+    def sheet_context(self, name: str) -> FormulaContext | None:
+        # Context for references qualified with a sheet name, or None if no such sheet exists.
+        ...
+
+
+def _sheet_context(context: FormulaContext, sheet: str | None) -> FormulaContext:
+    if sheet is None:
+        return context
+
+    resolved = context.sheet_context(sheet)
+    if resolved is None:
+        raise MissingSheetError(sheet)
+    return resolved
+
+
+@dataclass(frozen=True, slots=True)
+class CellRef:
+    row: int
+    col: int
+    absolute_row: bool = False
+    absolute_col: bool = False
+    # Set for references to another sheet, such as Sheet2!A1.
+    sheet: str | None = None
+
+    def evaluate(self, context: FormulaContext) -> Any:
+        if self.sheet is not None:
+            context = _sheet_context(context, self.sheet)
+
+        # Blank cells behave as zero when referenced directly; error values propagate.
+        value = context.cell_value(self.row, self.col)
+        if isinstance(value, str):
+            if value == "":
+                return 0
+            if value in ERROR_VALUES:
+                raise FormulaError(value)
+        elif value is None:
+            return 0
+        return value
+
+    @property
+    def label(self) -> str:
+        col_prefix = "$" if self.absolute_col else ""
+        row_prefix = "$" if self.absolute_row else ""
+        return f"{_sheet_label(self.sheet)}{col_prefix}{column_name(self.col)}{row_prefix}{self.row + 1}"
+
+
+@dataclass(frozen=True, slots=True)
+class RangeRef:
+    start: CellRef
+    end: CellRef
+    sheet: str | None = None
+
+    def evaluate(self, context: FormulaContext) -> Any:
+        return _sheet_context(context, self.sheet).range_values(self)
+
+    @property
+    def bounds(self) -> tuple[int, int, int, int]:
+        # Normalized (row_from, col_from, row_to, col_to), inclusive on both ends.
+        return (
+            min(self.start.row, self.end.row),
+            min(self.start.col, self.end.col),
+            max(self.start.row, self.end.row),
+            max(self.start.col, self.end.col),
+        )
+
+    @property
+    def label(self) -> str:
+        return f"{_sheet_label(self.sheet)}{self.start.label}:{self.end.label}"
+
+
+@dataclass(frozen=True, slots=True)
+class NumericRangeArg:
+    # Range argument of an aggregate; may resolve to a cached float64 array.
+    ref: RangeRef
+
+    def evaluate(self, context: FormulaContext) -> Any:
+        return _sheet_context(context, self.ref.sheet).numeric_range(self.ref)
+
+
+@dataclass(frozen=True, slots=True)
+class RangeTableArg:
+    # Range argument of a lookup function; resolves to a RangeTable with cached indexes.
+    ref: RangeRef
+
+    def evaluate(self, context: FormulaContext) -> Any:
+        return _sheet_context(context, self.ref.sheet).range_table(self.ref)
+
+
+@dataclass(frozen=True, slots=True)
+class RangeArrayArg:
+    # Range used as an operand or as the whole formula; evaluates to its 2-D values so
+    # operators apply element by element and the result spills.
+    ref: RangeRef
+
+    def evaluate(self, context: FormulaContext) -> Any:
+        table = _sheet_context(context, self.ref.sheet).range_table(self.ref)
+        if table.error is not None:
+            raise FormulaError(table.error)
+        return table.values
+
+
+def _array_operand(node: Any) -> Any:
+    return RangeArrayArg(node) if isinstance(node, RangeRef) else node
+
+
+@dataclass(frozen=True, slots=True)
+class Literal:
+    value: Any
+
+    def evaluate(self, context: FormulaContext) -> Any:
+        return self.value
+
+
+@dataclass(frozen=True, slots=True)
+class ErrorLiteral:
+    # An error value typed into formula text, such as the #REF! left by a deleted row.
+    code: str
+
+    def evaluate(self, context: FormulaContext) -> Any:
+        raise FormulaError(self.code)
+
+
+@dataclass(frozen=True, slots=True)
+class UnaryOp:
+    symbol: str
+    operand: Any
+
+    def evaluate(self, context: FormulaContext) -> Any:
+        value = self.operand.evaluate(context)
+        if value.__class__ is np.ndarray:
+            if self.symbol == "-":
+                return array_operation("-", 0, value)
+            if self.symbol == "%":
+                return array_operation("/", value, 100)
+            return value
+
+        value = _operand(value)
+        if self.symbol == "-":
+            return -value
+        if self.symbol == "%":
+            return value / 100
+        return +value
+
+
+@dataclass(frozen=True, slots=True)
+class BinaryOp:
+    symbol: str
+    left: Any
+    right: Any
+
+    def evaluate(self, context: FormulaContext) -> Any:
+        left = self.left.evaluate(context)
+        right = self.right.evaluate(context)
+        if left.__class__ is np.ndarray or right.__class__ is np.ndarray:
+            return array_operation(self.symbol, left, right)
+        return _BINARY_OPERATIONS[self.symbol](left, right)
+
+
+@dataclass(frozen=True, slots=True)
+class FunctionCall:
+    name: str
+    function: Callable[..., Any]
+    args: tuple[Any, ...]
+
+    def evaluate(self, context: FormulaContext) -> Any:
+        return self.function(*(arg.evaluate(context) for arg in self.args))
+
+
+@dataclass(frozen=True, slots=True)
+class Conditional:
+    # IF only evaluates the branch it returns, like Excel.
+    condition: Any
+    when_true: Any
+    when_false: Any
+
+    def evaluate(self, context: FormulaContext) -> Any:
+        if self.condition.evaluate(context):
+            return self.when_true.evaluate(context)
+        return self.when_false.evaluate(context)
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledFormula:
+    # Parsed formula plus the references it reads, reusable across recalculations.
+    expression: str
+    root: Any | None
+    cells: tuple[CellRef, ...] = ()
+    ranges: tuple[RangeRef, ...] = ()
+    # Strict formulas evaluate every argument, so any error among their inputs is their result
+    # and can be returned without evaluating. IF only evaluates one branch, so it is not strict.
+    strict: bool = True
+    # Result known at parse time, e.g. a strict formula containing a #REF! literal.
+    error: str | None = None
+
+    def evaluate(self, context: FormulaContext) -> Any:
+        if self.root is None:
+            return ERROR_VALUE
+        if self.error is not None:
+            return self.error
+
+        try:
+            result = self.root.evaluate(context)
+        except FormulaError as error:
+            return error.code
+        except ZeroDivisionError:
+            return DIV_ZERO_ERROR
+        except (TypeError, ValueError):
+            return VALUE_ERROR
+        except OverflowError:
+            return NUM_ERROR
+        except Exception:  # noqa: BLE001
+            return ERROR_VALUE
+
+        if isinstance(result, complex):
+            # A negative number raised to a fractional power.
+            return NUM_ERROR
+
+        if isinstance(result, float) and not math.isfinite(result):
+            # Overflowing literals and results (=1e400, =10^400) are #NUM!, as in Excel.
+            return NUM_ERROR
+
+        if isinstance(result, int) and abs(result) > _MAX_NUMBER:
+            return NUM_ERROR
+
+        if isinstance(result, float) and result.is_integer():
+            return int(result)
+
+        if isinstance(result, (list, np.ndarray)):
+            # Array results spill into the cells below and to the right.
+            return array_result(result)
+
+        return result
+
+
+def _parse_cell_token(text: str, sheet: str | None = None) -> CellRef:
+    match = _CELL_PARTS_PATTERN.fullmatch(text)
+    if match is None:
+        raise FormulaSyntaxError(f"Invalid cell reference: {text}")
+
+    col_marker, col_label, row_marker, row_text = match.groups()
+    return CellRef(
+        row=int(row_text) - 1,
+        col=column_index(col_label),
+        absolute_row=bool(row_marker),
+        absolute_col=bool(col_marker),
+        sheet=sheet,
+    )
+
+
+def _parse_range_token(text: str) -> RangeRef:
+    sheet, corners = _split_sheet(text)
+    start_text, end_text = corners.split(":")
+    return RangeRef(_parse_cell_token(start_text), _parse_cell_token(end_text), sheet)
+
+
+def _next_token(expression: str, position: int) -> tuple[str, str, int] | None:
+    # (kind, text, end) of the token at position. A sheet prefix is merged into the cell or
+    # range it qualifies, so "Sheet2!A1" comes back as one cell token.
+    match = _TOKEN_PATTERN.match(expression, position)
+    if match is None:
+        return None
+
+    kind, text, end = match.lastgroup, match.group(), match.end()
+    if kind == "sheet":
+        ref = _TOKEN_PATTERN.match(expression, end)
+        if ref is None or ref.lastgroup not in ("cell", "range"):
+            return None
+        kind, text, end = ref.lastgroup, text + ref.group(), ref.end()
+
+    return kind, text, end
+
+
+def tokenize(expression: str) -> list[tuple[str, str]]:
+    # Split formula text into (kind, text) tokens, dropping whitespace.
+    tokens: list[tuple[str, str]] = []
+    position = 0
+
+    while position < len(expression):
+        token = _next_token(expression, position)
+        if token is None:
+            raise FormulaSyntaxError(f"Unexpected character at position {position}: {expression[position]!r}")
+
+        kind, text, position = token
+
+        if kind == "space":
+            continue
+        if kind == "operator":
+            text = _OPERATOR_ALIASES.get(text, text)
+
+        tokens.append((kind, text))
+
+    return tokens
+
+
+class _Parser:
+    # Recursive-descent parser using Excel operator precedence.
+    def __init__(self, tokens: list[tuple[str, str]]):
+        self.tokens = tokens
+        self.position = 0
+        self.cells: list[CellRef] = []
+        self.ranges: list[RangeRef] = []
+        self.errors: list[str] = []
+        self.strict = True
+
+    def peek(self) -> tuple[str, str] | None:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+    def advance(self) -> tuple[str, str]:
+        token = self.peek()
+        if token is None:
+            raise FormulaSyntaxError("Unexpected end of formula")
+        self.position += 1
+        return token
+
+    def accept(self, kind: str, *texts: str) -> str | None:
+        token = self.peek()
+        if token is None or token[0] != kind or (texts and token[1] not in texts):
+            return None
+        self.position += 1
+        return token[1]
+
+    def expect(self, kind: str, text: str) -> None:
+        if self.accept(kind, text) is None:
+            raise FormulaSyntaxError(f"Expected {text!r}")
+
+    def parse(self):
+        node = self.comparison()
+        if self.peek() is not None:
+            raise FormulaSyntaxError(f"Unexpected token: {self.peek()[1]!r}")
+        return node
+
+    def comparison(self):
+        node = self.concatenation()
+        while (symbol := self.accept("operator", *_COMPARISON_OPERATORS)) is not None:
+            node = BinaryOp(symbol, _array_operand(node), _array_operand(self.concatenation()))
+        return node
+
+    def concatenation(self):
+        node = self.additive()
+        while self.accept("operator", "&") is not None:
+            node = BinaryOp("&", _array_operand(node), _array_operand(self.additive()))
+        return node
+
+    def additive(self):
+        node = self.multiplicative()
+        while (symbol := self.accept("operator", "+", "-")) is not None:
+            node = BinaryOp(symbol, _array_operand(node), _array_operand(self.multiplicative()))
+        return node
+
+    def multiplicative(self):
+        node = self.power()
+        while (symbol := self.accept("operator", "*", "/")) is not None:
+            node = BinaryOp(symbol, _array_operand(node), _array_operand(self.power()))
+        return node
+
+    def power(self):
+        node = self.unary()
+        while self.accept("operator", "^") is not None:
+            node = BinaryOp("^", _array_operand(node), _array_operand(self.unary()))
+        return node
+
+    def unary(self):
+        symbol = self.accept("operator", "-", "+")
+        if symbol is not None:
+            return UnaryOp(symbol, _array_operand(self.unary()))
+        return self.postfix()
+
+    def postfix(self):
+        node = self.primary()
+        while self.accept("operator", "%") is not None:
+            node = UnaryOp("%", _array_operand(node))
+        return node
+
+    def primary(self):
+        kind, text = self.advance()
+
+        if kind == "number":
+            return Literal(clean_numeric(float(text)))
+
+        if kind == "error":
+            self.errors.append(text)
+            return ErrorLiteral(text)
+
+        if kind == "string":
+            return Literal(text[1:-1].replace('""', '"'))
+
+        if kind == "cell":
+            sheet, cell_text = _split_sheet(text)
+            ref = _parse_cell_token(cell_text, sheet)
+            self.cells.append(ref)
+            return ref
+
+        if kind == "range":
+            ref = _parse_range_token(text)
+            self.ranges.append(ref)
+            return ref
+
+        if kind == "function":
+            return self.function_call(text.upper())
+
+        if kind == "name" and text.upper() in {"TRUE", "FALSE"}:
+            return Literal(text.upper() == "TRUE")
+
+        if kind == "punctuation" and text == "(":
+            node = self.comparison()
+            self.expect("punctuation", ")")
+            return node
+
+        raise FormulaSyntaxError(f"Unexpected token: {text!r}")
+
+    def function_call(self, name: str):
+        self.expect("punctuation", "(")
+        args = []
+
+        if self.accept("punctuation", ")") is None:
+            args.append(self.comparison())
+            while self.accept("punctuation", ",") is not None:
+                args.append(self.comparison())
+            self.expect("punctuation", ")")
+
+        if name == "IF":
+            if len(args) not in (2, 3):
+                raise FormulaSyntaxError("IF expects 2 or 3 arguments")
+            when_false = args[2] if len(args) == 3 else Literal(False)
+            self.strict = False
+            return Conditional(args[0], args[1], when_false)
+
+        function = FUNCTION_MAP.get(name)
+        if function is None:
+            raise FormulaSyntaxError(f"Unknown function: {name}")
+
+        if name in NUMERIC_RANGE_FUNCTIONS:
+            args = [NumericRangeArg(arg) if isinstance(arg, RangeRef) else arg for arg in args]
+
+        table_positions = RANGE_TABLE_ARGUMENTS.get(name, ())
+        if table_positions:
+            args = [
+                RangeTableArg(arg) if position in table_positions and isinstance(arg, RangeRef) else arg
+                for position, arg in enumerate(args)
+            ]
+
+        return FunctionCall(name, function, tuple(args))
+
+
+def _shift_span(low: int, high: int, index: int, count: int) -> tuple[int, int] | None:
+    # Move an inclusive span after inserting (count > 0) or deleting (count < 0) lines at index.
+    # Deleted lines shrink the span; None means every line in it was deleted.
+    if count > 0:
+        return (low + count if low >= index else low, high + count if high >= index else high)
+
+    removed = -count
+    new_low = low if low < index else max(low - removed, index)
+    new_high = high - removed if high >= index + removed else min(high, index - 1)
+    return None if new_low > new_high else (new_low, new_high)
+
+
+def _shift_ref(first: CellRef, second: CellRef, axis: int, index: int, count: int) -> tuple[CellRef, CellRef] | None:
+    # Shift both corners of a reference along one axis (0 = rows, 1 = columns).
+    # Absolute markers are kept; like Excel, absolute references still move.
+    field = "row" if axis == 0 else "col"
+    first_position = getattr(first, field)
+    second_position = getattr(second, field)
+
+    span = _shift_span(min(first_position, second_position), max(first_position, second_position), index, count)
+    if span is None:
+        return None
+
+    if first_position > second_position:
+        span = span[::-1]
+
+    return replace(first, **{field: span[0]}), replace(second, **{field: span[1]})
+
+
+def same_sheet(first: str | None, second: str | None) -> bool:
+    # Sheet names compare case-insensitively, like Excel.
+    return first is not None and second is not None and first.casefold() == second.casefold()
+
+
+def _moves_with(ref_sheet: str | None, sheet: str | None, local: bool) -> bool:
+    # Whether a reference points into the sheet whose rows/columns are changing.
+    return local if ref_sheet is None else same_sheet(ref_sheet, sheet)
+
+
+def shift_references(
+    expression: str,
+    axis: int,
+    index: int,
+    count: int,
+    sheet: str | None = None,
+    local: bool = True,
+) -> str:
+    # Rewrite references in formula text after inserting (count > 0) or deleting
+    # (count < 0) rows (axis 0) or columns (axis 1) at index of `sheet`, the way Excel does.
+    # Unqualified references move only when local (the formula lives on that sheet);
+    # references qualified with another sheet's name and all other tokens are copied through.
+    pieces: list[str] = []
+    position = 0
+
+    while position < len(expression):
+        token = _next_token(expression, position)
+        if token is None:
+            pieces.append(expression[position])
+            position += 1
+            continue
+
+        kind, text, position = token
+
+        if kind == "cell":
+            ref_sheet, cell_text = _split_sheet(text)
+            if _moves_with(ref_sheet, sheet, local):
+                cell = _parse_cell_token(cell_text, ref_sheet)
+                shifted = _shift_ref(cell, cell, axis, index, count)
+                text = REF_ERROR if shifted is None else shifted[0].label
+        elif kind == "range":
+            ref = _parse_range_token(text)
+            if _moves_with(ref.sheet, sheet, local):
+                shifted = _shift_ref(ref.start, ref.end, axis, index, count)
+                text = REF_ERROR if shifted is None else RangeRef(*shifted, ref.sheet).label
+
+        pieces.append(text)
+
+    return "".join(pieces)
+
+
+def compile_formula(expression: str) -> CompiledFormula:
+    # Parse formula text (without the leading "="). Calculators keep the result per cell,
+    # so a formula is parsed again only when its cell's text changes.
+    try:
+        parser = _Parser(tokenize(expression))
+        root = parser.parse()
+    except FormulaSyntaxError:
+        return CompiledFormula(expression, None)
+
+    error = parser.errors[0] if parser.strict and parser.errors else None
+    return CompiledFormula(expression, _array_operand(root), tuple(parser.cells), tuple(parser.ranges), parser.strict, error)
@@ -0,0 +1,788 @@
+from __future__ import annotations
+
+import math
+import re
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from sheet_engine.errors import (
+    CALC_ERROR,
+    DIV_ZERO_ERROR,
+    ERROR_VALUES,
+    NA_ERROR,
+    NUM_ERROR,
+    REF_ERROR,
+    VALUE_ERROR,
+    FormulaError,
+)
+
+# Match modes of XLOOKUP; VLOOKUP and MATCH are expressed with the same modes.
+EXACT_MATCH = 0
+NEXT_SMALLER = -1
+NEXT_LARGER = 1
+WILDCARD_MATCH = 2
+
+# Largest array a formula may build, about one full Excel column.
+MAX_ARRAY_CELLS = 1_048_576
+
+_NUMBER_TYPES = (int, float)
+_CRITERIA_OPERATORS = ("<=", ">=", "<>", "<", ">", "=")
+_ARRAY_ARITHMETIC = {"+": np.add, "-": np.subtract, "*": np.multiply, "/": np.divide, "^": np.power}
+_ARRAY_COMPARISONS = {
+    "=": np.equal,
+    "<>": np.not_equal,
+    "<": np.less,
+    ">": np.greater,
+    "<=": np.less_equal,
+    ">=": np.greater_equal,
+}
+
+
+def flatten(values):
+    # Flatten nested ranges/collections for aggregate functions.
+    for value in values:
+        if isinstance(value, (list, tuple, set, np.ndarray, pd.Series)):
+            yield from flatten(value)
+        else:
+            yield value
+
+
+def to_number(value: Any) -> float | None:
+    # Convert compatible values to float; return None when non-numeric.
+    if isinstance(value, bool):
+        return float(int(value))
+
+    if isinstance(value, (int, float)):
+        if pd.isna(value):
+            return None
+        return float(value)
+
+    if value in (None, ""):
+        return None
+
+    try:
+        return float(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def clean_numeric(value: float | int) -> float | int:
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _numeric_values(args) -> list[float]:
+    # Extract only numeric values for SUM/AVERAGE/MIN/MAX/COUNT.
+    numbers: list[float] = []
+
+    for value in flatten(args):
+        number = to_number(value)
+        if number is not None:
+            numbers.append(number)
+
+    return numbers
+
+
+def _numeric_array(args) -> np.ndarray:
+    # Gather numeric arguments into one float64 array. Literal-only ranges arrive
+    # pre-converted as float64 arrays with NaN marking blank/text cells.
+    arrays: list[np.ndarray] = []
+    scalars: list[Any] = []
+
+    for value in args:
+        if isinstance(value, np.ndarray) and value.dtype == np.float64:
+            arrays.append(value.ravel())
+        else:
+            if isinstance(value, np.ndarray):
+                # Array results may hold error elements, such as #VALUE! from "x"*2.
+                items = value.ravel().tolist()
+                errors = ERROR_VALUES.intersection(items)
+                if errors:
+                    raise FormulaError(next(item for item in items if item in errors))
+            scalars.append(value)
+
+    if scalars:
+        arrays.append(np.asarray(_numeric_values(scalars), dtype=np.float64))
+
+    if not arrays:
+        return np.empty(0, dtype=np.float64)
+
+    numbers = np.concatenate(arrays) if len(arrays) > 1 else arrays[0]
+    return numbers[~np.isnan(numbers)]
+
+
+def fx_sum(*args):
+    numbers = _numeric_array(args)
+    return clean_numeric(float(numbers.sum())) if numbers.size else 0
+
+
+def fx_average(*args):
+    numbers = _numeric_array(args)
+    if not numbers.size:
+        return 0
+    return clean_numeric(float(numbers.mean()))
+
+
+def fx_min(*args):
+    numbers = _numeric_array(args)
+    return clean_numeric(float(numbers.min())) if numbers.size else 0
+
+
+def fx_max(*args):
+    numbers = _numeric_array(args)
+    return clean_numeric(float(numbers.max())) if numbers.size else 0
+
+
+def fx_count(*args):
+    return int(_numeric_array(args).size)
+
+
+def fx_round(value, digits=0):
+    number = to_number(value)
+    if number is None:
+        return 0
+
+    digits_number = to_number(digits) or 0
+    return clean_numeric(round(number, int(digits_number)))
+
+
+def fx_if(condition, true_value, false_value):
+    return true_value if condition else false_value
+
+
+def fx_and(*args):
+    return all(bool(item) for item in flatten(args))
+
+
+def fx_or(*args):
+    return any(bool(item) for item in flatten(args))
+
+
+def fx_not(value):
+    return not bool(value)
+
+
+def fx_len(value):
+    return len(str(value))
+
+
+def fx_concat(*args):
+    return "".join(str(item) for item in flatten(args) if item is not None)
+
+
+def _wildcard_pattern(text: str) -> re.Pattern[str] | None:
+    # Excel wildcards (* any run, ? one character, ~ escapes the next one) as a regex;
+    # None when the text has no wildcards and can be matched as-is.
+    if "*" not in text and "?" not in text:
+        return None
+
+    parts = []
+    escaped = False
+    for character in text:
+        if escaped:
+            parts.append(re.escape(character))
+            escaped = False
+        elif character == "~":
+            escaped = True
+        elif character == "*":
+            parts.append(".*")
+        elif character == "?":
+            parts.append(".")
+        else:
+            parts.append(re.escape(character))
+    return re.compile("".join(parts), re.IGNORECASE | re.DOTALL)
+
+
+class _SortedKeys:
+    # Keys of one type (numbers or case-folded text) sorted once with their positions,
+    # so equality, comparison and nearest-match lookups are binary searches.
+    def __init__(self, keys: np.ndarray, positions: np.ndarray) -> None:
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.positions = positions[order]
+
+    def select(self, symbol: str, key: Any) -> np.ndarray:
+        # Positions whose key compares to `key` with one of = < <= > >=.
+        low = int(np.searchsorted(self.keys, key, side="left"))
+        high = int(np.searchsorted(self.keys, key, side="right"))
+        start, stop = {
+            "=": (low, high),
+            "<": (0, low),
+            "<=": (0, high),
+            ">": (high, len(self.keys)),
+            ">=": (low, len(self.keys)),
+        }[symbol]
+        return self.positions[start:stop]
+
+    def nearest(self, key: Any, mode: int, last: bool = False) -> int | None:
+        # Position of `key`, or of the next smaller/larger key for those modes. Equal keys
+        # keep their original order, so `last` picks the last occurrence.
+        low = int(np.searchsorted(self.keys, key, side="left"))
+        high = int(np.searchsorted(self.keys, key, side="right"))
+
+        if low == high:
+            if mode == NEXT_SMALLER and low > 0:
+                high = low
+                low = int(np.searchsorted(self.keys, self.keys[low - 1], side="left"))
+            elif mode == NEXT_LARGER and high < len(self.keys):
+                low = high
+                high = int(np.searchsorted(self.keys, self.keys[high], side="right"))
+            else:
+                return None
+
+        return int(self.positions[high - 1 if last else low])
+
+
+class _LineIndex:
+    # Lookup structures over one row, one column, or a whole range read row by row.
+    # Sorted keys and wildcard matches are built on first use and then reused.
+    def __init__(self, values: list[Any]) -> None:
+        self.values = values
+        self.size = len(values)
+        # Booleans are not numbers here: TRUE does not match 1, as in Excel.
+        self.numbers = np.array(
+            [value if value.__class__ in _NUMBER_TYPES else np.nan for value in values],
+            dtype=np.float64,
+        )
+        self._number_keys: _SortedKeys | None = None
+        self._text_keys: _SortedKeys | None = None
+        self._blank: np.ndarray | None = None
+        self._patterns: dict[str, np.ndarray] = {}
+
+    def number_keys(self) -> _SortedKeys:
+        if self._number_keys is None:
+            positions = np.flatnonzero(~np.isnan(self.numbers))
+            self._number_keys = _SortedKeys(self.numbers[positions], positions)
+        return self._number_keys
+
+    def text_keys(self) -> _SortedKeys:
+        # Text matches ignore case, like Excel.
+        if self._text_keys is None:
+            texts = [(position, value.casefold()) for position, value in enumerate(self.values) if value.__class__ is str and value]
+            positions = np.array([position for position, _ in texts], dtype=np.int64)
+            keys = np.empty(len(texts), dtype=object)
+            keys[:] = [text for _, text in texts]
+            self._text_keys = _SortedKeys(keys, positions)
+        return self._text_keys
+
+    def blank(self) -> np.ndarray:
+        if self._blank is None:
+            self._blank = np.array([value is None or value == "" for value in self.values], dtype=bool)
+        return self._blank
+
+    def pattern_matches(self, pattern: re.Pattern[str]) -> np.ndarray:
+        matches = self._patterns.get(pattern.pattern)
+        if matches is None:
+            matches = self._patterns[pattern.pattern] = np.flatnonzero(
+                [value.__class__ is str and pattern.fullmatch(value) is not None for value in self.values]
+            )
+        return matches
+
+    def logical_matches(self, value: bool) -> np.ndarray:
+        return np.flatnonzero([item is value for item in self.values])
+
+
+class RangeTable:
+    # Evaluated values of a range passed to a lookup function, with indexes over its
+    # columns, rows or all cells built on first use. Calculators keep a table until a cell
+    # inside the range changes, so repeated lookups into one table share its indexes.
+    def __init__(self, values: np.ndarray, error: str | None = None) -> None:
+        self.values = values
+        # First error value inside the range; reading the table returns it.
+        self.error = error
+        self._indexes: dict[tuple[int, int], _LineIndex] = {}
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.values.shape
+
+    def _index(self, axis: int, position: int) -> _LineIndex:
+        # axis 0: a column, 1: a row, -1: every cell row by row.
+        index = self._indexes.get((axis, position))
+        if index is None:
+            if axis == 0:
+                line = self.values[:, position]
+            elif axis == 1:
+                line = self.values[position]
+            else:
+                line = self.values.ravel()
+            index = self._indexes[axis, position] = _LineIndex(line.tolist())
+        return index
+
+    def column(self, col: int) -> _LineIndex:
+        return self._index(0, col)
+
+    def row(self, row: int) -> _LineIndex:
+        return self._index(1, row)
+
+    def cells(self) -> _LineIndex:
+        return self._index(-1, 0)
+
+    def line(self) -> _LineIndex:
+        # The single row or column of a one-dimensional range.
+        rows, cols = self.shape
+        if cols == 1:
+            return self.column(0)
+        if rows == 1:
+            return self.row(0)
+        raise FormulaError(NA_ERROR)
+
+
+def to_grid(value: Any) -> np.ndarray:
+    # Any value as a 2-D object array: arrays keep their shape, lists become one column
+    # and a single value one cell.
+    if isinstance(value, RangeTable):
+        return value.values
+    if isinstance(value, np.ndarray):
+        return value if value.ndim == 2 else value.reshape(-1, 1)
+
+    items = list(flatten(value)) if isinstance(value, (list, tuple)) else [value]
+    grid = np.empty((len(items), 1), dtype=object)
+    grid[:, 0] = items
+    return grid
+
+
+def _table(value: Any) -> RangeTable:
+    # Range arguments arrive as RangeTable objects; arrays and single values are wrapped.
+    if isinstance(value, RangeTable):
+        if value.error is not None:
+            raise FormulaError(value.error)
+        return value
+    return RangeTable(to_grid(value))
+
+
+def _cell_result(value: Any) -> Any:
+    # Blank cells returned by a lookup read as zero.
+    return 0 if value is None or value == "" else value
+
+
+def _whole_number(value: Any) -> int:
+    number = to_number(value)
+    if number is None:
+        raise FormulaError(VALUE_ERROR)
+    return int(number)
+
+
+def _criterion(value: Any) -> tuple[str, Any]:
+    # Split SUMIF/COUNTIF criteria such as ">=10", "<>done" or "a*" into (operator, operand).
+    if isinstance(value, (list, tuple, RangeTable)):
+        raise FormulaError(VALUE_ERROR)
+    if not isinstance(value, str):
+        return "=", value
+
+    symbol = next((symbol for symbol in _CRITERIA_OPERATORS if value.startswith(symbol)), "")
+    operand = value[len(symbol) :]
+    if operand.strip().upper() in ("TRUE", "FALSE"):
+        return symbol or "=", operand.strip().upper() == "TRUE"
+
+    number = to_number(operand) if operand.strip() else None
+    return symbol or "=", operand if number is None else number
+
+
+def _criteria_matches(index: _LineIndex, criteria: Any) -> np.ndarray:
+    # Positions (ascending) of the values matching SUMIF/COUNTIF criteria.
+    symbol, operand = _criterion(criteria)
+    negate = symbol == "<>"
+    if negate:
+        symbol = "="
+
+    if isinstance(operand, bool):
+        found = index.logical_matches(operand) if symbol == "=" else np.empty(0, dtype=np.int64)
+    elif isinstance(operand, _NUMBER_TYPES):
+        found = index.number_keys().select(symbol, float(operand))
+    elif operand == "":
+        found = np.flatnonzero(index.blank()) if symbol == "=" else np.empty(0, dtype=np.int64)
+    else:
+        pattern = _wildcard_pattern(operand) if symbol == "=" else None
+        if pattern is not None:
+            found = index.pattern_matches(pattern)
+        else:
+            found = index.text_keys().select(symbol, operand.casefold())
+
+    if negate:
+        keep = np.ones(index.size, dtype=bool)
+        keep[found] = False
+        return np.flatnonzero(keep)
+    return np.sort(found)
+
+
+def _find(index: _LineIndex, key: Any, mode: int, last: bool = False) -> int | None:
+    # Position of `key` in a row or column for one of the XLOOKUP match modes.
+    if isinstance(key, bool):
+        found = index.logical_matches(key)
+        if not found.size:
+            return None
+        return int(found[-1 if last else 0])
+
+    if key is None or isinstance(key, _NUMBER_TYPES):
+        return index.number_keys().nearest(float(key or 0), mode, last)
+
+    text = str(key)
+    if mode == WILDCARD_MATCH:
+        pattern = _wildcard_pattern(text)
+        if pattern is not None:
+            found = index.pattern_matches(pattern)
+            return int(found[-1 if last else 0]) if found.size else None
+        mode = EXACT_MATCH
+
+    return index.text_keys().nearest(text.casefold(), mode, last)
+
+
+def fx_sumif(cells, criteria, sum_cells=None):
+    table = _table(cells)
+    positions = _criteria_matches(table.cells(), criteria)
+    if sum_cells is None:
+        numbers = table.cells().numbers
+    else:
+        # Like Excel, the sum range is read from its top-left cell with the criteria range's shape.
+        source = _table(sum_cells)
+        numbers = np.full(table.shape, np.nan)
+        block = source.cells().numbers.reshape(source.shape)[: table.shape[0], : table.shape[1]]
+        numbers[: block.shape[0], : block.shape[1]] = block
+        numbers = numbers.ravel()
+
+    return clean_numeric(float(np.nansum(numbers[positions])))
+
+
+def fx_countif(cells, criteria):
+    return int(_criteria_matches(_table(cells).cells(), criteria).size)
+
+
+def fx_vlookup(key, cells, col_number, approximate=True):
+    # Approximate matching (the default) finds the largest key not above `key`.
+    table = _table(cells)
+    col = _whole_number(col_number)
+    if col < 1:
+        raise FormulaError(VALUE_ERROR)
+    if col > table.shape[1]:
+        raise FormulaError(REF_ERROR)
+
+    mode = NEXT_SMALLER if approximate else WILDCARD_MATCH
+    row = _find(table.column(0), key, mode, last=bool(approximate))
+    if row is None:
+        raise FormulaError(NA_ERROR)
+    return _cell_result(table.values[row, col - 1])
+
+
+def fx_xlookup(key, lookup_cells, return_cells, if_not_found=None, match_mode=EXACT_MATCH, search_mode=1):
+    lookup = _table(lookup_cells)
+    results = _table(return_cells)
+    index = lookup.line()
+    by_row = lookup.shape[1] == 1
+    if (results.shape[0] if by_row else results.shape[1]) != index.size:
+        raise FormulaError(VALUE_ERROR)
+
+    mode = _whole_number(match_mode)
+    if mode not in (EXACT_MATCH, NEXT_SMALLER, NEXT_LARGER, WILDCARD_MATCH):
+        raise FormulaError(VALUE_ERROR)
+
+    position = _find(index, key, mode, last=_whole_number(search_mode) < 0)
+    if position is None:
+        if if_not_found is None:
+            raise FormulaError(NA_ERROR)
+        return if_not_found
+
+    # A multi-column return range gives the whole matching row (or column), which spills.
+    picked = results.values[position : position + 1] if by_row else results.values[:, position : position + 1]
+    if picked.size == 1:
+        return _cell_result(picked[0, 0])
+    return picked
+
+
+def fx_match(key, cells, match_type=1):
+    # 1: largest value not above key, 0: exact (with wildcards), -1: smallest value not below key.
+    kind = _whole_number(match_type)
+    mode = WILDCARD_MATCH if kind == 0 else NEXT_SMALLER if kind > 0 else NEXT_LARGER
+    position = _find(_table(cells).line(), key, mode, last=kind > 0)
+    if position is None:
+        raise FormulaError(NA_ERROR)
+    return position + 1
+
+
+def fx_index(cells, row_number, col_number=None):
+    # A row or column number of 0 returns the whole column or row.
+    table = _table(cells)
+    rows, cols = table.shape
+    row = _whole_number(row_number)
+    if col_number is not None:
+        col = _whole_number(col_number)
+    elif rows == 1 and cols > 1:
+        # In a single row, the only number picks the column.
+        row, col = 1, row
+    else:
+        col = 1 if cols == 1 else 0
+
+    if not (0 <= row <= rows and 0 <= col <= cols):
+        raise FormulaError(REF_ERROR)
+
+    if row and col:
+        return _cell_result(table.values[row - 1, col - 1])
+    return table.values[slice(row - 1, row) if row else slice(None), slice(col - 1, col) if col else slice(None)]
+
+
+class _Elements:
+    # Per-element keys of an array in Excel's terms: kind (0 number or blank, 1 text,
+    # 2 logical), numeric value (NaN for text), case-folded text, and the error value held
+    # by the element, if any.
+    def __init__(self, grid: np.ndarray) -> None:
+        self.shape = grid.shape
+        self.items = grid.ravel().tolist()
+        kinds, numbers, texts, errors, blank = [], [], [], [], []
+
+        for item in self.items:
+            if item.__class__ in _NUMBER_TYPES:
+                kinds.append(0)
+                numbers.append(item)
+                texts.append("")
+                errors.append(None)
+                blank.append(False)
+            elif item is None or item == "":
+                kinds.append(0)
+                numbers.append(0.0)
+                texts.append("")
+                errors.append(None)
+                blank.append(True)
+            elif item.__class__ is bool:
+                kinds.append(2)
+                numbers.append(float(item))
+                texts.append("")
+                errors.append(None)
+                blank.append(False)
+            else:
+                text = str(item)
+                kinds.append(1)
+                numbers.append(np.nan)
+                texts.append(text.casefold())
+                errors.append(text if text in ERROR_VALUES else None)
+                blank.append(False)
+
+        self.kinds = np.array(kinds, dtype=np.int8)
+        self.numbers = np.array(numbers, dtype=np.float64)
+        self.texts = np.array(texts, dtype=object)
+        self.errors = np.array(errors, dtype=object)
+        self.blank = np.array(blank, dtype=bool)
+
+    def first_error(self) -> str | None:
+        found = np.flatnonzero(np.not_equal(self.errors, None))
+        return self.errors[found[0]] if found.size else None
+
+    def arithmetic_numbers(self) -> np.ndarray:
+        # Numeric values with numeric text converted; other text stays NaN (#VALUE!).
+        numbers = self.numbers.copy()
+        for position in np.flatnonzero(self.kinds == 1).tolist():
+            number = to_number(self.items[position])
+            if number is not None:
+                numbers[position] = number
+        return numbers
+
+
+def _element_text(item: Any) -> str:
+    # Text form of one array element for &, matching how cells display values.
+    if isinstance(item, bool):
+        return "TRUE" if item else "FALSE"
+    if isinstance(item, float):
+        return str(clean_numeric(item))
+    return "" if item is None else str(item)
+
+
+def array_operation(symbol: str, left: Any, right: Any) -> np.ndarray:
+    # Operator applied element by element when an operand is an array (a range or an array
+    # result). Single values and single rows or columns broadcast, as in Excel; elements that
+    # fail hold error values instead of failing the whole formula.
+    left_grid, right_grid = to_grid(left), to_grid(right)
+    try:
+        shape = np.broadcast_shapes(left_grid.shape, right_grid.shape)
+    except ValueError:
+        raise FormulaError(VALUE_ERROR) from None
+
+    first = _Elements(np.broadcast_to(left_grid, shape))
+    second = _Elements(np.broadcast_to(right_grid, shape))
+
+    if symbol in _ARRAY_ARITHMETIC:
+        left_numbers = first.arithmetic_numbers()
+        right_numbers = second.arithmetic_numbers()
+        with np.errstate(all="ignore"):
+            numbers = _ARRAY_ARITHMETIC[symbol](left_numbers, right_numbers)
+        result = numbers.astype(object)
+        result[~np.isfinite(numbers)] = NUM_ERROR
+        if symbol == "/":
+            result[right_numbers == 0] = DIV_ZERO_ERROR
+        result[np.isnan(left_numbers) | np.isnan(right_numbers)] = VALUE_ERROR
+    elif symbol in _ARRAY_COMPARISONS:
+        # Numbers sort before text and text before logicals; text compares without case.
+        compare = _ARRAY_COMPARISONS[symbol]
+        same_kind = np.where(
+            first.kinds == 1,
+            compare(first.texts, second.texts).astype(bool),
+            compare(first.numbers, second.numbers),
+        )
+        result = np.where(first.kinds == second.kinds, same_kind, compare(first.kinds, second.kinds)).astype(object)
+    elif symbol == "&":
+        result = np.array(
+            [_element_text(a) + _element_text(b) for a, b in zip(first.items, second.items)],
+            dtype=object,
+        )
+    else:
+        raise FormulaError(VALUE_ERROR)
+
+    # Errors already inside an operand pass through, the left one first.
+    for elements in (second, first):
+        failed = np.not_equal(elements.errors, None)
+        result[failed] = elements.errors[failed]
+    return result.reshape(shape)
+
+
+def _clean_element(value: float) -> float | int | str:
+    return clean_numeric(value) if math.isfinite(value) else NUM_ERROR
+
+
+def array_result(value: Any) -> Any:
+    # Normalized formula result for an array: integral floats become ints, non-finite
+    # floats become #NUM!, a single element stands for itself, and an empty array is #CALC!.
+    grid = to_grid(value)
+    if not grid.size:
+        return CALC_ERROR
+
+    if grid.dtype.kind == "f":
+        integral = np.isfinite(grid).all() and (grid == np.trunc(grid)).all() and (np.abs(grid) < 2**53).all()
+        if integral:
+            grid = grid.astype(np.int64)
+
+    cleaned = np.empty(grid.shape, dtype=object)
+    cleaned[...] = [
+        [_clean_element(item) if isinstance(item, float) else item for item in row] for row in grid.tolist()
+    ]
+    return cleaned[0, 0] if cleaned.size == 1 else cleaned
+
+
+def _sort_order(keys: _Elements, descending: bool) -> np.ndarray:
+    # Row order for one column of sort keys; blanks go last either way, like Excel.
+    frame = pd.DataFrame(
+        {
+            "blank": keys.blank,
+            "kind": keys.kinds,
+            "number": np.nan_to_num(keys.numbers),
+            "text": keys.texts,
+        }
+    )
+    ascending = not descending
+    return frame.sort_values(
+        ["blank", "kind", "number", "text"],
+        ascending=[True, ascending, ascending, ascending],
+        kind="stable",
+    ).index.to_numpy()
+
+
+def fx_sort(cells, sort_index=1, sort_order=1, by_col=False):
+    grid = _table(cells).values
+    lines = grid.T if by_col else grid
+    index = _whole_number(sort_index)
+    order = _whole_number(sort_order)
+    if not 1 <= index <= lines.shape[1] or order not in (1, -1):
+        raise FormulaError(VALUE_ERROR)
+
+    result = lines[_sort_order(_Elements(lines[:, index - 1 : index]), order == -1)]
+    return result.T if by_col else result
+
+
+def fx_filter(cells, include, if_empty=None):
+    # `include` is one column with a value per row (or one row with a value per column).
+    grid = _table(cells).values
+    flags = _Elements(to_grid(include))
+    error = flags.first_error()
+    if error is not None:
+        raise FormulaError(error)
+    if (flags.kinds == 1).any():
+        raise FormulaError(VALUE_ERROR)
+
+    keep = flags.numbers != 0
+    if flags.shape == (grid.shape[0], 1):
+        result = grid[keep]
+    elif flags.shape == (1, grid.shape[1]):
+        result = grid[:, keep]
+    else:
+        raise FormulaError(VALUE_ERROR)
+
+    if not result.size:
+        if if_empty is None:
+            raise FormulaError(CALC_ERROR)
+        return if_empty
+    return result
+
+
+def fx_unique(cells, by_col=False, exactly_once=False):
+    # Distinct rows (or columns); text compares without case. exactly_once keeps only
+    # rows that occur once.
+    grid = _table(cells).values
+    lines = grid.T if by_col else grid
+    columns = {}
+    for col in range(lines.shape[1]):
+        keys = _Elements(lines[:, col : col + 1])
+        columns[f"kind{col}"] = np.where(keys.blank, -1, keys.kinds)
+        columns[f"number{col}"] = np.nan_to_num(keys.numbers)
+        columns[f"text{col}"] = keys.texts
+
+    duplicated = pd.DataFrame(columns).duplicated(keep=False if exactly_once else "first").to_numpy()
+    result = lines[~duplicated]
+    return result.T if by_col else result
+
+
+def fx_sequence(rows, cols=1, start=1, step=1):
+    row_count = _whole_number(rows)
+    col_count = _whole_number(cols)
+    if row_count < 0 or col_count < 0:
+        raise FormulaError(VALUE_ERROR)
+    if not row_count or not col_count:
+        raise FormulaError(CALC_ERROR)
+    if row_count * col_count > MAX_ARRAY_CELLS:
+        raise FormulaError(NUM_ERROR)
+
+    first = to_number(start)
+    increment = to_number(step)
+    if first is None or increment is None:
+        raise FormulaError(VALUE_ERROR)
+    return first + increment * np.arange(row_count * col_count, dtype=np.float64).reshape(row_count, col_count)
+
+
+# Functions whose range arguments may be passed as cached float64 arrays.
+NUMERIC_RANGE_FUNCTIONS = frozenset({"SUM", "AVERAGE", "MIN", "MAX", "COUNT"})
+# Argument positions of lookup and array functions whose ranges are passed as RangeTable objects.
+RANGE_TABLE_ARGUMENTS = {
+    "SUMIF": (0, 2),
+    "COUNTIF": (0,),
+    "VLOOKUP": (1,),
+    "XLOOKUP": (1, 2),
+    "MATCH": (1,),
+    "INDEX": (0,),
+    "SORT": (0,),
+    "FILTER": (0, 1),
+    "UNIQUE": (0,),
+}
+
+FUNCTION_MAP = {
+    "SUM": fx_sum,
+    "AVERAGE": fx_average,
+    "MIN": fx_min,
+    "MAX": fx_max,
+    "COUNT": fx_count,
+    "ROUND": fx_round,
+    "IF": fx_if,
+    "AND": fx_and,
+    "OR": fx_or,
+    "NOT": fx_not,
+    "LEN": fx_len,
+    "CONCAT": fx_concat,
+    "SUMIF": fx_sumif,
+    "COUNTIF": fx_countif,
+    "VLOOKUP": fx_vlookup,
+    "XLOOKUP": fx_xlookup,
+    "MATCH": fx_match,
+    "INDEX": fx_index,
+    "SORT": fx_sort,
+    "FILTER": fx_filter,
+    "UNIQUE": fx_unique,
+    "SEQUENCE": fx_sequence,
+}
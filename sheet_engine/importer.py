@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterator
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from sheet_engine.store import SheetStore
+
+IMPORT_CHUNK_ROWS = 2000
+# Formats that can hold several sheets; these are opened as lazy workbooks.
+WORKBOOK_EXTENSIONS = (".xlsx", ".xls")
+
+# Called with (fraction complete, rows imported so far).
+ProgressCallback = Callable[[float, int], None]
+
+# Each reader yields (string block, truncated so far, fraction complete).
+_Blocks = Iterator[tuple[np.ndarray, bool, float]]
+
+
+@dataclass(frozen=True)
+class ImportResult:
+    store: SheetStore
+    # True when the file had more rows or columns than the target window.
+    truncated: bool
+
+
+def _cell_text(value: Any) -> str:
+    # Match pandas' dtype=str rendering of openpyxl values.
+    if value is None:
+        return ""
+
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+
+    return str(value)
+
+
+def _file_size(uploaded_file: BinaryIO) -> int:
+    size = getattr(uploaded_file, "size", None)
+    if size is None:
+        position = uploaded_file.tell()
+        size = uploaded_file.seek(0, 2)
+        uploaded_file.seek(position)
+    return max(int(size), 1)
+
+
+def _csv_blocks(uploaded_file: BinaryIO, max_rows: int, max_cols: int) -> _Blocks:
+    # Chunked CSV reader that stops parsing once max_rows rows have been taken.
+    size = _file_size(uploaded_file)
+    reader = pd.read_csv(
+        uploaded_file,
+        header=None,
+        dtype=str,
+        chunksize=IMPORT_CHUNK_ROWS,
+        nrows=max_rows + 1,
+    )
+
+    with reader:
+        rows_read = 0
+        truncated = False
+
+        for chunk in reader:
+            truncated = truncated or chunk.shape[1] > max_cols
+            remaining = max_rows - rows_read
+            if len(chunk) > remaining:
+                chunk = chunk.iloc[:remaining]
+                truncated = True
+
+            rows_read += len(chunk)
+            fraction = max(rows_read / max_rows, uploaded_file.tell() / size)
+            if len(chunk):
+                yield chunk.iloc[:, :max_cols].fillna("").to_numpy(dtype=object), truncated, min(fraction, 1.0)
+
+            if rows_read >= max_rows:
+                return
+
+
+def _xlsx_blocks(uploaded_file: BinaryIO, max_rows: int, max_cols: int, sheet_name: str | None = None) -> _Blocks:
+    # Read-only openpyxl row iteration over one worksheet (default: the first), capped to the window.
+    workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+
+    try:
+        worksheet = workbook.worksheets[0] if sheet_name is None else workbook[sheet_name]
+        sheet_rows = worksheet.max_row or max_rows
+        sheet_cols = worksheet.max_column or max_cols
+        truncated = sheet_rows > max_rows or sheet_cols > max_cols
+        expected_rows = min(sheet_rows, max_rows)
+
+        block: list[list[str]] = []
+        rows_read = 0
+
+        for row in worksheet.iter_rows(max_row=max_rows, max_col=min(sheet_cols, max_cols), values_only=True):
+            block.append([_cell_text(value) for value in row])
+            rows_read += 1
+
+            if len(block) == IMPORT_CHUNK_ROWS:
+                yield np.array(block, dtype=object), truncated, min(rows_read / expected_rows, 1.0)
+                block = []
+
+        if block:
+            yield np.array(block, dtype=object), truncated, 1.0
+    finally:
+        workbook.close()
+
+
+def _xls_blocks(uploaded_file: BinaryIO, max_rows: int, max_cols: int, sheet_name: str | None = None) -> _Blocks:
+    # openpyxl cannot stream legacy .xls files, so this is a capped eager read of one sheet.
+    imported = pd.read_excel(
+        uploaded_file,
+        sheet_name=0 if sheet_name is None else sheet_name,
+        header=None,
+        dtype=str,
+        nrows=max_rows + 1,
+    )
+    truncated = imported.shape[0] > max_rows or imported.shape[1] > max_cols
+
+    if not imported.empty:
+        yield imported.iloc[:max_rows, :max_cols].fillna("").to_numpy(dtype=object), truncated, 1.0
+
+
+def _trim_blank_edges(store: SheetStore) -> SheetStore:
+    # Drop trailing rows and columns that are entirely blank (common in XLSX dimensions).
+    filled = store.number_mask | ~np.equal(store.text, None)
+    used_rows = np.flatnonzero(filled.any(axis=1))
+    used_cols = np.flatnonzero(filled.any(axis=0))
+    last_row = int(used_rows[-1]) + 1 if used_rows.size else 0
+    last_col = int(used_cols[-1]) + 1 if used_cols.size else 0
+
+    if (last_row, last_col) == store.shape:
+        return store
+
+    return SheetStore(
+        store.numbers[:last_row, :last_col].copy(),
+        store.number_mask[:last_row, :last_col].copy(),
+        store.text[:last_row, :last_col].copy(),
+    )
+
+
+def import_sheet(
+    uploaded_file: BinaryIO,
+    max_rows: int,
+    max_cols: int,
+    on_progress: ProgressCallback | None = None,
+) -> ImportResult | None:
+    # Stream CSV/XLSX rows into a typed SheetStore, holding one chunk of raw text at a time.
+    # Returns None when the file has no data.
+    extension = Path(uploaded_file.name).suffix.lower()
+
+    if extension == ".xlsx":
+        blocks = _xlsx_blocks(uploaded_file, max_rows, max_cols)
+    elif extension == ".xls":
+        blocks = _xls_blocks(uploaded_file, max_rows, max_cols)
+    else:
+        blocks = _csv_blocks(uploaded_file, max_rows, max_cols)
+
+    return _collect(blocks, on_progress)
+
+
+def _collect(blocks: _Blocks, on_progress: ProgressCallback | None) -> ImportResult | None:
+    parts: list[SheetStore] = []
+    rows_read = 0
+    truncated = False
+
+    for strings, truncated, fraction in blocks:
+        parts.append(SheetStore.from_strings(strings))
+        rows_read += strings.shape[0]
+
+        if on_progress is not None:
+            on_progress(fraction, rows_read)
+
+    if not parts:
+        return None
+
+    store = _trim_blank_edges(SheetStore.stack(parts))
+    if 0 in store.shape:
+        return None
+
+    return ImportResult(store, truncated)
+
+
+class WorkbookFile:
+    # An uploaded XLSX/XLS file kept as bytes. Sheet names are read up front; the cells
+    # of a sheet are only parsed when read_sheet is called for it.
+    def __init__(self, name: str, data: bytes) -> None:
+        self.name = name
+        self.data = data
+        self.extension = Path(name).suffix.lower()
+
+        if self.extension == ".xlsx":
+            # Read-only mode parses the workbook part only, not the worksheets.
+            workbook = load_workbook(BytesIO(data), read_only=True)
+            self.sheet_names = list(workbook.sheetnames)
+            workbook.close()
+        else:
+            with pd.ExcelFile(BytesIO(data)) as excel_file:
+                self.sheet_names = [str(name) for name in excel_file.sheet_names]
+
+    @classmethod
+    def from_upload(cls, uploaded_file: BinaryIO) -> WorkbookFile:
+        uploaded_file.seek(0)
+        return cls(uploaded_file.name, uploaded_file.read())
+
+    def read_sheet(
+        self,
+        sheet_name: str,
+        max_rows: int,
+        max_cols: int,
+        on_progress: ProgressCallback | None = None,
+    ) -> ImportResult | None:
+        # Stream one sheet into a SheetStore; None when it has no data.
+        source = BytesIO(self.data)
+        if self.extension == ".xlsx":
+            blocks = _xlsx_blocks(source, max_rows, max_cols, sheet_name)
+        else:
+            blocks = _xls_blocks(source, max_rows, max_cols, sheet_name)
+        return _collect(blocks, on_progress)
@@ -0,0 +1,1052 @@
+from __future__ import annotations
+
+import heapq
+from collections import deque
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+from sheet_engine.errors import CYCLE_VALUE, ERROR_VALUES, SPILL_ERROR, FormulaError
+from sheet_engine.formulas import (
+    CompiledFormula,
+    FormulaContext,
+    RangeRef,
+    column_name,
+    compile_formula,
+    first_error,
+    is_error,
+    same_sheet,
+)
+from sheet_engine.functions import RangeTable, clean_numeric, to_number
+from sheet_engine.store import SheetStore
+from sheet_engine.workbook import Workbook, sheet_key
+
+# Values passed back and forth between sheets stop after this many rounds per sheet;
+# formulas still changing then sit on a cross-sheet cycle.
+MAX_SHEET_PASSES = 100
+# Formulas reading spilled cells are re-evaluated until spills settle; an array formula
+# whose spill still changes after this many rounds reads its own spill area.
+MAX_SPILL_PASSES = 100
+
+Cell = tuple[int, int]
+# (row_from, col_from, row_to, col_to) block: inclusive when read from another sheet,
+# half-open for spill areas.
+Box = tuple[int, int, int, int]
+
+
+def parse_literal(value: Any) -> Any:
+    # Interpret a non-formula text cell as bool, number, or text.
+    text = "" if value is None else str(value)
+    stripped = text.strip()
+
+    if stripped == "":
+        return ""
+
+    upper_value = stripped.upper()
+    if upper_value == "TRUE":
+        return True
+    if upper_value == "FALSE":
+        return False
+
+    number = to_number(stripped)
+    if number is not None:
+        return clean_numeric(number)
+
+    return text
+
+
+def _formula_for(raw_value: Any, parsed: dict[str, CompiledFormula]) -> CompiledFormula | None:
+    # Compiled formula for raw cell text, None for literals. `parsed` maps expressions to
+    # formulas compiled earlier, so repeated or unchanged text is parsed once.
+    if not (isinstance(raw_value, str) and raw_value.startswith("=")):
+        return None
+
+    expression = raw_value[1:].strip()
+    formula = parsed.get(expression)
+    if formula is None:
+        formula = parsed[expression] = compile_formula(expression)
+    return formula
+
+
+class _ValuesContext:
+    # Reads precedents from values that were already computed in topological order.
+    def __init__(self, calculator: SheetCalculator):
+        self.calculator = calculator
+
+    def cell_value(self, row: int, col: int) -> Any:
+        return self.calculator.value_at(row, col)
+
+    def range_values(self, ref: RangeRef) -> list[Any]:
+        row_from, col_from, row_to, col_to = self.calculator.clip(ref)
+        values = self.calculator.value_block(slice(row_from, row_to), slice(col_from, col_to)).ravel().tolist()
+        error = first_error(values)
+        if error is not None:
+            raise FormulaError(error)
+        return values
+
+    def numeric_range(self, ref: RangeRef) -> Any:
+        # Literal-only ranges come back as cached float64 arrays; others as plain values.
+        numbers = self.calculator.literal_numbers(ref)
+        if numbers is None:
+            return self.range_values(ref)
+        return numbers
+
+    def range_table(self, ref: RangeRef) -> RangeTable:
+        return self.calculator.range_table(ref)
+
+    def sheet_context(self, name: str) -> FormulaContext | None:
+        calculator = self.calculator.sheet_calculator(name)
+        if calculator is None:
+            return None
+        if calculator is self.calculator:
+            return self
+        return _ValuesContext(calculator)
+
+
+def _clean_numbers(numbers: np.ndarray) -> list[Any]:
+    # Vectorized clean_numeric: integral floats become Python ints in bulk.
+    values = np.empty(numbers.shape, dtype=object)
+    integral = (numbers == np.trunc(numbers)) & (np.abs(numbers) < 2**53)
+
+    values[integral] = numbers[integral].astype(np.int64).tolist()
+    values[~integral] = [clean_numeric(number) for number in numbers[~integral].tolist()]
+    return values.tolist()
+
+
+def _with_numbers(values: np.ndarray, numbers: np.ndarray, number_mask: np.ndarray) -> np.ndarray:
+    # Copy of a values block with its numeric literal cells (None there) filled from numbers.
+    values = values.copy()
+    if number_mask.any():
+        values[number_mask] = _clean_numbers(numbers[number_mask])
+    return values
+
+
+@dataclass(frozen=True)
+class ValueSnapshot:
+    # Copy of a sheet's evaluated values taken on the script thread. Later edits and
+    # recalculations do not touch it, so downloads can build their frame on Streamlit's
+    # worker thread.
+    values: np.ndarray
+    numbers: np.ndarray
+    number_mask: np.ndarray
+
+    def frame(self) -> pd.DataFrame:
+        # Same frame as SheetCalculator.preview_frame() gave when the snapshot was taken.
+        return pd.DataFrame(
+            _with_numbers(self.values, self.numbers, self.number_mask),
+            columns=[column_name(i) for i in range(self.values.shape[1])],
+        )
+
+
+def _box_counts(mask: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    # Count True cells of mask inside each half-open (row_from, col_from, row_to, col_to)
+    # box with one summed-area table, instead of slicing the mask once per box.
+    rows, cols = mask.shape
+    table = np.zeros((rows + 1, cols + 1), dtype=np.int64)
+    table[1:, 1:] = mask.cumsum(axis=0).cumsum(axis=1)
+
+    row_from, col_from, row_to, col_to = boxes.T
+    return table[row_to, col_to] - table[row_from, col_to] - table[row_to, col_from] + table[row_from, col_from]
+
+
+def _box_slices(box: Box) -> tuple[slice, slice]:
+    # Slices of a half-open (row_from, col_from, row_to, col_to) box.
+    return slice(box[0], box[2]), slice(box[1], box[3])
+
+
+def _overlap(first: Box, second: Box) -> Box | None:
+    # Intersection of two half-open boxes; None when they do not overlap.
+    box = (max(first[0], second[0]), max(first[1], second[1]), min(first[2], second[2]), min(first[3], second[3]))
+    return box if box[0] < box[2] and box[1] < box[3] else None
+
+
+def _strongly_connected(cells: set[Cell], precedents: dict[Cell, set[Cell]]) -> list[list[Cell]]:
+    # Tarjan's algorithm (iterative) over the precedent edges between `cells`, in O(V+E).
+    # A component is emitted only after every component it reads from, so the result is
+    # already in evaluation order.
+    index: dict[Cell, int] = {}
+    lowlink: dict[Cell, int] = {}
+    stack: list[Cell] = []
+    on_stack: set[Cell] = set()
+    components: list[list[Cell]] = []
+
+    for root in sorted(cells):
+        if root in index:
+            continue
+
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(precedents.get(root, ())))]
+
+        while work:
+            cell, inputs = work[-1]
+            for precedent in inputs:
+                if precedent not in cells:
+                    continue
+                if precedent not in index:
+                    index[precedent] = lowlink[precedent] = len(index)
+                    stack.append(precedent)
+                    on_stack.add(precedent)
+                    work.append((precedent, iter(precedents.get(precedent, ()))))
+                    break
+                if precedent in on_stack:
+                    lowlink[cell] = min(lowlink[cell], index[precedent])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[cell])
+
+                if lowlink[cell] == index[cell]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == cell:
+                            break
+                    components.append(component)
+
+    return components
+
+
+def _same_value(old: Any, new: Any) -> bool:
+    # Exact comparison that treats NaN as equal to itself, so unchanged results stop propagating.
+    if type(old) is not type(new):
+        return False
+    return old == new or (old != old and new != new)
+
+
+class SheetCalculator:
+    # Persistent precedent/dependent graph that recalculates only changed cells.
+    #
+    # Single-cell references are explicit edges. Range references are kept in a
+    # range index instead of being expanded cell by cell: a dirty cell finds the
+    # formulas whose ranges cover it through a summed-area lookup, and only the
+    # formula cells inside a range get explicit edges (needed for ordering).
+    #
+    # References to other sheets of a workbook are not edges; they are kept per formula
+    # in external_refs and resolved through the owning WorkbookCalculator.
+    def __init__(self, name: str | None = None, book: WorkbookCalculator | None = None) -> None:
+        self.name = name
+        self.book = book
+        # Store the current values were computed from; its arrays are read, not copied.
+        self.store: SheetStore | None = None
+        self.store_version = -1
+        # Evaluated values. Numeric literal cells hold None and are read from the store's
+        # float64 array, so a numeric sheet does not keep one Python object per cell.
+        self.values = np.empty((0, 0), dtype=object)
+        # Compiled formula of every formula cell, parsed when the cell's text changes.
+        self.formulas: dict[Cell, CompiledFormula] = {}
+        self.precedents: dict[Cell, set[Cell]] = {}
+        self.dependents: dict[Cell, set[Cell]] = {}
+        self.range_refs: dict[Cell, list[tuple[int, int, int, int]]] = {}
+        self.external_refs: dict[Cell, list[tuple[str, Box]]] = {}
+        self.last_evaluated = 0
+        self.last_parsed = 0
+        # Cells whose values the last update may have changed; None after a reshape (all of them).
+        self.last_changed: np.ndarray | None = None
+        # Bumped whenever raw content changes; range caches are only valid for one version.
+        self.version = 0
+        self.numbers = np.empty((0, 0), dtype=np.float64)
+        self.formula_mask = np.zeros((0, 0), dtype=bool)
+        # Literal cells holding typed error text such as #N/A, and every cell holding an error.
+        self.literal_errors = np.zeros((0, 0), dtype=bool)
+        self.error_cells: set[Cell] = set()
+        # Array formulas by anchor cell: the half-open box their result needs (kept while
+        # blocked, so clearing the way re-evaluates them) and the box actually filled.
+        self.spill_boxes: dict[Cell, Box] = {}
+        self.spill_regions: dict[Cell, Box] = {}
+        # Cells holding part of another cell's array result.
+        self.spilled = np.zeros((0, 0), dtype=bool)
+        # (anchor, box) of spill areas written or cleared since they were last passed on.
+        self._spill_changes: list[tuple[Cell, Box]] = []
+        # Array formulas given #CYCLE! because their spills never settled; they are evaluated
+        # again on the next edit in case it broke the cycle.
+        self._stuck_spills: set[Cell] = set()
+        self._range_cache: dict[tuple[int, int, int, int], np.ndarray | None] = {}
+        # Lookup tables by clipped range bounds; dropped only when a cell inside changes.
+        self._tables: dict[tuple[int, int, int, int], RangeTable] = {}
+        self._range_table: tuple[np.ndarray, list[Cell]] | None = None
+        self._external_table: dict[str, tuple[np.ndarray, list[Cell]]] | None = None
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.values.shape
+
+    @property
+    def raw_numbers(self) -> np.ndarray:
+        return np.empty((0, 0), dtype=np.float64) if self.store is None else self.store.numbers
+
+    @property
+    def number_mask(self) -> np.ndarray:
+        return np.zeros((0, 0), dtype=bool) if self.store is None else self.store.number_mask
+
+    @property
+    def text(self) -> np.ndarray | None:
+        return None if self.store is None else self.store.text
+
+    def in_bounds(self, row: int, col: int) -> bool:
+        rows, cols = self.shape
+        return 0 <= row < rows and 0 <= col < cols
+
+    def clip(self, ref: RangeRef) -> tuple[int, int, int, int]:
+        # Range bounds clipped to the sheet, as half-open slice limits.
+        rows, cols = self.shape
+        row_from, col_from, row_to, col_to = ref.bounds
+        return (
+            min(max(row_from, 0), rows),
+            min(max(col_from, 0), cols),
+            min(row_to + 1, rows),
+            min(col_to + 1, cols),
+        )
+
+    def value_at(self, row: int, col: int) -> Any:
+        # References outside the sheet read as zero.
+        if not self.in_bounds(row, col):
+            return 0
+        value = self.values[row, col]
+        if value is None:
+            return clean_numeric(float(self.raw_numbers[row, col]))
+        return value
+
+    def value_block(self, rows: slice, cols: slice) -> np.ndarray:
+        # Evaluated values of a block as a new object array, numeric literals included.
+        return _with_numbers(self.values[rows, cols], self.raw_numbers[rows, cols], self.number_mask[rows, cols])
+
+    def snapshot(self) -> ValueSnapshot:
+        return ValueSnapshot(self.values.copy(), self.raw_numbers.copy(), self.number_mask.copy())
+
+    def literal_numbers(self, ref: RangeRef) -> np.ndarray | None:
+        # Float64 view of a range (NaN for blank/text), or None if it holds formulas or errors.
+        bounds = self.clip(ref)
+        if bounds in self._range_cache:
+            return self._range_cache[bounds]
+
+        row_from, col_from, row_to, col_to = bounds
+        numbers = None
+        block = (slice(row_from, row_to), slice(col_from, col_to))
+        if not (self.formula_mask[block].any() or self.literal_errors[block].any() or self.spilled[block].any()):
+            numbers = self.numbers[block].copy()
+            numbers.setflags(write=False)
+
+        self._range_cache[bounds] = numbers
+        return numbers
+
+    def range_table(self, ref: RangeRef) -> RangeTable:
+        # Evaluated values of a range with the lookup indexes built on them so far.
+        # Formula cells inside the range are its precedents, so they are final here.
+        bounds = self.clip(ref)
+        table = self._tables.get(bounds)
+        if table is None:
+            row_from, col_from, row_to, col_to = bounds
+            values = self.value_block(slice(row_from, row_to), slice(col_from, col_to))
+            table = self._tables[bounds] = RangeTable(values, first_error(values.ravel().tolist()))
+        return table
+
+    def _drop_tables(self, changed: np.ndarray) -> None:
+        # Forget lookup tables over any cell of the changed mask.
+        bounds = list(self._tables)
+        for index in np.flatnonzero(_box_counts(changed, np.array(bounds, dtype=np.int64))).tolist():
+            del self._tables[bounds[index]]
+
+    def sheet_calculator(self, name: str) -> SheetCalculator | None:
+        # Calculator for a sheet-qualified reference; None when the sheet does not exist.
+        if same_sheet(name, self.name):
+            return self
+        if self.book is None:
+            return None
+        return self.book.resolve(name)
+
+    def compute(self, cell: Cell, context: _ValuesContext) -> Any:
+        # Evaluate one formula cell; literal cells are filled in bulk by _update_cells.
+        formula = self.formulas[cell]
+        if formula.strict:
+            # An error among the inputs is the result; there is no need to evaluate.
+            error = self._input_error(cell)
+            if error is not None:
+                return error
+        return formula.evaluate(context)
+
+    def _input_error(self, cell: Cell) -> str | None:
+        # Error held by the first (topmost, leftmost) precedent that has one.
+        if not self.error_cells:
+            return None
+
+        failed = self.error_cells.intersection(self.precedents.get(cell, ()))
+        return self.values[min(failed)] if failed else None
+
+    def _set_value(self, cell: Cell, value: Any) -> None:
+        self.values[cell] = value
+        if value.__class__ is str and value in ERROR_VALUES:
+            self.error_cells.add(cell)
+        elif self.error_cells:
+            self.error_cells.discard(cell)
+
+    def _store_result(self, cell: Cell, value: Any) -> None:
+        # Formula result; arrays spill, and a formula that stops returning one clears its spill.
+        if value.__class__ is np.ndarray or cell in self.spill_boxes:
+            value = self._spill(cell, value)
+        self._set_value(cell, value)
+
+    def _spill(self, anchor: Cell, result: Any) -> Any:
+        # Fill the cells below and right of an array formula with its result, or give
+        # #SPILL! when any of them is not empty (#CYCLE! when the formula reads that area).
+        # Returns the anchor cell's own value.
+        old_region = self.spill_regions.pop(anchor, None)
+        old_values = None
+        if old_region is not None:
+            old_values = self.values[_box_slices(old_region)].copy()
+            self._clear_spill(old_region)
+        self.spill_boxes.pop(anchor, None)
+
+        new_region = None
+        value = result
+        if result.__class__ is np.ndarray:
+            row, col = anchor
+            box = (row, col, row + result.shape[0], col + result.shape[1])
+            if self._reads_own_spill(anchor, box):
+                value = CYCLE_VALUE
+            else:
+                self.spill_boxes[anchor] = box
+                if self._spill_fits(anchor, box):
+                    for other, _ in self._later_spills(anchor, box):
+                        self._yield_spill(other)
+                    self._write_spill(anchor, box, result)
+                    new_region = self.spill_regions[anchor] = box
+                    value = result[0, 0]
+                else:
+                    value = SPILL_ERROR
+
+        unchanged = old_region == new_region and (
+            new_region is None or all(map(_same_value, old_values.ravel().tolist(), result.ravel().tolist()))
+        )
+        if not unchanged:
+            self._spill_changes.extend((anchor, region) for region in {old_region, new_region} if region is not None)
+        return value
+
+    def _reads_own_spill(self, anchor: Cell, box: Box) -> bool:
+        # A formula depending, directly or through other formulas, on a cell of its own spill
+        # area is a circular reference: depending on which ran first it would settle on a
+        # different result, so it gives #CYCLE! instead of spilling.
+        mask = np.zeros(self.shape, dtype=bool)
+        mask[_box_slices(box)] = True
+        mask[anchor] = False
+        return anchor in self._affected((), mask)
+
+    def _spill_fits(self, anchor: Cell, box: Box) -> bool:
+        # A spill area must lie on the sheet and, apart from its anchor, be empty. When two
+        # spill areas overlap, the array formula first in (row, col) order wins whichever was
+        # evaluated first, so cells spilled by later ones do not count here.
+        rows, cols = self.shape
+        if box[2] > rows or box[3] > cols:
+            return False
+
+        block = _box_slices(box)
+        spilled = self.spilled[block].copy()
+        for _, overlap in self._later_spills(anchor, box):
+            spilled[overlap[0] - box[0] : overlap[2] - box[0], overlap[1] - box[1] : overlap[3] - box[1]] = False
+
+        text = self.text[block]
+        occupied = (
+            self.formula_mask[block]
+            | self.number_mask[block]
+            | spilled
+            | ~(np.equal(text, None) | (text == ""))
+        )
+        occupied[0, 0] = False
+        return not occupied.any()
+
+    def _later_spills(self, anchor: Cell, box: Box) -> list[tuple[Cell, Box]]:
+        # Array formulas after anchor whose filled spill area overlaps box, with the overlap.
+        found = []
+        for other, region in self.spill_regions.items():
+            overlap = _overlap(region, box) if other > anchor else None
+            if overlap is not None:
+                found.append((other, overlap))
+        return found
+
+    def _yield_spill(self, anchor: Cell) -> None:
+        # An earlier array formula takes part of this one's spill area: empty it and show
+        # #SPILL!. Its box stays recorded, so it spills again once that area shrinks.
+        region = self.spill_regions.pop(anchor)
+        self._clear_spill(region)
+        self._set_value(anchor, SPILL_ERROR)
+        self._spill_changes.append((anchor, region))
+
+    def _write_spill(self, anchor: Cell, box: Box, result: np.ndarray) -> None:
+        block = _box_slices(box)
+        self.values[block] = result
+        self.spilled[block] = True
+        self.spilled[anchor] = False
+
+        if ERROR_VALUES.intersection(result.ravel().tolist()):
+            for row, items in enumerate(result.tolist()):
+                for col, item in enumerate(items):
+                    if item.__class__ is str and item in ERROR_VALUES:
+                        self.error_cells.add((box[0] + row, box[1] + col))
+
+    def _clear_spill(self, box: Box) -> None:
+        # Empty the cells of a spill area that still hold spilled values.
+        block = _box_slices(box)
+        cleared = self.spilled[block].copy()
+        self.values[block][cleared] = ""
+        self.spilled[block] = False
+        if self.error_cells:
+            for row, col in np.argwhere(cleared).tolist():
+                self.error_cells.discard((box[0] + row, box[1] + col))
+
+    def _spill_anchors(self, changes: list[tuple[Cell | None, Box]]) -> list[Cell]:
+        # Array formulas whose spill box overlaps a changed box of another cell; they may
+        # now be blocked, or free to spill.
+        if not self.spill_boxes:
+            return []
+
+        anchors = list(self.spill_boxes)
+        boxes = np.array([self.spill_boxes[anchor] for anchor in anchors], dtype=np.int64)
+        found: dict[Cell, None] = {}
+        for owner, (row_from, col_from, row_to, col_to) in changes:
+            overlap = (
+                (boxes[:, 0] < row_to) & (boxes[:, 2] > row_from) & (boxes[:, 1] < col_to) & (boxes[:, 3] > col_from)
+            )
+            found.update((anchors[index], None) for index in np.flatnonzero(overlap).tolist() if anchors[index] != owner)
+        return list(found)
+
+    def update(self, store: SheetStore) -> None:
+        # Diff against the previous store snapshot and recompute dirty cells plus dependents.
+        if store is self.store and store.version == self.store_version:
+            return
+
+        edited = store.changed_cells(self.store_version) if store is self.store else None
+        reset = edited is None or self.shape != store.shape
+        # A reshape re-reads every cell; formulas whose text survived it are not parsed again.
+        parsed = {formula.expression: formula for formula in self.formulas.values()} if reset else {}
+        if reset:
+            self.values = np.empty(store.shape, dtype=object)
+            self.numbers = np.full(store.shape, np.nan)
+            self.formula_mask = np.zeros(store.shape, dtype=bool)
+            self.literal_errors = np.zeros(store.shape, dtype=bool)
+            self.error_cells = set()
+            self.spilled = np.zeros(store.shape, dtype=bool)
+            self.spill_boxes = {}
+            self.spill_regions = {}
+            self._spill_changes = []
+            self._stuck_spills = set()
+            self.formulas = {}
+            self.precedents = {}
+            self.dependents = {}
+            self.range_refs = {}
+            self.external_refs = {}
+            self._range_table = None
+            self._external_table = None
+            dirty_mask = np.ones(store.shape, dtype=bool)
+        else:
+            dirty_mask = edited
+
+        self.store = store
+        self.store_version = store.version
+        self.last_parsed = 0
+
+        if not reset and not dirty_mask.any():
+            self.last_changed = dirty_mask
+            return
+
+        spill_anchors = [] if reset else self._release_spills(dirty_mask)
+        self.version += 1
+        self._range_cache.clear()
+        if reset:
+            self._tables.clear()
+        elif self._tables:
+            self._drop_tables(dirty_mask)
+
+        dirty_formulas, dirty_literals = self._update_cells(dirty_mask, reset, parsed)
+        if reset:
+            affected = set(dirty_formulas)
+        else:
+            stuck = [cell for cell in self._stuck_spills if cell in self.formulas]
+            self._stuck_spills = set()
+            affected = self._affected([*dirty_formulas, *spill_anchors, *stuck], dirty_mask)
+
+        evaluated, spilled = self._evaluate(affected)
+        self.last_evaluated += dirty_literals
+        if not reset:
+            self.last_changed = self._cell_mask(evaluated, dirty_mask if spilled is None else dirty_mask | spilled)
+        else:
+            self.last_changed = None
+
+    def _release_spills(self, dirty_mask: np.ndarray) -> list[Cell]:
+        # Before an edit is applied: spills of edited array formulas are emptied (their cells
+        # join dirty_mask so they are re-read from the store), and the array formulas whose
+        # spill box contains an edited cell are returned for re-evaluation.
+        for anchor in [anchor for anchor in self.spill_boxes if dirty_mask[anchor]]:
+            self.spill_boxes.pop(anchor)
+            region = self.spill_regions.pop(anchor, None)
+            if region is not None:
+                block = _box_slices(region)
+                dirty_mask[block] |= self.spilled[block]
+                self.spilled[block] = False
+
+        if not self.spill_boxes:
+            return []
+
+        rows, cols = self.shape
+        anchors = list(self.spill_boxes)
+        boxes = np.array([self.spill_boxes[anchor] for anchor in anchors], dtype=np.int64)
+        boxes[:, [0, 2]] = np.minimum(boxes[:, [0, 2]], rows)
+        boxes[:, [1, 3]] = np.minimum(boxes[:, [1, 3]], cols)
+        return [anchors[index] for index in np.flatnonzero(_box_counts(dirty_mask, boxes)).tolist()]
+
+    def invalidate(self, cells: Iterable[Cell]) -> np.ndarray:
+        # Re-evaluate formulas whose cross-sheet inputs changed, plus their dependents here.
+        # Returns the mask of cells whose values actually changed.
+        affected = self._affected(cells, np.zeros(self.shape, dtype=bool))
+        previous = {cell: self.values[cell] for cell in affected}
+
+        evaluated, spilled = self._evaluate(affected)
+        changed = [
+            cell for cell in evaluated if cell not in previous or not _same_value(previous[cell], self.values[cell])
+        ]
+        return self._cell_mask(changed, spilled)
+
+    def mark_cycle(self, cells: Iterable[Cell]) -> np.ndarray:
+        # Give up on formulas caught in a cross-sheet cycle, and on everything that reads them.
+        # Returns the mask of cells that were not marked already.
+        marked = []
+        for cell in self._affected(cells, np.zeros(self.shape, dtype=bool)):
+            if not _same_value(self.values[cell], CYCLE_VALUE):
+                self._store_result(cell, CYCLE_VALUE)
+                marked.append(cell)
+
+        changed = self._cell_mask(marked)
+        if self._tables:
+            self._drop_tables(changed)
+        if self._spill_changes:
+            # Marked array formulas no longer spill; re-read the cells they emptied.
+            evaluated, spilled = self._evaluate(set())
+            changed = self._cell_mask(evaluated, changed if spilled is None else changed | spilled)
+        return changed
+
+    def external_owners(self, sheet: str, changed: np.ndarray | None) -> list[Cell]:
+        # Formula cells reading a changed cell of another sheet (`changed` None: any cell of it).
+        table = self._external_index().get(sheet_key(sheet))
+        if table is None:
+            return []
+
+        boxes, owners = table
+        if changed is None:
+            return list(dict.fromkeys(owners))
+
+        rows, cols = changed.shape
+        clipped = np.stack(
+            [
+                np.clip(boxes[:, 0], 0, rows),
+                np.clip(boxes[:, 1], 0, cols),
+                np.clip(boxes[:, 2] + 1, 0, rows),
+                np.clip(boxes[:, 3] + 1, 0, cols),
+            ],
+            axis=1,
+        )
+        return list(dict.fromkeys(owners[index] for index in np.flatnonzero(_box_counts(changed, clipped)).tolist()))
+
+    def _cell_mask(self, cells: Iterable[Cell], base: np.ndarray | None = None) -> np.ndarray:
+        mask = np.zeros(self.shape, dtype=bool) if base is None else base.copy()
+        cells = list(cells)
+        if cells:
+            rows, cols = zip(*cells)
+            mask[list(rows), list(cols)] = True
+        return mask
+
+    def _external_index(self) -> dict[str, tuple[np.ndarray, list[Cell]]]:
+        # External references grouped by target sheet as (N, 4) inclusive boxes plus owning cells.
+        if self._external_table is None:
+            grouped: dict[str, tuple[list[Box], list[Cell]]] = {}
+            for owner, refs in self.external_refs.items():
+                for key, box in refs:
+                    boxes, owners = grouped.setdefault(key, ([], []))
+                    boxes.append(box)
+                    owners.append(owner)
+
+            self._external_table = {
+                key: (np.array(boxes, dtype=np.int64).reshape(-1, 4), owners)
+                for key, (boxes, owners) in grouped.items()
+            }
+        return self._external_table
+
+    def preview_frame(self, rows: slice = slice(None), cols: slice = slice(None)) -> pd.DataFrame:
+        # Evaluated values as a frame, built on each call for the requested block only.
+        columns = [column_name(i) for i in range(self.shape[1])][cols]
+        return pd.DataFrame(
+            self.value_block(rows, cols),
+            index=range(self.shape[0])[rows],
+            columns=columns,
+        )
+
+    def recalculate(self, store: SheetStore) -> pd.DataFrame:
+        self.update(store)
+        return self.preview_frame()
+
+    def _link(self, precedent: Cell, dependent: Cell) -> None:
+        self.precedents.setdefault(dependent, set()).add(precedent)
+        self.dependents.setdefault(precedent, set()).add(dependent)
+
+    def _unlink_formula(self, cell: Cell) -> None:
+        # Drop the compiled formula, edges and range registrations of a formula that is being replaced.
+        self.formulas.pop(cell, None)
+        for precedent in self.precedents.pop(cell, ()):
+            self.dependents[precedent].discard(cell)
+
+        if self.range_refs.pop(cell, None) is not None:
+            self._range_table = None
+
+        if self.external_refs.pop(cell, None) is not None:
+            self._external_table = None
+
+    def _ranges(self) -> tuple[np.ndarray, list[Cell]]:
+        # Every registered range as an (N, 4) array of boxes plus the owning formula cells.
+        if self._range_table is None:
+            owners = [owner for owner, boxes in self.range_refs.items() for _ in boxes]
+            boxes = [box for boxes in self.range_refs.values() for box in boxes]
+            self._range_table = (np.array(boxes, dtype=np.int64).reshape(-1, 4), owners)
+        return self._range_table
+
+    def _update_cells(
+        self,
+        dirty_mask: np.ndarray,
+        reset: bool,
+        parsed: dict[str, CompiledFormula],
+    ) -> tuple[list[Cell], int]:
+        # Write dirty literal values in bulk and rewire the edges of dirty formula cells.
+        # Returns the dirty formula cells and the number of literal cells refreshed.
+        for cell in zip(*(axis.tolist() for axis in np.nonzero(dirty_mask & self.formula_mask))):
+            self._unlink_formula(cell)
+
+        self.formula_mask[dirty_mask] = False
+        self.literal_errors[dirty_mask] = False
+        self.spilled[dirty_mask] = False
+
+        number_cells = dirty_mask & self.number_mask
+        self.numbers[number_cells] = self.raw_numbers[number_cells]
+        self.values[number_cells] = None
+        self.error_cells = {cell for cell in self.error_cells if not number_cells[cell]}
+        literal_count = int(number_cells.sum())
+
+        text_rows, text_cols = np.nonzero(dirty_mask & ~self.number_mask)
+        texts = self.text[text_rows, text_cols].tolist()
+        dirty_formulas: list[tuple[Cell, CompiledFormula]] = []
+        known = len(parsed)
+
+        for cell, text in zip(zip(text_rows.tolist(), text_cols.tolist()), texts):
+            formula = _formula_for(text, parsed)
+            if formula is None:
+                value = parse_literal(text)
+                number = to_number(value)
+                self._set_value(cell, value)
+                self.numbers[cell] = np.nan if number is None else number
+                self.literal_errors[cell] = is_error(value)
+                literal_count += 1
+            else:
+                self.formula_mask[cell] = True
+                self.numbers[cell] = np.nan
+                self.formulas[cell] = formula
+                dirty_formulas.append((cell, formula))
+
+        self.last_parsed = len(parsed) - known
+        self._link_formulas(dirty_formulas, dirty_mask, reset)
+        return [cell for cell, _ in dirty_formulas], literal_count
+
+    def _link_formulas(
+        self,
+        dirty_formulas: list[tuple[Cell, CompiledFormula]],
+        dirty_mask: np.ndarray,
+        reset: bool,
+    ) -> None:
+        # Register references of dirty formulas once formula_mask is current for every cell.
+        if not dirty_formulas:
+            return
+
+        new_boxes: list[tuple[int, int, int, int]] = []
+        new_owners: list[Cell] = []
+
+        for cell, formula in dirty_formulas:
+            external: list[tuple[str, Box]] = []
+
+            for ref in formula.cells:
+                if not self._is_local(ref.sheet):
+                    external.append((sheet_key(ref.sheet), (ref.row, ref.col, ref.row, ref.col)))
+                elif self.in_bounds(ref.row, ref.col):
+                    self._link((ref.row, ref.col), cell)
+
+            external.extend((sheet_key(ref.sheet), ref.bounds) for ref in formula.ranges if not self._is_local(ref.sheet))
+            if external:
+                self.external_refs[cell] = external
+                self._external_table = None
+
+            boxes = [self.clip(ref) for ref in formula.ranges if self._is_local(ref.sheet)]
+            if boxes:
+                self.range_refs[cell] = boxes
+                new_boxes.extend(boxes)
+                new_owners.extend([cell] * len(boxes))
+                self._range_table = None
+
+        # New ranges need edges from formula cells already inside them.
+        self._link_boxes(np.array(new_boxes, dtype=np.int64).reshape(-1, 4), new_owners, self.formula_mask)
+
+        if not reset:
+            # Cells that just became formulas need edges to existing ranges covering them.
+            new_formula_mask = dirty_mask & self.formula_mask
+            self._link_boxes(*self._ranges(), new_formula_mask)
+
+    def _is_local(self, sheet: str | None) -> bool:
+        return sheet is None or same_sheet(sheet, self.name)
+
+    def _link_boxes(self, boxes: np.ndarray, owners: list[Cell], mask: np.ndarray) -> None:
+        # Link each owner to the cells of mask that fall inside its box.
+        if not len(owners):
+            return
+
+        for index in np.flatnonzero(_box_counts(mask, boxes)).tolist():
+            row_from, col_from, row_to, col_to = boxes[index].tolist()
+            inside_rows, inside_cols = np.nonzero(mask[row_from:row_to, col_from:col_to])
+            owner = owners[index]
+            for row, col in zip(inside_rows.tolist(), inside_cols.tolist()):
+                self._link((row_from + row, col_from + col), owner)
+
+    def _affected(self, dirty_formulas: Iterable[Cell], dirty_mask: np.ndarray) -> set[Cell]:
+        # Dirty formula cells plus every formula that transitively depends on a dirty cell.
+        affected = set(dirty_formulas)
+        queue = deque(affected)
+
+        boxes, owners = self._ranges()
+        if owners:
+            for index in np.flatnonzero(_box_counts(dirty_mask, boxes)).tolist():
+                if owners[index] not in affected:
+                    affected.add(owners[index])
+                    queue.append(owners[index])
+
+        dirty_rows, dirty_cols = np.nonzero(dirty_mask)
+        queue.extend(zip(dirty_rows.tolist(), dirty_cols.tolist()))
+
+        while queue:
+            cell = queue.popleft()
+            for dependent in self.dependents.get(cell, ()):
+                if dependent not in affected:
+                    affected.add(dependent)
+                    queue.append(dependent)
+
+        return affected
+
+    def _evaluate(self, affected: set[Cell]) -> tuple[set[Cell], np.ndarray | None]:
+        # Evaluate affected formulas, then the formulas reading cells whose spilled values
+        # changed, until spills settle. Spilled cells are not graph nodes, so their readers
+        # are found like the dependents of edited cells. Returns every evaluated cell and
+        # the mask of spill cells that were written or cleared (None if there were none).
+        evaluated = set(affected)
+        count = self._evaluate_pass(affected)
+        spilled, rounds = self._settle_spills(evaluated, None)
+        count += rounds
+
+        if self._spill_changes:
+            # Still spilling after every round: some array formula reads its own spill area,
+            # and which formulas were caught mid-change depends on the order they ran in.
+            # Start again from empty spill areas in (row, col) order so the outcome depends
+            # only on the sheet, not on the edits that led to it.
+            spilled = self._reset_spills(spilled)
+            everything = set(self.formulas)
+            evaluated |= everything
+            count += self._evaluate_pass(everything, ordered=True)
+            spilled, rounds = self._settle_spills(evaluated, spilled, ordered=True)
+            count += rounds
+
+        if self._spill_changes:
+            # Even then still spilling: the array formulas involved read their own output.
+            for anchor in dict.fromkeys(anchor for anchor, _ in self._spill_changes):
+                self._store_result(anchor, CYCLE_VALUE)
+                self._stuck_spills.add(anchor)
+            for _, box in self._spill_changes:
+                spilled[_box_slices(box)] = True
+            self._spill_changes = []
+
+        self.last_evaluated = count
+        return evaluated, spilled
+
+    def _settle_spills(
+        self, evaluated: set[Cell], spilled: np.ndarray | None, ordered: bool = False
+    ) -> tuple[np.ndarray | None, int]:
+        # Re-evaluate readers of changed spill areas for up to MAX_SPILL_PASSES rounds; any
+        # changes left in _spill_changes afterwards never settled. Adds the re-evaluated
+        # cells to evaluated and returns the grown spill mask with the evaluation count.
+        count = 0
+        for _ in range(MAX_SPILL_PASSES):
+            if not self._spill_changes:
+                break
+
+            changes, self._spill_changes = self._spill_changes, []
+            mask = np.zeros(self.shape, dtype=bool)
+            for _, box in changes:
+                mask[_box_slices(box)] = True
+            for anchor, _ in changes:
+                mask[anchor] = False
+            spilled = mask if spilled is None else spilled | mask
+
+            self._range_cache.clear()
+            if self._tables:
+                self._drop_tables(mask)
+
+            readers = self._affected(self._spill_anchors(changes), mask)
+            evaluated |= readers
+            count += self._evaluate_pass(readers, ordered)
+        return spilled, count
+
+    def _reset_spills(self, spilled: np.ndarray | None) -> np.ndarray:
+        # Empty every spill area and forget the requested boxes; returns spilled grown by
+        # the cleared cells.
+        mask = self.spilled.copy()
+        for region in self.spill_regions.values():
+            self._clear_spill(region)
+        self.spill_boxes = {}
+        self.spill_regions = {}
+        self._spill_changes = []
+        self._range_cache.clear()
+        if self._tables:
+            self._drop_tables(mask)
+        return mask if spilled is None else spilled | mask
+
+    def _evaluate_pass(self, affected: set[Cell], ordered: bool = False) -> int:
+        # Kahn's algorithm over the affected subgraph; leftovers sit on or behind a cycle.
+        # With ordered set, ready cells run in (row, col) order rather than discovery order.
+        if self._tables and affected:
+            self._drop_tables(self._cell_mask(affected))
+
+        indegree = {
+            cell: sum(1 for precedent in self.precedents.get(cell, ()) if precedent in affected)
+            for cell in affected
+        }
+        ready = [cell for cell, count in indegree.items() if count == 0]
+        if ordered:
+            heapq.heapify(ready)
+            take, put = partial(heapq.heappop, ready), partial(heapq.heappush, ready)
+        else:
+            ready = deque(ready)
+            take, put = ready.popleft, ready.append
+        context = _ValuesContext(self)
+        evaluated = 0
+
+        while ready:
+            cell = take()
+            self._store_result(cell, self.compute(cell, context))
+            evaluated += 1
+
+            for dependent in self.dependents.get(cell, ()):
+                if dependent in indegree:
+                    indegree[dependent] -= 1
+                    if indegree[dependent] == 0:
+                        put(dependent)
+
+        pending = {cell for cell, count in indegree.items() if count > 0}
+        if pending:
+            evaluated += len(pending)
+            self._evaluate_cycles(pending, context)
+
+        return evaluated
+
+    def _evaluate_cycles(self, pending: set[Cell], context: _ValuesContext) -> None:
+        # One strongly-connected-component pass over the leftovers: every cell of a cycle
+        # becomes #CYCLE! at once, and cells behind a cycle are computed from those values.
+        for component in _strongly_connected(pending, self.precedents):
+            cell = component[0]
+            if len(component) > 1 or cell in self.precedents.get(cell, ()):
+                for member in component:
+                    self._store_result(member, CYCLE_VALUE)
+            else:
+                self._store_result(cell, self.compute(cell, context))
+
+
+class WorkbookCalculator:
+    # One SheetCalculator per sheet of a workbook. A sheet is only calculated once it is
+    # opened or referenced. After a sheet changes, formulas on other sheets that read the
+    # changed cells are re-evaluated, and so on until no value changes.
+    def __init__(self) -> None:
+        self.workbook: Workbook | None = None
+        self.sheets: dict[str, SheetCalculator] = {}
+        self.last_evaluated = 0
+        self.last_parsed = 0
+        self._updating: set[str] = set()
+        # (sheet key, changed cells or None for all) waiting to be passed to other sheets.
+        self._changes: deque[tuple[str, np.ndarray | None]] = deque()
+
+    def update(self, workbook: Workbook) -> None:
+        # Recalculate every loaded sheet that changed and propagate across sheets.
+        self.workbook = workbook
+        self.last_evaluated = 0
+        self.last_parsed = 0
+
+        for key in [key for key in self.sheets if key not in workbook]:
+            # Formulas reading a removed sheet now evaluate to #REF!.
+            del self.sheets[key]
+            self._changes.append((key, None))
+
+        for name, _ in workbook.loaded_sheets():
+            self.resolve(name)
+
+        self._propagate()
+
+    def sheet(self, name: str) -> SheetCalculator:
+        # Up-to-date calculator for one sheet, loading and calculating it if needed.
+        calculator = self.resolve(name)
+        if calculator is None:
+            raise KeyError(name)
+        self._propagate()
+        return calculator
+
+    def resolve(self, name: str) -> SheetCalculator | None:
+        # Calculator for a sheet-qualified reference, brought up to date unless it is
+        # the one being recalculated; None when the workbook has no such sheet.
+        if self.workbook is None or name not in self.workbook:
+            return None
+
+        key = sheet_key(name)
+        calculator = self.sheets.get(key)
+        if calculator is None:
+            calculator = self.sheets[key] = SheetCalculator(self.workbook.name_of(name), self)
+
+        store = self.workbook.sheet(name)
+        stale = calculator.store is not store or calculator.store_version != store.version
+        if stale and key not in self._updating:
+            self._updating.add(key)
+            try:
+                calculator.update(store)
+            finally:
+                self._updating.discard(key)
+
+            self.last_evaluated += calculator.last_evaluated
+            self.last_parsed += calculator.last_parsed
+            self._changes.append((key, calculator.last_changed))
+
+        return calculator
+
+    def _propagate(self) -> None:
+        if self._updating:
+            return
+
+        passes: dict[str, int] = {}
+        while self._changes:
+            source, changed = self._changes.popleft()
+
+            for key, calculator in list(self.sheets.items()):
+                owners = calculator.external_owners(source, changed)
+                if not owners:
+                    continue
+
+                passes[key] = passes.get(key, 0) + 1
+                if passes[key] > MAX_SHEET_PASSES:
+                    changed_here = calculator.mark_cycle(owners)
+                else:
+                    changed_here = calculator.invalidate(owners)
+                    self.last_evaluated += calculator.last_evaluated
+
+                if changed_here.any():
+                    self._changes.append((key, changed_here))
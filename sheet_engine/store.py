@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import itertools
+import math
+from bisect import bisect_right
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from sheet_engine.formulas import column_name, shift_references
+from sheet_engine.functions import clean_numeric
+
+# Versions come from one process-wide counter, so a version number identifies
+# one store state even across replaced stores (used as a cache key).
+_VERSIONS = itertools.count(1)
+# Edited cells are remembered for this many edits, so a calculator can find what changed
+# without keeping its own copy of the sheet. One further behind re-reads every cell.
+EDIT_JOURNAL_SIZE = 20_000
+
+
+def next_version() -> int:
+    return next(_VERSIONS)
+
+
+def format_number(value: float) -> str:
+    # Text shown in the editor for a stored number.
+    return str(clean_numeric(float(value)))
+
+
+def format_numbers(numbers: np.ndarray) -> np.ndarray:
+    # Vectorized format_number; integral values are formatted through int64 in bulk.
+    texts = np.empty(numbers.shape, dtype=object)
+    integral = (numbers == np.trunc(numbers)) & (np.abs(numbers) < 2**53)
+
+    texts[integral] = numbers[integral].astype(np.int64).astype(str).tolist()
+    texts[~integral] = [format_number(value) for value in numbers[~integral].tolist()]
+    return texts
+
+
+def _canonical_number(text: str) -> float | None:
+    # Store typed numbers only when formatting them back reproduces the typed text,
+    # so values like "007" or "1e3" keep their original spelling.
+    try:
+        number = float(text)
+    except ValueError:
+        return None
+
+    if not math.isfinite(number) or format_number(number) != text:
+        return None
+
+    return number
+
+
+def _normalized_strings(frame: pd.DataFrame) -> np.ndarray:
+    # Editor/import frames as an object grid of str, with missing values as "".
+    return frame.fillna("").astype(str).to_numpy(dtype=object)
+
+
+class SheetStore:
+    # Typed cell storage: float64 numbers with a validity mask, plus an object
+    # array for text and formulas. Raw strings are only rebuilt for the editor.
+    def __init__(self, numbers: np.ndarray, number_mask: np.ndarray, text: np.ndarray):
+        self.numbers = numbers
+        self.number_mask = number_mask
+        # None marks numeric or blank cells so they do not hold a str object.
+        self.text = text
+        self.version = next_version()
+        # Cells edited in place after _journal_start, with the version each edit produced.
+        self._journal_start = self.version
+        self._edit_versions: list[int] = []
+        self._edit_cells: list[tuple[int, int]] = []
+
+    @classmethod
+    def blank(cls, rows: int, cols: int) -> SheetStore:
+        return cls(
+            np.zeros((rows, cols), dtype=np.float64),
+            np.zeros((rows, cols), dtype=bool),
+            np.full((rows, cols), None, dtype=object),
+        )
+
+    @classmethod
+    def from_strings(cls, strings: np.ndarray) -> SheetStore:
+        # Classify a grid of raw strings in bulk; only numeric-looking cells are re-checked.
+        rows, cols = strings.shape
+        store = cls.blank(rows, cols)
+
+        flat_strings = strings.ravel()
+        candidates = pd.to_numeric(pd.Series(flat_strings), errors="coerce").to_numpy(dtype=np.float64)
+        candidate_index = np.flatnonzero(np.isfinite(candidates))
+
+        # A numeric-looking cell is stored typed only if it formats back to the same text.
+        matches = format_numbers(candidates[candidate_index]) == flat_strings[candidate_index]
+        typed_index = candidate_index[matches.astype(bool)]
+
+        numbers = store.numbers.ravel()
+        number_mask = store.number_mask.ravel()
+        text = store.text.ravel()
+
+        numbers[typed_index] = candidates[typed_index]
+        number_mask[typed_index] = True
+
+        text_cells = ~number_mask & (flat_strings != "")
+        text[text_cells] = flat_strings[text_cells]
+        return store
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> SheetStore:
+        return cls.from_strings(_normalized_strings(frame))
+
+    @classmethod
+    def stack(cls, blocks: list[SheetStore]) -> SheetStore:
+        # Concatenate row blocks, padding narrower blocks with blank columns.
+        rows = sum(block.shape[0] for block in blocks)
+        cols = max((block.shape[1] for block in blocks), default=0)
+        store = cls.blank(rows, cols)
+
+        offset = 0
+        for block in blocks:
+            block_rows, block_cols = block.shape
+            target = (slice(offset, offset + block_rows), slice(0, block_cols))
+            store.numbers[target] = block.numbers
+            store.number_mask[target] = block.number_mask
+            store.text[target] = block.text
+            offset += block_rows
+
+        return store
+
+    def copy(self) -> SheetStore:
+        # Independent copy, e.g. for a download built off the script thread.
+        return SheetStore(self.numbers.copy(), self.number_mask.copy(), self.text.copy())
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.numbers.shape
+
+    @property
+    def columns(self) -> list[str]:
+        return [column_name(i) for i in range(self.shape[1])]
+
+    def cell_text(self, row: int, col: int) -> str:
+        # Raw editor text for one cell.
+        if self.number_mask[row, col]:
+            return format_number(self.numbers[row, col])
+        text = self.text[row, col]
+        return "" if text is None else text
+
+    def set_cell(self, row: int, col: int, value: Any) -> None:
+        # Store one edited cell and note it in the edit journal.
+        text = "" if value is None else str(value)
+        number = _canonical_number(text)
+
+        self.number_mask[row, col] = number is not None
+        self.numbers[row, col] = 0.0 if number is None else number
+        self.text[row, col] = text if number is None and text else None
+        self.version = next_version()
+        self._record_edits([(row, col)])
+
+    def _record_edits(self, cells: list[tuple[int, int]]) -> None:
+        self._edit_versions.extend([self.version] * len(cells))
+        self._edit_cells.extend(cells)
+
+        if len(self._edit_cells) > 2 * EDIT_JOURNAL_SIZE:
+            dropped = len(self._edit_cells) - EDIT_JOURNAL_SIZE
+            self._journal_start = self._edit_versions[dropped - 1]
+            del self._edit_versions[:dropped], self._edit_cells[:dropped]
+
+    def changed_cells(self, version: int) -> np.ndarray | None:
+        # Mask of cells edited in place since `version` of this store, or None when the
+        # journal no longer reaches back that far (or the shape changed since).
+        if version < self._journal_start:
+            return None
+
+        changed = np.zeros(self.shape, dtype=bool)
+        cells = self._edit_cells[bisect_right(self._edit_versions, version) :]
+        if cells:
+            rows, cols = zip(*cells)
+            changed[list(rows), list(cols)] = True
+        return changed
+
+    def apply_frame(self, frame: pd.DataFrame) -> bool:
+        # Merge an edited frame back in, touching only cells whose text changed.
+        strings = _normalized_strings(frame)
+
+        if strings.shape != self.shape:
+            replacement = SheetStore.from_strings(strings)
+            self._replace(replacement.numbers, replacement.number_mask, replacement.text)
+            return True
+
+        return self.apply_window(frame, 0, 0)
+
+    def apply_window(self, frame: pd.DataFrame, row_start: int, col_start: int) -> bool:
+        # Merge an edited block whose top-left cell is (row_start, col_start).
+        strings = _normalized_strings(frame)
+        rows = slice(row_start, row_start + strings.shape[0])
+        cols = slice(col_start, col_start + strings.shape[1])
+
+        changed_rows, changed_cols = np.nonzero(strings != self.to_strings(rows, cols))
+
+        for row, col in zip(changed_rows.tolist(), changed_cols.tolist()):
+            self.set_cell(row_start + row, col_start + col, strings[row, col])
+
+        return bool(len(changed_rows))
+
+    def _replace(self, numbers: np.ndarray, number_mask: np.ndarray, text: np.ndarray) -> None:
+        # Swap in new arrays after a shape change; cell positions in the edit journal no longer apply.
+        self.numbers = numbers
+        self.number_mask = number_mask
+        self.text = text
+        self.version = next_version()
+        self._journal_start = self.version
+        self._edit_versions.clear()
+        self._edit_cells.clear()
+
+    def resize(self, rows: int, cols: int) -> None:
+        # Keep the overlapping top-left block; new cells are blank.
+        if (rows, cols) == self.shape:
+            return
+
+        resized = SheetStore.blank(rows, cols)
+        keep = (slice(0, min(rows, self.shape[0])), slice(0, min(cols, self.shape[1])))
+        resized.numbers[keep] = self.numbers[keep]
+        resized.number_mask[keep] = self.number_mask[keep]
+        resized.text[keep] = self.text[keep]
+        self._replace(resized.numbers, resized.number_mask, resized.text)
+
+    def insert(self, axis: int, index: int, count: int, sheet: str | None = None) -> None:
+        # Insert blank rows (axis 0) or columns (axis 1) before index. `sheet` is this
+        # store's name in a workbook, so references qualified with it move as well.
+        positions = [index] * count
+        self._replace(
+            np.insert(self.numbers, positions, 0.0, axis=axis),
+            np.insert(self.number_mask, positions, False, axis=axis),
+            np.insert(self.text, positions, None, axis=axis),
+        )
+        self._shift_formulas(axis, index, count, sheet)
+
+    def delete(self, axis: int, index: int, count: int, sheet: str | None = None) -> None:
+        # Delete count rows (axis 0) or columns (axis 1) starting at index.
+        positions = np.arange(index, min(index + count, self.shape[axis]))
+        self._replace(
+            np.delete(self.numbers, positions, axis=axis),
+            np.delete(self.number_mask, positions, axis=axis),
+            np.delete(self.text, positions, axis=axis),
+        )
+        self._shift_formulas(axis, index, -len(positions), sheet)
+
+    def insert_rows(self, index: int, count: int = 1) -> None:
+        self.insert(0, index, count)
+
+    def insert_cols(self, index: int, count: int = 1) -> None:
+        self.insert(1, index, count)
+
+    def delete_rows(self, index: int, count: int = 1) -> None:
+        self.delete(0, index, count)
+
+    def delete_cols(self, index: int, count: int = 1) -> None:
+        self.delete(1, index, count)
+
+    def follow_sheet_change(self, sheet: str, axis: int, index: int, count: int) -> None:
+        # Another sheet of the workbook gained (count > 0) or lost rows/columns at index;
+        # move this store's references into that sheet to match.
+        changed = self._shift_formulas(axis, index, count, sheet, local=False)
+        if changed:
+            self.version = next_version()
+            self._record_edits(changed)
+
+    def _shift_formulas(
+        self,
+        axis: int,
+        index: int,
+        count: int,
+        sheet: str | None = None,
+        local: bool = True,
+    ) -> list[tuple[int, int]]:
+        # Rewrite references in every formula after a structural edit; repeated formulas are rewritten once.
+        # Returns the cells whose formula text changed.
+        flat_text = self.text.ravel()
+        filled = np.flatnonzero(~np.equal(flat_text, None))
+        rewritten: dict[str, str] = {}
+        changed = []
+
+        for position in filled.tolist():
+            raw = flat_text[position]
+            if not raw.startswith("="):
+                continue
+
+            if raw not in rewritten:
+                rewritten[raw] = "=" + shift_references(raw[1:], axis, index, count, sheet, local)
+            if rewritten[raw] != raw:
+                flat_text[position] = rewritten[raw]
+                changed.append(divmod(position, self.shape[1]))
+
+        return changed
+
+    def to_strings(self, rows: slice = slice(None), cols: slice = slice(None)) -> np.ndarray:
+        # Rebuild the raw string grid (or one block of it); only numeric cells need formatting.
+        text = self.text[rows, cols]
+        number_mask = self.number_mask[rows, cols]
+        strings = np.where(np.equal(text, None), "", text)
+        strings[number_mask] = format_numbers(self.numbers[rows, cols][number_mask])
+        return strings
+
+    def window_frame(self, rows: slice, cols: slice) -> pd.DataFrame:
+        # Raw strings for the visible block only, labelled with sheet rows/columns.
+        return pd.DataFrame(
+            self.to_strings(rows, cols),
+            index=range(self.shape[0])[rows],
+            columns=self.columns[cols],
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        # Raw values/formulas as the all-string frame the editor works with. Built on each
+        # call and not kept, since a full string grid is several times the size of the store.
+        return pd.DataFrame(self.to_strings(), columns=self.columns)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from typing import Callable, Iterator
+
+from sheet_engine.store import SheetStore, next_version
+
+MAX_SHEET_NAME_LENGTH = 31
+# Excel rejects these characters in sheet names.
+INVALID_SHEET_NAME_CHARACTERS = "[]:*?/\\"
+
+# Reads one sheet of an imported file the first time it is opened.
+SheetLoader = Callable[[str], SheetStore]
+
+
+def sheet_key(name: str) -> str:
+    # Sheet names are unique case-insensitively, like Excel.
+    return name.casefold()
+
+
+class Workbook:
+    # Ordered, uniquely named sheets. Sheets of an imported file start unread and are
+    # materialized by the loader the first time they are opened or referenced.
+    def __init__(self) -> None:
+        self._names: dict[str, str] = {}
+        self._stores: dict[str, SheetStore] = {}
+        self._loader: SheetLoader | None = None
+        # Version each sheet had when it was loaded; untouched sheets do not change the workbook version.
+        self._loaded_versions: dict[str, int] = {}
+        self._structure_version = next_version()
+
+    @classmethod
+    def single(cls, store: SheetStore, name: str = "Sheet1") -> Workbook:
+        workbook = cls()
+        workbook.add_sheet(name, store)
+        return workbook
+
+    @classmethod
+    def lazy(cls, names: list[str], loader: SheetLoader) -> Workbook:
+        workbook = cls()
+        workbook._names = {sheet_key(name): name for name in names}
+        workbook._loader = loader
+        return workbook
+
+    @property
+    def sheet_names(self) -> list[str]:
+        return list(self._names.values())
+
+    @property
+    def loader(self) -> SheetLoader | None:
+        # Reader of the imported file; None once every sheet is in memory.
+        return self._loader
+
+    @property
+    def version(self) -> int:
+        # Changes whenever a sheet is edited, added or removed.
+        edited = [
+            store.version
+            for key, store in self._stores.items()
+            if store.version != self._loaded_versions.get(key)
+        ]
+        return max([self._structure_version, *edited])
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return sheet_key(name) in self._names
+
+    def name_of(self, name: str) -> str:
+        # Name as spelled when the sheet was created.
+        return self._names[sheet_key(name)]
+
+    def is_loaded(self, name: str) -> bool:
+        return sheet_key(name) in self._stores
+
+    def sheet(self, name: str) -> SheetStore:
+        # Store for a sheet, reading it from the imported file on first access.
+        key = sheet_key(name)
+        store = self._stores.get(key)
+        if store is not None:
+            return store
+
+        if key not in self._names or self._loader is None:
+            raise KeyError(name)
+
+        store = self._stores[key] = self._loader(self._names[key])
+        self._loaded_versions[key] = store.version
+        if len(self._stores) == len(self._names):
+            # Every sheet is in memory, so the imported file can be released.
+            self._loader = None
+        return store
+
+    def loaded_sheets(self) -> list[tuple[str, SheetStore]]:
+        return [(name, self._stores[key]) for key, name in self._names.items() if key in self._stores]
+
+    def sheets(self) -> Iterator[tuple[str, SheetStore]]:
+        # Every sheet in order, loading unread sheets one at a time.
+        for name in self.sheet_names:
+            yield name, self.sheet(name)
+
+    def validate_name(self, name: str) -> str:
+        # Normalized new sheet name; raises ValueError when Excel would reject it.
+        name = name.strip()
+        if not name:
+            raise ValueError("Sheet names cannot be empty.")
+        if len(name) > MAX_SHEET_NAME_LENGTH:
+            raise ValueError(f"Sheet names are limited to {MAX_SHEET_NAME_LENGTH} characters.")
+        if any(character in INVALID_SHEET_NAME_CHARACTERS for character in name) or name.startswith("'"):
+            raise ValueError(f"Sheet names cannot contain {INVALID_SHEET_NAME_CHARACTERS} or start with '.")
+        if name in self:
+            raise ValueError(f"A sheet named {self.name_of(name)!r} already exists.")
+        return name
+
+    def next_sheet_name(self) -> str:
+        number = len(self._names) + 1
+        while f"Sheet{number}" in self:
+            number += 1
+        return f"Sheet{number}"
+
+    def add_sheet(self, name: str, store: SheetStore) -> str:
+        name = self.validate_name(name)
+        key = sheet_key(name)
+        self._names[key] = name
+        self._stores[key] = store
+        self._structure_version = next_version()
+        return name
+
+    def remove_sheet(self, name: str) -> None:
+        # References to a removed sheet evaluate to #REF!.
+        key = sheet_key(name)
+        del self._names[key]
+        self._stores.pop(key, None)
+        self._loaded_versions.pop(key, None)
+        self._structure_version = next_version()
+
+    def insert(self, name: str, axis: int, index: int, count: int) -> None:
+        # Insert rows/columns into one sheet and move references to them on every other sheet.
+        self.sheet(name).insert(axis, index, count, sheet=name)
+        self._follow(name, axis, index, count)
+
+    def delete(self, name: str, axis: int, index: int, count: int) -> None:
+        store = self.sheet(name)
+        removed = min(index + count, store.shape[axis]) - index
+        store.delete(axis, index, count, sheet=name)
+        self._follow(name, axis, index, -removed)
+
+    def _follow(self, name: str, axis: int, index: int, count: int) -> None:
+        # Sheets not loaded yet come from the import as plain values, so they hold no references.
+        for other_name, store in self.loaded_sheets():
+            if sheet_key(other_name) != sheet_key(name):
+                store.follow_sheet_change(name, axis, index, count)
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+from activity_log import ActivityLog
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_frame_is_newest_first_and_pages() -> None:
+    log = ActivityLog(capacity=10)
+    for step in range(5):
+        log.append(f"event {step}", 1_700_000_000 + step)
+
+    assert log.frame()["event"].tolist() == ["event 4", "event 3", "event 2", "event 1", "event 0"]
+    assert log.page(1, 2)["event"].tolist() == ["event 2", "event 1"]
+    assert log.page_count(2) == 3
+
+
+def test_full_log_overwrites_the_oldest_entries() -> None:
+    log = ActivityLog(capacity=3)
+    for step in range(5):
+        log.append("repeated" if step % 2 else f"event {step}", step)
+
+    assert len(log) == 3
+    assert log.frame()["event"].tolist() == ["event 4", "repeated", "event 2"]
+
+
+def test_frame_is_rebuilt_after_an_append() -> None:
+    log = ActivityLog()
+    log.append("first", 0)
+    assert len(log.frame()) == 1
+
+    log.append("second", 1)
+    assert log.frame()["event"].tolist() == ["second", "first"]
+
+
+def test_app_core_import_leaves_numpy_and_pandas_unloaded() -> None:
+    # Pages that never show a table should not pay for these imports at startup.
+    code = "import sys, app_core; print(sorted({'numpy', 'pandas'} & set(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=REPO_ROOT)
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from sheet_engine.errors import CALC_ERROR, CYCLE_VALUE, SPILL_ERROR, VALUE_ERROR
+from sheet_engine.recalc import SheetCalculator
+from sheet_engine.store import SheetStore
+
+# Columns A:B hold a small name/score table; formulas are placed in D1 and spill into D1:F5.
+TABLE = [["a", "1"], ["b", "2"], ["A", "3"], ["c", "2"], ["", "x"]]
+
+
+def _store(rows: list[list[str]]) -> SheetStore:
+    return SheetStore.from_strings(np.array(rows, dtype=object))
+
+
+def _values(calculator: SheetCalculator) -> list[list[object]]:
+    return calculator.value_block(slice(None), slice(None)).tolist()
+
+
+def _calculate(rows: list[list[str]]) -> list[list[object]]:
+    calculator = SheetCalculator()
+    calculator.update(_store(rows))
+    return _values(calculator)
+
+
+def _spill_area(formula: str) -> list[list[object]]:
+    # D1:F5 after placing the formula in D1, blanks included, so the spill shape is checked too.
+    store = SheetStore.blank(len(TABLE), 6)
+    for row, items in enumerate(TABLE):
+        for col, text in enumerate(items):
+            store.set_cell(row, col, text)
+    store.set_cell(0, 3, formula)
+
+    calculator = SheetCalculator()
+    calculator.update(store)
+    return calculator.value_block(slice(None), slice(3, 6)).tolist()
+
+
+def _column(values: list[object]) -> list[list[object]]:
+    # One-column spill padded to D1:F5.
+    padded = values + [""] * (len(TABLE) - len(values))
+    return [[value, "", ""] for value in padded]
+
+
+def test_sort_ascending_and_descending() -> None:
+    assert _spill_area("=SORT(B1:B4)") == _column([1, 2, 2, 3])
+    assert _spill_area("=SORT(B1:B4,1,-1)") == _column([3, 2, 2, 1])
+
+
+def test_sort_by_column() -> None:
+    assert _spill_area("=SORT(A1:B4,2,-1)")[:4] == [["A", 3, ""], ["b", 2, ""], ["c", 2, ""], ["a", 1, ""]]
+
+
+def test_filter() -> None:
+    assert _spill_area('=FILTER(B1:B5,A1:A5="a")') == _column([1, 3])
+    assert _spill_area("=FILTER(A1:B4,B1:B4>1)")[:4] == [["b", 2, ""], ["A", 3, ""], ["c", 2, ""], ["", "", ""]]
+
+
+def test_filter_without_matches() -> None:
+    assert _spill_area("=FILTER(B1:B4,B1:B4>10)")[0][0] == CALC_ERROR
+    assert _spill_area('=FILTER(B1:B4,B1:B4>10,"none")') == _column(["none"])
+
+
+@pytest.mark.parametrize(
+    ("formula", "expected"),
+    [
+        ("=UNIQUE(A1:A4)", ["a", "b", "c"]),
+        ("=UNIQUE(B1:B4)", [1, 2, 3]),
+        ("=UNIQUE(A1:A4,FALSE,TRUE)", ["b", "c"]),
+        ("=UNIQUE(B1:B4,FALSE,TRUE)", [1, 3]),
+    ],
+)
+def test_unique(formula: str, expected: list[object]) -> None:
+    assert _spill_area(formula) == _column(expected)
+
+
+def test_unique_rows_and_columns() -> None:
+    # Rows compare as a whole: ("a", 1) and ("A", 3) differ in their second cell.
+    assert _spill_area("=UNIQUE(A1:B4)")[:4] == [["a", 1, ""], ["b", 2, ""], ["A", 3, ""], ["c", 2, ""]]
+    assert _spill_area("=UNIQUE(A1:B1,TRUE)")[0] == ["a", 1, ""]
+
+
+def test_unique_with_every_row_repeated_is_a_calc_error() -> None:
+    assert _calculate([["1", "=UNIQUE(A1:A2,FALSE,TRUE)"], ["1", ""]]) == [[1, CALC_ERROR], [1, ""]]
+
+
+@pytest.mark.parametrize(
+    ("formula", "expected"),
+    [
+        ("=SEQUENCE(3)", _column([1, 2, 3])),
+        ("=SEQUENCE(2,3)", [[1, 2, 3], [4, 5, 6], ["", "", ""], ["", "", ""], ["", "", ""]]),
+        ("=SEQUENCE(1,3,10,-5)", [[10, 5, 0], *[["", "", ""]] * 4]),
+        ("=SEQUENCE(2,1,0.5,0.5)", _column([0.5, 1])),
+        ("=SEQUENCE(1)", _column([1])),
+    ],
+)
+def test_sequence(formula: str, expected: list[list[object]]) -> None:
+    assert _spill_area(formula) == expected
+
+
+@pytest.mark.parametrize(("formula", "expected"), [("=SEQUENCE(0)", CALC_ERROR), ("=SEQUENCE(-1)", VALUE_ERROR)])
+def test_sequence_without_cells(formula: str, expected: str) -> None:
+    assert _spill_area(formula)[0][0] == expected
+
+
+def test_array_result_running_off_the_sheet_is_a_spill_error() -> None:
+    assert _spill_area("=SEQUENCE(10)")[0][0] == SPILL_ERROR
+
+
+def test_array_result_spills_and_blocked_spill_recovers() -> None:
+    store = _store([["=SEQUENCE(3)", ""], ["", ""], ["x", ""]])
+    calculator = SheetCalculator()
+    calculator.update(store)
+    assert _values(calculator) == [[SPILL_ERROR, ""], ["", ""], ["x", ""]]
+
+    store.set_cell(2, 0, "")
+    calculator.update(store)
+    assert _values(calculator) == [[1, ""], [2, ""], [3, ""]]
+
+
+def test_formulas_read_spilled_cells() -> None:
+    values = _calculate([["1", "=SUM(B2:B3)"], ["2", "=SEQUENCE(2)"], ["", ""]])
+    assert values == [[1, 3], [2, 1], ["", 2]]
+
+
+@pytest.mark.parametrize("entry_order", [(0, 1), (1, 0)])
+def test_overlapping_spills_first_anchor_wins(entry_order: tuple[int, int]) -> None:
+    # C1 spills down and A2 spills right; both need C2. C1 comes first in (row, col) order,
+    # so it wins whichever formula was entered first.
+    formulas = [(0, 2, "=SEQUENCE(3)"), (1, 0, "=SEQUENCE(1,3)")]
+    store = SheetStore.blank(3, 3)
+    calculator = SheetCalculator()
+    for index in entry_order:
+        store.set_cell(*formulas[index])
+        calculator.update(store)
+
+    assert _values(calculator) == [["", "", 1], [SPILL_ERROR, "", 2], ["", "", 3]]
+
+    store.set_cell(0, 2, "")
+    calculator.update(store)
+    assert _values(calculator) == [["", "", ""], [1, 2, 3], ["", "", ""]]
+
+
+def test_formula_reading_its_own_spill_area_is_a_cycle() -> None:
+    store = _store([["5", "=FILTER(A1:A3,A1:A3>0)"], ["=B2", ""], ["1", ""]])
+    calculator = SheetCalculator()
+    calculator.update(store)
+    assert _values(calculator)[0][1] == CYCLE_VALUE
+
+    store.set_cell(1, 0, "7")
+    calculator.update(store)
+    assert _values(calculator) == [[5, 5], [7, 7], [1, 1]]
+
+
+def test_empty_array_result_is_a_calc_error() -> None:
+    assert _calculate([["1", "=FILTER(A1:A2,A1:A2>5)"], ["2", ""]]) == [[1, CALC_ERROR], [2, ""]]
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from tutor_engine.backends import StubBackend
+from tutor_engine.broker import BrokerBusy, RequestBroker
+
+
+class _CountingBackend(StubBackend):
+    # StubBackend that records calls and how many ran at once, and can fail its first calls.
+    def __init__(self, chunk_delay: float = 0.0, failures: int = 0, fail_after_text: bool = False) -> None:
+        super().__init__(chunk_delay)
+        self.failures = failures
+        self.fail_after_text = fail_after_text
+        self.calls = 0
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def stream_reply(self, prompt, context=None):
+        with self._lock:
+            self.calls += 1
+            failing = self.calls <= self.failures
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            if failing and self.fail_after_text:
+                yield "partial "
+            if failing:
+                time.sleep(self.chunk_delay)
+                raise ConnectionError("backend unavailable")
+            yield from super().stream_reply(prompt, context)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+def _broker(backend: StubBackend, **options) -> RequestBroker:
+    settings = {"requests_per_minute": 60_000, "burst": 100, "backoff_seconds": 0.01, "chunk_timeout": 5.0}
+    settings.update(options)
+    return RequestBroker(backend, **settings)
+
+
+def _read(stream) -> str:
+    return "".join(stream)
+
+
+def _wait_until(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_identical_in_flight_prompts_share_one_call() -> None:
+    backend = _CountingBackend(chunk_delay=0.05)
+    broker = _broker(backend)
+
+    first = broker.stream_reply("key", "What is SUM?")
+    second = broker.stream_reply("key", "What is SUM?")
+
+    assert _read(first) == _read(second) == "(stub tutor) [0 earlier turns] You asked: What is SUM?"
+    assert backend.calls == 1
+    stats = broker.stats()
+    assert (stats.submitted, stats.coalesced, stats.completed) == (1, 1, 1)
+
+
+def test_finished_prompt_starts_a_fresh_call() -> None:
+    backend = _CountingBackend()
+    broker = _broker(backend)
+
+    _read(broker.stream_reply("key", "hi"))
+    _read(broker.stream_reply("key", "hi"))
+    assert backend.calls == 2
+
+
+def test_calls_are_limited_to_max_concurrency() -> None:
+    backend = _CountingBackend(chunk_delay=0.02)
+    broker = _broker(backend, max_concurrency=2)
+
+    streams = [broker.stream_reply(f"key {number}", f"question {number}") for number in range(6)]
+    replies = [_read(stream) for stream in streams]
+
+    assert [reply.endswith(f"question {number}") for number, reply in enumerate(replies)] == [True] * 6
+    assert backend.peak == 2
+    assert broker.stats().completed == 6
+
+
+def test_token_bucket_spaces_out_calls_after_the_burst() -> None:
+    backend = _CountingBackend()
+    # Two calls may start at once, then one every 0.1 seconds.
+    broker = _broker(backend, requests_per_minute=600, burst=2)
+
+    started = time.monotonic()
+    for number in range(4):
+        _read(broker.stream_reply(f"key {number}", "question"))
+    assert time.monotonic() - started >= 0.15
+
+
+def test_clean_failures_are_retried_with_backoff() -> None:
+    backend = _CountingBackend(failures=2)
+    broker = _broker(backend, max_retries=3)
+
+    assert _read(broker.stream_reply("key", "question")).endswith("question")
+    assert backend.calls == 3
+    stats = broker.stats()
+    assert (stats.retries, stats.completed, stats.failed) == (2, 1, 0)
+
+
+def test_failure_after_max_retries_reaches_every_reader() -> None:
+    backend = _CountingBackend(chunk_delay=0.02, failures=10)
+    broker = _broker(backend, max_retries=2)
+
+    first = broker.stream_reply("key", "question")
+    second = broker.stream_reply("key", "question")
+    for stream in (first, second):
+        with pytest.raises(ConnectionError):
+            _read(stream)
+
+    assert backend.calls == 3
+    stats = broker.stats()
+    assert (stats.retries, stats.failed) == (2, 1)
+
+
+def test_failure_after_text_is_not_retried() -> None:
+    backend = _CountingBackend(failures=1, fail_after_text=True)
+    broker = _broker(backend, max_retries=3)
+
+    stream = broker.stream_reply("key", "question")
+    assert next(stream) == "partial "
+    with pytest.raises(ConnectionError):
+        next(stream)
+    assert backend.calls == 1
+    assert broker.stats().retries == 0
+
+
+def test_full_queue_rejects_new_prompts_but_joins_queued_ones() -> None:
+    backend = _CountingBackend(chunk_delay=0.05)
+    broker = _broker(backend, max_concurrency=1, max_queue=1)
+
+    running = broker.stream_reply("running", "first")
+    _wait_until(lambda: broker.stats().running == 1)
+    queued = broker.stream_reply("queued", "second")
+
+    with pytest.raises(BrokerBusy):
+        broker.stream_reply("rejected", "third")
+    joined = broker.stream_reply("queued", "second")
+
+    assert _read(running).endswith("first")
+    assert _read(queued) == _read(joined)
+    stats = broker.stats()
+    assert (stats.submitted, stats.coalesced, stats.rejected) == (2, 1, 1)
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from tutor_engine.cache import ResponseCache, cache_key, normalize_prompt
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> _Clock:
+    return _Clock()
+
+
+def _disk_keys(db_path: Path) -> set[str]:
+    with sqlite3.connect(db_path) as db:
+        return {key for (key,) in db.execute("SELECT key FROM responses")}
+
+
+def test_prompts_differing_only_in_case_spacing_and_punctuation_share_a_key() -> None:
+    assert normalize_prompt("  What   is\nSUM?? ") == "what is sum"
+    assert cache_key("What is SUM?") == cache_key("what is sum")
+    assert cache_key("What is SUM?") != cache_key("What is SUMIF?")
+    assert cache_key("What is SUM?", "model-a") != cache_key("What is SUM?", "model-b")
+
+
+def test_entries_expire_after_the_ttl(clock: _Clock) -> None:
+    cache = ResponseCache(ttl_seconds=60, clock=clock)
+    cache.put("key", "reply")
+
+    clock.now += 59
+    assert cache.get("key") == "reply"
+
+    clock.now += 1
+    assert cache.get("key") is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 0)
+
+
+def test_least_recently_used_entry_is_evicted(clock: _Clock) -> None:
+    cache = ResponseCache(max_entries=2, clock=clock)
+    cache.put("a", "reply a")
+    cache.put("b", "reply b")
+    assert cache.get("a") == "reply a"
+
+    cache.put("c", "reply c")
+    assert cache.get("b") is None
+    assert cache.get("a") == "reply a"
+    assert cache.get("c") == "reply c"
+    assert cache.stats().evictions == 1
+
+
+def test_replies_persist_across_instances(tmp_path: Path, clock: _Clock) -> None:
+    db_path = tmp_path / "responses.db"
+    ResponseCache(db_path=db_path, clock=clock).put("key", "reply")
+
+    reopened = ResponseCache(db_path=db_path, clock=clock)
+    assert reopened.get("key") == "reply"
+    assert reopened.stats().entries == 1
+
+
+def test_entry_evicted_from_memory_is_read_back_from_disk(tmp_path: Path, clock: _Clock) -> None:
+    cache = ResponseCache(max_entries=1, db_path=tmp_path / "responses.db", clock=clock)
+    cache.put("a", "reply a")
+    cache.put("b", "reply b")
+    assert cache.get("a") == "reply a"
+
+
+def test_expired_disk_entry_is_a_miss_and_is_deleted(tmp_path: Path, clock: _Clock) -> None:
+    db_path = tmp_path / "responses.db"
+    ResponseCache(ttl_seconds=60, db_path=db_path, clock=clock).put("key", "reply")
+
+    clock.now += 60
+    assert ResponseCache(ttl_seconds=60, db_path=db_path, clock=clock).get("key") is None
+    assert _disk_keys(db_path) == set()
+
+
+def test_disk_is_pruned_of_expired_and_least_recently_used_rows(tmp_path: Path, clock: _Clock) -> None:
+    db_path = tmp_path / "responses.db"
+    cache = ResponseCache(ttl_seconds=60, db_path=db_path, max_disk_entries=2, clock=clock)
+    cache.put("old", "reply")
+    clock.now += 60
+    cache.put("a", "reply a")
+    assert _disk_keys(db_path) == {"a"}
+
+    for key in ("b", "c"):
+        clock.now += 1
+        cache.put(key, f"reply {key}")
+    assert _disk_keys(db_path) == {"b", "c"}
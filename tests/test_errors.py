@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from sheet_engine.errors import CYCLE_VALUE, DIV_ZERO_ERROR, NUM_ERROR
+from sheet_engine.recalc import SheetCalculator
+from sheet_engine.store import SheetStore
+
+
+def _store(rows: list[list[str]]) -> SheetStore:
+    return SheetStore.from_strings(np.array(rows, dtype=object))
+
+
+def _values(calculator: SheetCalculator) -> list[list[object]]:
+    return calculator.value_block(slice(None), slice(None)).tolist()
+
+
+def _calculate(rows: list[list[str]]) -> list[list[object]]:
+    calculator = SheetCalculator()
+    calculator.update(_store(rows))
+    return _values(calculator)
+
+
+def test_div_zero_propagates_to_dependents() -> None:
+    values = _calculate([["1", "=A1/0", "=B1+1", "=SUM(A1:C1)"]])
+    assert values == [[1, DIV_ZERO_ERROR, DIV_ZERO_ERROR, DIV_ZERO_ERROR]]
+
+
+@pytest.mark.parametrize("formula", ["=1e400", "=-1e400", "=10^400", "=10^200*10^200", "=1e308*10", "=9^99999999"])
+def test_overflowing_numbers_are_num_errors(formula: str) -> None:
+    assert _calculate([[formula, "=A1+1"]]) == [[NUM_ERROR, NUM_ERROR]]
+
+
+def test_cycle_marks_members_and_readers() -> None:
+    values = _calculate([["=B1+1", "=A1+1", "=A1*2", "5"]])
+    assert values == [[CYCLE_VALUE, CYCLE_VALUE, CYCLE_VALUE, 5]]
+
+
+def test_self_reference_is_a_cycle() -> None:
+    assert _calculate([["=SUM(A1:A2)"], ["1"]]) == [[CYCLE_VALUE], [1]]
+
+
+def test_breaking_a_cycle_recovers() -> None:
+    store = _store([["=B1+1", "=A1+1", "=A1*2"]])
+    calculator = SheetCalculator()
+    calculator.update(store)
+
+    store.set_cell(0, 1, "3")
+    calculator.update(store)
+
+    assert _values(calculator) == [[4, 3, 8]]
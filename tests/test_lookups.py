@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from sheet_engine.errors import NA_ERROR, REF_ERROR
+from sheet_engine.functions import RangeTable
+from sheet_engine.recalc import SheetCalculator
+from sheet_engine.store import SheetStore
+
+# Columns A:B hold a small name/score table; formulas are placed in column D.
+TABLE = [["a", "1"], ["b", "2"], ["a", "3"], ["c", "4"], ["", "x"]]
+
+
+def _evaluate(formula: str, table: list[list[str]] = TABLE) -> SheetCalculator:
+    store = SheetStore.blank(len(table), 6)
+    for row, items in enumerate(table):
+        for col, text in enumerate(items):
+            store.set_cell(row, col, text)
+    store.set_cell(0, 3, formula)
+
+    calculator = SheetCalculator()
+    calculator.update(store)
+    return calculator
+
+
+def _result(formula: str) -> object:
+    return _evaluate(formula).value_at(0, 3)
+
+
+def _cached_tables(calculator: SheetCalculator) -> list[RangeTable]:
+    return list(calculator._tables.values())
+
+
+@pytest.mark.parametrize(
+    ("formula", "expected"),
+    [
+        ('=SUMIF(A1:A5,"a",B1:B5)', 4),
+        ('=SUMIF(B1:B5,">2")', 7),
+        ('=SUMIF(B1:B5,"<>2")', 8),
+        ('=SUMIF(A1:A5,"z",B1:B5)', 0),
+        ('=SUMIF(A1:A5,"A",B1:B5)', 4),
+    ],
+)
+def test_sumif(formula: str, expected: object) -> None:
+    assert _result(formula) == expected
+
+
+@pytest.mark.parametrize(
+    ("formula", "expected"),
+    [
+        ('=COUNTIF(A1:A5,"a")', 2),
+        ('=COUNTIF(B1:B5,">=2")', 3),
+        ('=COUNTIF(A1:B5,"<>a")', 8),
+        ('=COUNTIF(A1:A5,"?")', 4),
+        ('=COUNTIF(A1:A5,"z")', 0),
+        ("=COUNTIF(B1:B5,4)", 1),
+    ],
+)
+def test_countif(formula: str, expected: object) -> None:
+    assert _result(formula) == expected
+
+
+@pytest.mark.parametrize(
+    ("formula", "expected"),
+    [
+        ('=VLOOKUP("b",A1:B5,2,FALSE)', 2),
+        ('=VLOOKUP("a",A1:B5,2,FALSE)', 1),
+        ('=VLOOKUP("z",A1:B5,2,FALSE)', NA_ERROR),
+        ('=VLOOKUP("c",A1:B5,1,FALSE)', "c"),
+        ('=VLOOKUP("c",A1:B5,3,FALSE)', REF_ERROR),
+    ],
+)
+def test_vlookup(formula: str, expected: object) -> None:
+    assert _result(formula) == expected
+
+
+def test_vlookup_approximate_match_takes_last_smaller_key() -> None:
+    table = [["10", "low"], ["20", "mid"], ["30", "high"]]
+    assert _evaluate("=VLOOKUP(25,A1:B3,2,TRUE)", table).value_at(0, 3) == "mid"
+    assert _evaluate("=VLOOKUP(5,A1:B3,2,TRUE)", table).value_at(0, 3) == NA_ERROR
+
+
+@pytest.mark.parametrize(
+    ("formula", "expected"),
+    [
+        ('=XLOOKUP("c",A1:A5,B1:B5)', 4),
+        ('=XLOOKUP("a",A1:A5,B1:B5)', 1),
+        ('=XLOOKUP("a",A1:A5,B1:B5,"none",0,-1)', 3),
+        ('=XLOOKUP("z",A1:A5,B1:B5)', NA_ERROR),
+        ('=XLOOKUP("z",A1:A5,B1:B5,"none")', "none"),
+    ],
+)
+def test_xlookup(formula: str, expected: object) -> None:
+    assert _result(formula) == expected
+
+
+@pytest.mark.parametrize(
+    ("formula", "expected"),
+    [
+        ('=MATCH("c",A1:A5,0)', 4),
+        ('=MATCH("a",A1:A5,0)', 1),
+        ('=MATCH("z",A1:A5,0)', NA_ERROR),
+        ("=MATCH(3,B1:B4,0)", 3),
+        ("=MATCH(2.5,B1:B4)", 2),
+        ("=MATCH(0,B1:B4)", NA_ERROR),
+    ],
+)
+def test_match(formula: str, expected: object) -> None:
+    assert _result(formula) == expected
+
+
+@pytest.mark.parametrize(
+    ("formula", "expected"),
+    [
+        ("=INDEX(A1:B5,4,1)", "c"),
+        ("=INDEX(A1:B5,2,2)", 2),
+        ("=INDEX(B1:B5,3)", 3),
+        ("=INDEX(A1:B5,6,1)", REF_ERROR),
+        ('=INDEX(B1:B5,MATCH("c",A1:A5,0))', 4),
+    ],
+)
+def test_index(formula: str, expected: object) -> None:
+    assert _result(formula) == expected
+
+
+def test_lookup_follows_edits_to_its_table() -> None:
+    store = SheetStore.from_strings(np.array([["a", "1", '=XLOOKUP("a",A1:A2,B1:B2)'], ["b", "2", ""]], dtype=object))
+    calculator = SheetCalculator()
+    calculator.update(store)
+    assert calculator.value_at(0, 2) == 1
+
+    store.set_cell(0, 1, "9")
+    calculator.update(store)
+    assert calculator.value_at(0, 2) == 9
+
+
+def test_lookups_over_one_range_share_a_cached_table() -> None:
+    store = SheetStore.blank(len(TABLE), 6)
+    for row, items in enumerate(TABLE):
+        for col, text in enumerate(items):
+            store.set_cell(row, col, text)
+    for row, key in enumerate("abc"):
+        store.set_cell(row, 3, f'=VLOOKUP("{key}",A1:B5,2,FALSE)')
+    store.set_cell(3, 3, '=COUNTIF(A1:B5,"a")')
+
+    calculator = SheetCalculator()
+    calculator.update(store)
+    assert calculator.value_block(slice(0, 4), slice(3, 4)).tolist() == [[1], [2], [4], [2]]
+
+    [table] = _cached_tables(calculator)
+    # The three VLOOKUPs share the index over the first column; COUNTIF adds one over every cell.
+    assert len(table._indexes) == 2
+
+    # An edit outside the range keeps the table and its indexes.
+    store.set_cell(4, 5, "7")
+    calculator.update(store)
+    assert _cached_tables(calculator) == [table]
+
+    # An edit inside the range drops it; the lookups rebuild it from the new values.
+    store.set_cell(1, 1, "20")
+    calculator.update(store)
+    assert calculator.value_at(1, 3) == 20
+    [rebuilt] = _cached_tables(calculator)
+    assert rebuilt is not table
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from profile_images import (
+    MAX_IMAGE_SIDE,
+    PROFILE_IMAGE_DIR_ENV_VAR,
+    is_image_id,
+    save_profile_picture,
+    thumbnail_bytes,
+)
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture(autouse=True)
+def _image_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv(PROFILE_IMAGE_DIR_ENV_VAR, str(tmp_path))
+    return tmp_path
+
+
+def _upload(size: tuple[int, int], mode: str = "RGB", color: object = "red") -> BytesIO:
+    buffer = BytesIO()
+    Image.new(mode, size, color).save(buffer, format="PNG")
+    buffer.seek(0)
+    return buffer
+
+
+def test_upload_is_downscaled_and_stored_under_its_hash(_image_dir: Path) -> None:
+    image_id = save_profile_picture(_upload((2000, 1000)))
+
+    assert is_image_id(image_id)
+    with Image.open(_image_dir / f"{image_id}.jpg") as stored:
+        assert max(stored.size) == MAX_IMAGE_SIDE
+    assert thumbnail_bytes(image_id)
+
+
+def test_same_picture_gets_the_same_id() -> None:
+    assert save_profile_picture(_upload((64, 64))) == save_profile_picture(_upload((64, 64)))
+
+
+def test_transparent_upload_is_flattened() -> None:
+    assert is_image_id(save_profile_picture(_upload((32, 32), "RGBA", (0, 0, 0, 0))))
+
+
+def test_unknown_picture_has_no_thumbnail() -> None:
+    assert thumbnail_bytes("0" * 32) is None
+    assert not is_image_id("profile_pic.png")
+    assert not is_image_id(None)
+
+
+def test_app_core_import_leaves_pil_unloaded() -> None:
+    code = "import sys, app_core; print('PIL' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=REPO_ROOT)
+    assert result.stdout.strip() == "False"
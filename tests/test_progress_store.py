@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+import app_core
+from profile_images import PROFILE_IMAGE_DIR_ENV_VAR, is_image_id
+from progress_store import (
+    LEGACY_STUDENT_ID,
+    ActivityRecord,
+    ProgressStore,
+    StudentRecord,
+)
+
+
+@pytest.fixture
+def db_path(tmp_path: Path) -> str:
+    return str(tmp_path / "progress.db")
+
+
+def test_write_batch_upserts_student_rows(db_path: str) -> None:
+    store = ProgressStore(db_path)
+    store.write_batch([StudentRecord("s1", name="Ada", xp=10), StudentRecord("s2", name="Bob")])
+    store.write_batch([StudentRecord("s1", name="Ada", xp=25, badges=["First Formula"], completed={"SUM": True})])
+
+    expected = StudentRecord("s1", name="Ada", xp=25, badges=["First Formula"], completed={"SUM": True})
+    assert store.load_student("s1") == expected
+    assert store.load_student("s2") == StudentRecord("s2", name="Bob")
+    assert store.load_student("missing") is None
+
+
+def test_activity_is_numbered_per_student_and_loaded_oldest_first(db_path: str) -> None:
+    store = ProgressStore(db_path)
+    store.write_batch(activities=[ActivityRecord("s1", step, f"event {step}") for step in range(5)])
+    store.write_batch(activities=[ActivityRecord("s2", 0, "other student")])
+
+    assert [(item.seq, item.event) for item in store.load_activity("s1", limit=2)] == [(3, "event 3"), (4, "event 4")]
+    assert [item.seq for item in store.load_activity("s2")] == [0]
+
+
+def test_concurrent_writers_never_reuse_a_seq(db_path: str) -> None:
+    # Two stores stand in for two server processes sharing the database file.
+    stores = [ProgressStore(db_path), ProgressStore(db_path)]
+
+    def write(writer: int) -> None:
+        for batch in range(20):
+            events = [ActivityRecord("shared", 0, f"writer {writer} batch {batch} item {item}") for item in range(3)]
+            stores[writer % 2].write_batch([StudentRecord("shared", xp=batch)], events)
+
+    threads = [threading.Thread(target=write, args=(writer,)) for writer in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    activity = stores[0].load_activity("shared", limit=1000)
+    assert [item.seq for item in activity] == list(range(240))
+    assert len({item.event for item in activity}) == 240
+
+
+def test_claim_moves_progress_and_activity_once(db_path: str) -> None:
+    store = ProgressStore(db_path)
+    legacy = StudentRecord(LEGACY_STUDENT_ID, name="Ada", xp=40)
+    store.write_batch([legacy], [ActivityRecord(LEGACY_STUDENT_ID, 1, "old")])
+
+    claimed = store.claim_student(LEGACY_STUDENT_ID, "s1")
+    assert claimed == StudentRecord("s1", name="Ada", xp=40)
+    assert [item.event for item in store.load_activity("s1")] == ["old"]
+    assert store.load_student(LEGACY_STUDENT_ID) is None
+    assert store.claim_student(LEGACY_STUDENT_ID, "s2") is None
+
+
+def test_claim_never_overwrites_existing_progress(db_path: str) -> None:
+    store = ProgressStore(db_path)
+    store.write_batch([StudentRecord(LEGACY_STUDENT_ID, name="Ada"), StudentRecord("s1", name="Bob")])
+
+    assert store.claim_student(LEGACY_STUDENT_ID, "s1") is None
+    assert store.load_student("s1").name == "Bob"
+    assert store.load_student(LEGACY_STUDENT_ID).name == "Ada"
+
+
+def test_legacy_profile_file_is_imported_once(db_path: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv(PROFILE_IMAGE_DIR_ENV_VAR, str(tmp_path / "images"))
+    picture = tmp_path / "profile_pic.png"
+    Image.new("RGB", (8, 8), "blue").save(picture)
+    legacy_file = tmp_path / "profile_data.json"
+    legacy_file.write_text(json.dumps({"name": "Ada", "profile_pic": str(picture)}), encoding="utf-8")
+    monkeypatch.setattr(app_core, "LEGACY_PROFILE_DATA_FILE", legacy_file)
+
+    store = ProgressStore(db_path)
+    app_core._import_legacy_profile(store)
+    assert not legacy_file.exists()
+
+    claimed = store.claim_student(LEGACY_STUDENT_ID, "s1")
+    assert claimed.name == "Ada"
+    assert is_image_id(claimed.profile_pic)
+
+
+def test_unreadable_legacy_file_is_discarded(db_path: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    legacy_file = tmp_path / "profile_data.json"
+    legacy_file.write_text("{not json", encoding="utf-8")
+    monkeypatch.setattr(app_core, "LEGACY_PROFILE_DATA_FILE", legacy_file)
+
+    store = ProgressStore(db_path)
+    app_core._import_legacy_profile(store)
+    assert not legacy_file.exists()
+    assert store.load_student(LEGACY_STUDENT_ID) is None
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import numpy as np
+
+from sheet_engine.errors import REF_ERROR
+from sheet_engine.recalc import SheetCalculator
+from sheet_engine.store import SheetStore
+
+
+def _store(rows: list[list[str]]) -> SheetStore:
+    return SheetStore.from_strings(np.array(rows, dtype=object))
+
+
+def _values(store: SheetStore) -> list[list[object]]:
+    calculator = SheetCalculator()
+    calculator.update(store)
+    return calculator.value_block(slice(None), slice(None)).tolist()
+
+
+def test_resize_keeps_the_overlapping_block() -> None:
+    store = _store([["1", "x"], ["=A1+1", ""]])
+    store.resize(3, 1)
+    assert store.to_strings().tolist() == [["1"], ["=A1+1"], [""]]
+
+    store.resize(1, 3)
+    assert store.to_strings().tolist() == [["1", "", ""]]
+    assert store.cell_text(0, 0) == "1"
+
+
+def test_insert_rows_shifts_references() -> None:
+    store = _store([["1", "=A1*2"], ["2", "=SUM(A1:A2)"]])
+    store.insert_rows(0, 2)
+
+    assert store.to_strings().tolist() == [["", ""], ["", ""], ["1", "=A3*2"], ["2", "=SUM(A3:A4)"]]
+    assert _values(store)[2:] == [[1, 2], [2, 3]]
+
+
+def test_insert_columns_shifts_references() -> None:
+    store = _store([["1", "2", "=A1+B1"]])
+    store.insert_cols(1)
+    assert store.to_strings().tolist() == [["1", "", "2", "=A1+C1"]]
+
+
+def test_delete_rows_shrinks_ranges_and_breaks_direct_references() -> None:
+    store = _store([["1", ""], ["2", "=A2*10"], ["3", "=SUM(A1:A3)"]])
+    store.delete_rows(1)
+    assert store.to_strings().tolist() == [["1", ""], ["3", "=SUM(A1:A2)"]]
+
+    store = _store([["1", ""], ["2", ""], ["", "=A2*10"]])
+    store.delete_rows(1)
+    assert store.cell_text(1, 1) == f"={REF_ERROR}*10"
+    assert _values(store)[1][1] == REF_ERROR
+
+
+def test_delete_columns_past_the_edge_only_removes_what_exists() -> None:
+    store = _store([["1", "2", "=A1"]])
+    store.delete_cols(1, 5)
+    assert store.to_strings().tolist() == [["1"]]
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from sheet_engine.errors import REF_ERROR
+from sheet_engine.recalc import SheetCalculator, WorkbookCalculator
+from sheet_engine.store import SheetStore
+from sheet_engine.workbook import Workbook
+
+
+def _store(rows: list[list[str]]) -> SheetStore:
+    return SheetStore.from_strings(np.array(rows, dtype=object))
+
+
+def _values(calculator: SheetCalculator) -> list[list[object]]:
+    return calculator.value_block(slice(None), slice(None)).tolist()
+
+
+def test_cross_sheet_reference_follows_edits_on_the_other_sheet() -> None:
+    workbook = Workbook.single(_store([["2"]]), "Main")
+    workbook.add_sheet("Other", _store([["=main!A1*10", "=SUM(Main!A1:A1)+1"]]))
+    calculator = WorkbookCalculator()
+    calculator.update(workbook)
+    assert _values(calculator.sheet("Other")) == [[20, 3]]
+
+    workbook.sheet("Main").set_cell(0, 0, "5")
+    calculator.update(workbook)
+    assert _values(calculator.sheet("Other")) == [[50, 6]]
+
+
+def test_missing_sheet_is_a_ref_error() -> None:
+    workbook = Workbook.single(_store([["=Nowhere!A1", "=A1+1"]]), "Main")
+    calculator = WorkbookCalculator()
+    calculator.update(workbook)
+    assert _values(calculator.sheet("Main")) == [[REF_ERROR, REF_ERROR]]
+
+
+def test_removing_a_sheet_breaks_references_to_it() -> None:
+    workbook = Workbook.single(_store([["=Other!A1"]]), "Main")
+    workbook.add_sheet("Other", _store([["4"]]))
+    calculator = WorkbookCalculator()
+    calculator.update(workbook)
+    assert calculator.sheet("Main").value_at(0, 0) == 4
+
+    workbook.remove_sheet("Other")
+    calculator.update(workbook)
+    assert calculator.sheet("Main").value_at(0, 0) == REF_ERROR
+
+
+def test_structural_edit_updates_references_on_other_sheets() -> None:
+    workbook = Workbook.single(_store([["1"], ["2"]]), "Main")
+    workbook.add_sheet("Other", _store([["=Main!A2*10"]]))
+    calculator = WorkbookCalculator()
+    calculator.update(workbook)
+    assert calculator.sheet("Other").value_at(0, 0) == 20
+
+    workbook.insert("Main", 0, 0, 1)
+    calculator.update(workbook)
+    assert workbook.sheet("Other").cell_text(0, 0) == "=Main!A3*10"
+    assert calculator.sheet("Other").value_at(0, 0) == 20
+
+
+@pytest.mark.parametrize("name", ["", "  ", "a" * 32, "Bad/Name", "'quoted", "MAIN"])
+def test_invalid_sheet_names_are_rejected(name: str) -> None:
+    workbook = Workbook.single(SheetStore.blank(1, 1), "Main")
+    with pytest.raises(ValueError):
+        workbook.validate_name(name)
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from app_core import WriteBehindQueue
+from progress_store import ActivityRecord, StudentRecord
+
+
+class _RecordingStore:
+    # Stands in for ProgressStore; fails while `failing` is set, and can be held mid-write.
+    def __init__(self, failing: bool = False) -> None:
+        self.failing = failing
+        self.calls = 0
+        self.students: dict[str, StudentRecord] = {}
+        self.activities: list[ActivityRecord] = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def write_batch(self, students, activities) -> None:
+        self.calls += 1
+        self.release.wait()
+        if self.failing:
+            raise OSError("disk full")
+        self.students.update((student.student_id, student) for student in students)
+        self.activities.extend(activities)
+
+
+def _queue(store: _RecordingStore, **options) -> WriteBehindQueue:
+    settings = {"batch_size": 1, "interval": 0.01, "max_pending": 100, "submit_timeout": 0.05, "max_retries": 3}
+    settings.update(options)
+    return WriteBehindQueue(store, **settings)
+
+
+def test_writes_land_in_submission_order() -> None:
+    store = _RecordingStore()
+    writer = _queue(store)
+    for step in range(5):
+        writer.submit(StudentRecord("s1", xp=step), ActivityRecord("s1", step, f"event {step}"))
+
+    assert writer.flush(timeout=5.0)
+    assert store.students["s1"].xp == 4
+    assert [item.event for item in store.activities] == [f"event {step}" for step in range(5)]
+
+
+def test_failing_store_is_retried_a_bounded_number_of_times() -> None:
+    store = _RecordingStore(failing=True)
+    writer = _queue(store)
+    writer.submit(StudentRecord("s1"))
+
+    assert writer.flush(timeout=5.0)
+    assert store.calls == 3
+    assert writer.failures == 3
+    assert writer.dropped == 1
+    assert writer.pending == 0
+
+
+def test_full_queue_does_not_block_and_coalesces_student_rows() -> None:
+    store = _RecordingStore()
+    store.release.clear()
+    writer = _queue(store, batch_size=1000, max_pending=4)
+    writer.submit(StudentRecord("held"))
+    writer.request_flush()
+    while store.calls == 0:
+        time.sleep(0.01)
+
+    started = time.perf_counter()
+    results = [writer.submit(StudentRecord("s1", xp=step)) for step in range(10)]
+    assert time.perf_counter() - started < 5.0
+    # Rows for one student collapse into one entry, so nothing had to be dropped.
+    assert all(results)
+
+    store.release.set()
+    assert writer.flush(timeout=5.0)
+    assert store.students["s1"].xp == 9
+
+
+def test_full_queue_drops_the_oldest_activity_when_coalescing_is_not_enough() -> None:
+    store = _RecordingStore()
+    store.release.clear()
+    writer = _queue(store, batch_size=1000, max_pending=3)
+    writer.submit(StudentRecord("held"))
+    writer.request_flush()
+    while store.calls == 0:
+        time.sleep(0.01)
+
+    results = [writer.submit(StudentRecord("s1"), ActivityRecord("s1", step, f"event {step}")) for step in range(5)]
+    assert results == [True, True, True, False, False]
+    assert writer.dropped == 2
+
+    store.release.set()
+    assert writer.flush(timeout=5.0)
+    assert [item.event for item in store.activities] == ["event 2", "event 3", "event 4"]
+    assert "s1" in store.students
+
+
+def test_flush_for_one_student_ignores_other_students() -> None:
+    store = _RecordingStore(failing=True)
+    writer = _queue(store, max_retries=1000)
+    writer.submit(StudentRecord("stuck"))
+
+    started = time.perf_counter()
+    assert writer.flush(timeout=5.0, student_id="fresh")
+    assert time.perf_counter() - started < 1.0
+    assert not writer.flush(timeout=0.1, student_id="stuck")
+
+    store.failing = False
+    assert writer.flush(timeout=5.0)
@@ -0,0 +1 @@
+# AI Tutor backend: model backends, conversation memory and response caching.
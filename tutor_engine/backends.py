@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Iterator, Protocol
+
+from tutor_engine.history import PromptContext
+
+GEMINI_MODEL_NAME = "gemini-2.5-flash"
+BACKEND_GEMINI = "gemini"
+BACKEND_STUB = "stub"
+
+# genai.configure sets process-wide SDK state; backends built at the same time take turns.
+_configure_lock = threading.Lock()
+
+
+class TutorBackend(Protocol):
+    # Anything that can turn a prompt into streamed reply text.
+    # `name` scopes cached replies, so different backends never share entries.
+    name: str
+
+    def stream_reply(self, prompt: str, context: PromptContext | None = None) -> Iterator[str]: ...
+
+
+def _gemini_contents(prompt: str, context: PromptContext | None) -> Any:
+    # A bare prompt, or a multi-turn contents list with the summary as an opening exchange.
+    if context is None or context.empty:
+        return prompt
+
+    contents: list[dict[str, Any]] = []
+    if context.summary:
+        contents.append({"role": "user", "parts": [f"Summary of our earlier conversation:\n{context.summary}"]})
+        contents.append({"role": "model", "parts": ["Understood."]})
+
+    for turn in context.turns:
+        contents.append({"role": "model" if turn.role == "assistant" else "user", "parts": [turn.content]})
+
+    contents.append({"role": "user", "parts": [prompt]})
+    return contents
+
+
+class GeminiBackend:
+    # One configured Gemini model shared by every session in the process.
+    def __init__(self, api_key: str, model_name: str = GEMINI_MODEL_NAME) -> None:
+        # The SDK is imported here so the stub backend never pays for it.
+        import google.generativeai as genai
+
+        self.name = model_name
+
+        with _configure_lock:
+            genai.configure(api_key=api_key)
+            self._model = genai.GenerativeModel(model_name)
+
+    def stream_reply(self, prompt: str, context: PromptContext | None = None) -> Iterator[str]:
+        for chunk in self._model.generate_content(_gemini_contents(prompt, context), stream=True):
+            text = chunk.text
+            if text:
+                yield text
+
+
+class StubBackend:
+    # Offline backend for tests and load tests: echoes the prompt in a few chunks.
+    name = BACKEND_STUB
+
+    def __init__(self, chunk_delay: float = 0.0) -> None:
+        self.chunk_delay = chunk_delay
+
+    def stream_reply(self, prompt: str, context: PromptContext | None = None) -> Iterator[str]:
+        remembered = 0 if context is None else len(context.turns)
+        for text in ("(stub tutor) ", f"[{remembered} earlier turns] ", "You asked: ", prompt):
+            if self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            yield text
+
+
+def create_backend(kind: str | None, api_key: str | None) -> TutorBackend | None:
+    # Build the configured backend; None means Gemini was requested without an API key.
+    if (kind or BACKEND_GEMINI).strip().lower() == BACKEND_STUB:
+        return StubBackend()
+
+    if not api_key:
+        return None
+
+    return GeminiBackend(api_key)
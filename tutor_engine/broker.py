@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterator
+
+from tutor_engine.backends import TutorBackend
+from tutor_engine.history import PromptContext
+
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_REQUESTS_PER_MINUTE = 60
+DEFAULT_BURST = 10
+DEFAULT_MAX_QUEUE = 100
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_SECONDS = 1.0
+# A reader gives up if no chunk arrives for this long.
+DEFAULT_CHUNK_TIMEOUT_SECONDS = 120.0
+
+
+class BrokerBusy(RuntimeError):
+    # Raised when the queue is full; the caller should ask the student to retry shortly.
+    pass
+
+
+@dataclass(frozen=True)
+class BrokerStats:
+    queued: int
+    running: int
+    submitted: int
+    coalesced: int
+    completed: int
+    failed: int
+    retries: int
+    rejected: int
+
+
+class _Flight:
+    # One backend call whose chunks can be read by any number of waiting sessions.
+    def __init__(self) -> None:
+        self.chunks: list[str] = []
+        self.done = False
+        self.error: BaseException | None = None
+        self.condition = threading.Condition()
+
+    def publish(self, text: str) -> None:
+        with self.condition:
+            self.chunks.append(text)
+            self.condition.notify_all()
+
+    def finish(self, error: BaseException | None = None) -> None:
+        with self.condition:
+            self.done = True
+            self.error = error
+            self.condition.notify_all()
+
+    def stream(self, timeout: float) -> Iterator[str]:
+        # Replays chunks published so far, then follows the call until it finishes.
+        index = 0
+        while True:
+            with self.condition:
+                if not self.condition.wait_for(lambda: index < len(self.chunks) or self.done, timeout):
+                    raise TimeoutError("The tutor did not respond in time.")
+                pending = self.chunks[index:]
+                finished = self.done
+                error = self.error
+
+            index += len(pending)
+            yield from pending
+
+            if finished and index == len(self.chunks):
+                if error is not None:
+                    raise error
+                return
+
+
+class RequestBroker:
+    # Process-wide gate in front of a tutor backend. Identical in-flight prompts share one call,
+    # at most max_concurrency calls run at once, starts are limited by a token-bucket rate
+    # budget, and calls that fail before producing any text are retried with backoff.
+    def __init__(
+        self,
+        backend: TutorBackend,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        burst: int = DEFAULT_BURST,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_seconds: float = DEFAULT_BACKOFF_SECONDS,
+        chunk_timeout: float = DEFAULT_CHUNK_TIMEOUT_SECONDS,
+    ) -> None:
+        self.backend = backend
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.chunk_timeout = chunk_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="tutor-broker")
+        self._lock = threading.Lock()
+        self._flights: dict[str, _Flight] = {}
+
+        self._rate = requests_per_minute / 60
+        self._burst = burst
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._rate_lock = threading.Lock()
+
+        self._queued = 0
+        self._running = 0
+        self._submitted = 0
+        self._coalesced = 0
+        self._completed = 0
+        self._failed = 0
+        self._retries = 0
+        self._rejected = 0
+
+    @property
+    def name(self) -> str:
+        return self.backend.name
+
+    def stream_reply(self, key: str, prompt: str, context: PromptContext | None = None) -> Iterator[str]:
+        # Join the in-flight call for `key` or queue a new one; raises BrokerBusy when full.
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._coalesced += 1
+            else:
+                if self._queued >= self.max_queue:
+                    self._rejected += 1
+                    raise BrokerBusy("The tutor is handling many questions right now. Please try again shortly.")
+
+                flight = _Flight()
+                self._flights[key] = flight
+                self._queued += 1
+                self._submitted += 1
+                self._executor.submit(self._run, key, flight, prompt, context)
+
+        return flight.stream(self.chunk_timeout)
+
+    def stats(self) -> BrokerStats:
+        with self._lock:
+            return BrokerStats(
+                self._queued,
+                self._running,
+                self._submitted,
+                self._coalesced,
+                self._completed,
+                self._failed,
+                self._retries,
+                self._rejected,
+            )
+
+    def _run(self, key: str, flight: _Flight, prompt: str, context: PromptContext | None) -> None:
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+
+        error: BaseException | None = None
+        try:
+            self._call_with_retries(flight, prompt, context)
+        except BaseException as caught:  # noqa: BLE001
+            error = caught
+        finally:
+            # Later identical prompts start a fresh call (and normally hit the reply cache instead).
+            with self._lock:
+                self._flights.pop(key, None)
+                self._running -= 1
+                if error is None:
+                    self._completed += 1
+                else:
+                    self._failed += 1
+            flight.finish(error)
+
+    def _call_with_retries(self, flight: _Flight, prompt: str, context: PromptContext | None) -> None:
+        attempt = 0
+        while True:
+            self._acquire_rate_token()
+            try:
+                for text in self.backend.stream_reply(prompt, context):
+                    flight.publish(text)
+                return
+            except Exception:
+                # Text already shown to students cannot be taken back, so only clean failures retry.
+                if flight.chunks or attempt >= self.max_retries:
+                    raise
+
+            attempt += 1
+            with self._lock:
+                self._retries += 1
+            time.sleep(self.backoff_seconds * 2 ** (attempt - 1) * (1 + random.random()))
+
+    def _acquire_rate_token(self) -> None:
+        # Token bucket: `burst` calls may start at once, then `requests_per_minute` on average.
+        while True:
+            with self._rate_lock:
+                now = time.monotonic()
+                self._tokens = min(self._burst, self._tokens + (now - self._refilled_at) * self._rate)
+                self._refilled_at = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) / self._rate
+
+            time.sleep(wait)
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+# The disk cache may hold more entries than memory; older rows are pruned past this.
+DEFAULT_MAX_DISK_ENTRIES = 5000
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = " ?!.,;:"
+
+
+def normalize_prompt(prompt: str) -> str:
+    # Case, spacing and trailing punctuation do not change the question being asked.
+    return _WHITESPACE_PATTERN.sub(" ", prompt.casefold()).strip().rstrip(_TRAILING_PUNCTUATION)
+
+
+def cache_key(prompt: str, scope: str = "") -> str:
+    # Scope separates replies that depend on more than the prompt (model name, context).
+    return hashlib.sha256(f"{scope}\0{normalize_prompt(prompt)}".encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+
+
+class ResponseCache:
+    # Process-wide LRU cache of tutor replies with a time-to-live, optionally
+    # backed by SQLite so replies survive restarts and are shared by replicas on one disk.
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        db_path: str | Path | None = None,
+        max_disk_entries: int = DEFAULT_MAX_DISK_ENTRIES,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+        # Wall-clock time source; expiry times are stored on disk, so it must agree across restarts.
+        self.clock = clock
+        # key -> (expires_at, reply), least recently used first.
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._db: sqlite3.Connection | None = None
+
+        if db_path is not None:
+            self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, reply TEXT NOT NULL, expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def get(self, key: str) -> str | None:
+        now = self.clock()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                entry = None
+
+            if entry is None and self._db is not None:
+                entry = self._load(key, now)
+                if entry is not None:
+                    self._remember(key, entry)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, reply: str) -> None:
+        now = self.clock()
+        entry = (now + self.ttl_seconds, reply)
+
+        with self._lock:
+            self._remember(key, entry)
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, reply, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                    (key, reply, entry[0], now),
+                )
+                self._prune_disk(now)
+                self._db.commit()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self.hits, self.misses, self.evictions, len(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def _remember(self, key: str, entry: tuple[float, str]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _load(self, key: str, now: float) -> tuple[float, str] | None:
+        row = self._db.execute("SELECT expires_at, reply FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+
+        if row[0] <= now:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db.commit()
+            return None
+
+        self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        self._db.commit()
+        return row[0], row[1]
+
+    def _prune_disk(self, now: float) -> None:
+        # Drop expired rows, then the least recently used rows beyond the disk limit.
+        self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        self._db.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,),
+        )
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+from dataclasses import dataclass
+from typing import Any, Sequence
+
+# Rough budgets in estimated tokens (about four characters each).
+DEFAULT_CONTEXT_TOKENS = 2000
+DEFAULT_SUMMARY_TOKENS = 400
+SUMMARY_LINE_CHARS = 160
+
+_SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?])\s")
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / 4)
+
+
+@dataclass(frozen=True)
+class Turn:
+    role: str  # "user" or "assistant"
+    content: str
+
+
+@dataclass(frozen=True)
+class PromptContext:
+    # What is sent along with a new prompt: a summary of older turns plus recent turns verbatim.
+    summary: str
+    turns: tuple[Turn, ...]
+
+    @property
+    def empty(self) -> bool:
+        return not self.summary and not self.turns
+
+    def digest(self) -> str:
+        # Stable id of the context, used to scope cached replies.
+        text = self.summary + "".join(f"\0{turn.role}\0{turn.content}" for turn in self.turns)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _summary_line(turn: Turn) -> str:
+    # First sentence of a message, shortened; no extra model call is spent on summaries.
+    text = " ".join(turn.content.split())
+    first_sentence = _SENTENCE_END_PATTERN.split(text, maxsplit=1)[0]
+    if len(first_sentence) > SUMMARY_LINE_CHARS:
+        first_sentence = first_sentence[: SUMMARY_LINE_CHARS - 3].rstrip() + "..."
+
+    speaker = "Student asked" if turn.role == "user" else "Tutor answered"
+    return f"- {speaker}: {first_sentence}"
+
+
+class ConversationMemory:
+    # Token-budgeted view over a growing chat: recent turns are sent verbatim and
+    # turns that fall out of the window are folded into a rolling summary once.
+    def __init__(self, context_tokens: int = DEFAULT_CONTEXT_TOKENS, summary_tokens: int = DEFAULT_SUMMARY_TOKENS):
+        self.context_tokens = context_tokens
+        self.summary_tokens = summary_tokens
+        self.summary_lines: list[str] = []
+        # Messages before this index are represented only by the summary.
+        self.summarized_count = 0
+
+    def context_for(self, messages: Sequence[dict[str, Any]]) -> PromptContext:
+        # Context for the next prompt given all earlier messages, oldest first.
+        turns = [Turn(message["role"], message["content"]) for message in messages]
+
+        start = len(turns)
+        used = 0
+        while start > self.summarized_count:
+            cost = estimate_tokens(turns[start - 1].content)
+            if used + cost > self.context_tokens:
+                break
+            used += cost
+            start -= 1
+
+        # Keep question/answer pairs together: the window never opens on a reply.
+        while start < len(turns) and turns[start].role != "user":
+            start += 1
+
+        self._fold(turns[self.summarized_count : start])
+        self.summarized_count = max(self.summarized_count, start)
+        return PromptContext("\n".join(self.summary_lines), tuple(turns[self.summarized_count :]))
+
+    def reset(self) -> None:
+        self.summary_lines = []
+        self.summarized_count = 0
+
+    def _fold(self, turns: Sequence[Turn]) -> None:
+        self.summary_lines.extend(_summary_line(turn) for turn in turns)
+
+        # The summary itself is bounded: the oldest lines go first.
+        while self.summary_lines and estimate_tokens("\n".join(self.summary_lines)) > self.summary_tokens:
+            self.summary_lines.pop(0)